@@ -3,13 +3,24 @@
 
 from .base import AIProvider
 from .deepseek import DeepSeekProvider
+from .registry import AIRegistry, ai_registry
 
-from .errors import AIError, AIRequestError, AIResponseFormatError
+from .errors import (
+    AIError,
+    AIOverloadedError,
+    AIRequestError,
+    AIResponseFormatError,
+    AIUnavailableError,
+)
 
 __all__ = [
     "AIProvider",
     "DeepSeekProvider",
+    "AIRegistry",
+    "ai_registry",
     "AIError",
     "AIRequestError",
     "AIResponseFormatError",
+    "AIUnavailableError",
+    "AIOverloadedError",
 ]
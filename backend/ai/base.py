@@ -1,11 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from backend.ai.streaming import TokenStream
 
 
 class AIProvider(ABC):
     """Abstract AI provider capable of returning JSON responses."""
 
     @abstractmethod
-    async def generate_json(self, prompt: str, prompt_name: Optional[str] = None) -> dict[str, Any]:
-        """Generate a JSON dictionary for the given prompt."""
+    async def generate_json(
+        self,
+        prompt: str,
+        prompt_name: Optional[str] = None,
+        stream: Optional["TokenStream"] = None,
+    ) -> dict[str, Any]:
+        """Generate a JSON dictionary for the given prompt.
+
+        If `stream` is given, raw output is fed into it as it is generated.
+        """
         raise NotImplementedError
@@ -1,24 +1,56 @@
+import asyncio
 import hashlib
 import json
 import logging
 import time
+from dataclasses import dataclass
 from typing import Any, Optional
 
 import httpx
 
 from backend.ai.base import AIProvider
-from backend.ai.errors import AIRequestError, AIResponseFormatError
+from backend.ai.errors import AIRequestError, AIResponseFormatError, AIUnavailableError
+from backend.ai.http import create_http_client
+from backend.ai.json_repair import JsonRepairer
+from backend.ai.limiter import LLMLimiter
+from backend.ai.metrics import AIMetrics
+from backend.ai.resilience import (
+    CircuitBreaker,
+    backoff_delay,
+    is_retryable,
+    retry_after_seconds,
+)
+from backend.ai.streaming import JsonObjectScanner, TokenStream
 from backend.core.config import settings
+from backend.core.serialization import dumps, loads
 from backend.prompts import SYSTEM_PROMPT, VALIDATE_JSON_PROMPT
 
 
+@dataclass
+class ModelOutput:
+    """Text of one streamed completion and why the model stopped."""
+
+    content: str
+    finish_reason: Optional[str] = None  # None if the stream was closed early
+    total_tokens: Optional[int] = None  # Usage reported in the final chunk
+
+
 class DeepSeekProvider(AIProvider):
     """AI provider implementation for DeepSeek chat completions.
 
     All configuration is loaded from environment via settings.
+    HTTP calls go through a shared pooled client; if none is passed in,
+    the provider lazily opens (and owns) its own.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        metrics: Optional[AIMetrics] = None,
+        json_repairer: Optional[JsonRepairer] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        limiter: Optional[LLMLimiter] = None,
+    ) -> None:
         if not settings.deepseek_api_key:
             raise ValueError("DEEPSEEK_API_KEY is required (set in .env)")
 
@@ -27,20 +59,87 @@ class DeepSeekProvider(AIProvider):
         self.model = settings.ai_model
         self.timeout_seconds = settings.ai_timeout_seconds
         self.max_retries = settings.ai_max_retries
+        self.truncation_retries = settings.ai_truncation_retries
+        self.retry_base_delay = settings.ai_retry_base_delay_seconds
+        self.retry_max_delay = settings.ai_retry_max_delay_seconds
         self.temperature = settings.ai_temperature
         self.max_tokens = settings.ai_max_tokens
+        self.truncation_max_tokens = max(
+            settings.ai_truncation_max_tokens, settings.ai_max_tokens
+        )
         self.provider_name = "deepseek"
         self.completions_url = f"{self.base_url}/chat/completions"
         self.logger = logging.getLogger(__name__)
+        self.metrics = metrics or AIMetrics()
+        self.json_repairer = json_repairer or JsonRepairer()
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=settings.ai_breaker_failure_threshold,
+            reset_seconds=settings.ai_breaker_reset_seconds,
+        )
+        self.limiter = limiter or LLMLimiter(
+            max_in_flight=settings.ai_max_in_flight,
+            requests_per_minute=settings.ai_requests_per_minute,
+            tokens_per_minute=settings.ai_tokens_per_minute,
+            queue_timeout=settings.ai_queue_timeout_seconds,
+            priorities=settings.ai_operation_priorities,
+        )
+        self._client = client
+        self._owns_client = client is None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, creating an owned one if needed."""
+        if self._client is None or self._client.is_closed:
+            self._client = create_http_client()
+            self._owns_client = True
+        return self._client
 
-    async def generate_json(self, prompt: str, prompt_name: Optional[str] = None) -> dict[str, Any]:
+    async def aclose(self) -> None:
+        """Close the HTTP client if this provider owns it."""
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def generate_json(
+        self,
+        prompt: str,
+        prompt_name: Optional[str] = None,
+        stream: Optional[TokenStream] = None,
+    ) -> dict[str, Any]:
         prompt_name = prompt_name or "anonymous_prompt"
         input_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
 
         try:
-            raw_output, latency_ms = await self._call_model(prompt)
-            parsed = await self._parse_or_validate(raw_output)
+            max_tokens = self.max_tokens
+            for attempt in range(self.truncation_retries + 1):
+                if stream is not None and attempt > 0:
+                    stream.reset()
+                output, latency_ms = await self._call_model(
+                    prompt, prompt_name, stream, max_tokens
+                )
+                parsed = await self._parse_or_validate(output.content)
+                if parsed is not None:
+                    break
+                self.logger.warning(
+                    "ai_output_truncated | prompt_name=%s attempt=%d/%d chars=%d "
+                    "finish_reason=%s max_tokens=%d",
+                    prompt_name,
+                    attempt + 1,
+                    self.truncation_retries + 1,
+                    len(output.content),
+                    output.finish_reason,
+                    max_tokens,
+                )
+                if output.finish_reason == "length":
+                    # The same budget would be cut off again
+                    if max_tokens >= self.truncation_max_tokens:
+                        raise AIResponseFormatError(
+                            f"LLM output exceeded max_tokens={max_tokens}"
+                        )
+                    max_tokens = min(max_tokens * 2, self.truncation_max_tokens)
+            else:
+                raise AIResponseFormatError("LLM output was truncated")
         except (AIRequestError, AIResponseFormatError) as exc:
+            self.metrics.record_failure(prompt_name)
             self.logger.error(
                 "ai_call_failed | prompt_name=%s model=%s input_hash=%s error=%s",
                 prompt_name,
@@ -51,6 +150,7 @@ class DeepSeekProvider(AIProvider):
             )
             raise
 
+        self.metrics.record_success(prompt_name, latency_ms)
         self.logger.info(
             "ai_call_success | prompt_name=%s model=%s provider=%s input_hash=%s latency_ms=%d",
             prompt_name,
@@ -61,13 +161,21 @@ class DeepSeekProvider(AIProvider):
         )
         return parsed
 
-    async def _call_model(self, user_prompt: str) -> tuple[str, int]:
+    async def _call_model(
+        self,
+        user_prompt: str,
+        prompt_name: str,
+        stream: Optional[TokenStream] = None,
+        max_tokens: Optional[int] = None,
+    ) -> tuple[ModelOutput, int]:
+        max_tokens = max_tokens or self.max_tokens
         payload = {
             "model": self.model,
             "messages": self._build_messages(user_prompt),
             "temperature": self.temperature,
-            "max_tokens": self.max_tokens,
+            "max_tokens": max_tokens,
             "stream": True,  # Enable streaming to avoid connection drops
+            "stream_options": {"include_usage": True},
         }
 
         headers = {
@@ -75,46 +183,95 @@ class DeepSeekProvider(AIProvider):
             "Content-Type": "application/json",
         }
 
-        last_error: Optional[Exception] = None
+        # Reserve the prompt estimate plus the worst-case completion; the
+        # limiter gets the unused part back after the call
+        prompt_tokens = self._estimate_tokens(payload["messages"])
+        estimated_tokens = prompt_tokens + max_tokens
+
         for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise AIUnavailableError(
+                    "DeepSeek is unavailable (circuit open)",
+                    retry_after=self.breaker.retry_after(),
+                )
             start = time.monotonic()
+            if stream is not None and attempt > 0:
+                stream.reset()
             try:
-                timeout = httpx.Timeout(
-                    connect=30.0,  # Increased from 10s for slow networks
-                    read=60.0,  # Timeout per chunk, not total
-                    write=30.0,
-                    pool=30.0,
-                )
-                async with httpx.AsyncClient(timeout=timeout) as client:
-                    content = await self._stream_response(client, headers, payload)
-                latency_ms = int((time.monotonic() - start) * 1000)
-                return content, latency_ms
-            except (
-                httpx.TimeoutException,
-                httpx.TransportError,
-                httpx.HTTPStatusError,
-                httpx.RemoteProtocolError,
-            ) as exc:
-                last_error = exc
+                async with self.limiter.slot(prompt_name, estimated_tokens) as reservation:
+                    # A failed attempt generates no completion
+                    reservation.used = prompt_tokens
+                    output = await self._stream_response(
+                        self._get_client(), headers, payload, stream
+                    )
+                    reservation.used = output.total_tokens or (
+                        prompt_tokens + len(output.content) // 3
+                    )
+            except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+                if not is_retryable(exc):
+                    # The provider answered; the request itself is wrong
+                    self.breaker.record_success()
+                    raise AIRequestError(f"DeepSeek request failed: {exc}") from exc
+
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise AIRequestError(
+                        f"DeepSeek request failed after retries: {exc}"
+                    ) from exc
+
+                delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+                retry_after = retry_after_seconds(exc)
+                if retry_after is not None:
+                    if retry_after > self.retry_max_delay:
+                        raise AIUnavailableError(
+                            f"DeepSeek asked to retry after {retry_after:.0f}s: {exc}",
+                            retry_after=retry_after,
+                        ) from exc
+                    delay = max(delay, retry_after)
+
                 self.logger.warning(
-                    "ai_request_retry | attempt=%d/%d error=%s",
+                    "ai_request_retry | attempt=%d/%d delay=%.2fs error=%s",
                     attempt + 1,
                     self.max_retries + 1,
+                    delay,
                     str(exc),
                 )
-                if attempt < self.max_retries:
-                    continue
-                raise AIRequestError(f"DeepSeek request failed after retries: {exc}") from exc
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+
+            self.breaker.record_success()
+            latency_ms = int((time.monotonic() - start) * 1000)
+            return output, latency_ms
 
-        raise AIRequestError(f"DeepSeek request failed: {last_error}")
+        raise AIRequestError("DeepSeek request failed: no attempts made")
 
     async def _stream_response(
-        self, client: httpx.AsyncClient, headers: dict, payload: dict
-    ) -> str:
-        """Stream response chunks to avoid connection timeout on long generations."""
+        self,
+        client: httpx.AsyncClient,
+        headers: dict,
+        payload: dict,
+        stream: Optional[TokenStream] = None,
+    ) -> ModelOutput:
+        """Stream response chunks to avoid connection timeout on long generations.
+
+        Each content delta is also forwarded to `stream` when one is given.
+        Output is scanned as it arrives: completed top-level fields are
+        published to `stream`, and once the top-level object is complete and
+        parses, the connection is closed without reading trailing text.
+        The returned finish_reason is "length" when max_tokens cut it off.
+        """
         content_parts: list[str] = []
+        finish_reason: Optional[str] = None
+        total_tokens: Optional[int] = None
+        scanner = JsonObjectScanner()
+        document_checked = False
         
-        async with client.stream("POST", self.completions_url, headers=headers, json=payload) as response:
+        async with client.stream(
+            "POST", self.completions_url, headers=headers, content=dumps(payload)
+        ) as response:
             response.raise_for_status()
             
             async for line in response.aiter_lines():
@@ -125,17 +282,49 @@ class DeepSeekProvider(AIProvider):
                     if data_str.strip() == "[DONE]":
                         break
                     try:
-                        chunk = json.loads(data_str)
-                        delta = chunk.get("choices", [{}])[0].get("delta", {})
-                        if "content" in delta:
-                            content_parts.append(delta["content"])
+                        chunk = loads(data_str)
                     except json.JSONDecodeError:
                         continue  # Skip malformed chunks
+                    usage = chunk.get("usage")
+                    if usage:
+                        total_tokens = usage.get("total_tokens") or total_tokens
+                    choice = (chunk.get("choices") or [{}])[0]
+                    finish_reason = choice.get("finish_reason") or finish_reason
+                    text = (choice.get("delta") or {}).get("content")
+                    if not text:
+                        continue
+                    content_parts.append(text)
+                    completed = scanner.feed(text)
+                    if stream is not None:
+                        stream.feed(text)
+                        for name, value in completed:
+                            stream.field_completed(name, value)
+                    if scanner.complete and not document_checked:
+                        # The object text is final: parse it only once
+                        document_checked = True
+                        document = self._complete_document(scanner)
+                        if document is not None:
+                            return ModelOutput(document)
         
         if not content_parts:
             raise AIResponseFormatError("Empty response from DeepSeek streaming")
         
-        return "".join(content_parts)
+        return ModelOutput("".join(content_parts), finish_reason, total_tokens)
+
+    def _complete_document(self, scanner: JsonObjectScanner) -> Optional[str]:
+        """Return the scanned object if it is valid JSON, else None."""
+        document = scanner.document()
+        try:
+            loads(document)
+        except json.JSONDecodeError:
+            return None  # Keep reading; the full output goes through repair
+        self.logger.debug("ai_stream_closed_early | object_chars=%d", len(document))
+        return document
+
+    @staticmethod
+    def _estimate_tokens(messages: list[dict[str, str]]) -> int:
+        """Rough prompt size in tokens (~3 chars per token for ru/en text)."""
+        return sum(len(message["content"]) for message in messages) // 3
 
     def _build_messages(self, user_prompt: str) -> list[dict[str, str]]:
         return [
@@ -143,22 +332,39 @@ class DeepSeekProvider(AIProvider):
             {"role": "user", "content": user_prompt},
         ]
 
-    async def _parse_or_validate(self, raw_output: str) -> dict[str, Any]:
+    async def _parse_or_validate(self, raw_output: str) -> Optional[dict[str, Any]]:
+        """Parse model output, repairing it if needed.
+
+        Returns None if the output was cut off: completing it locally would
+        produce data that parses but is missing content, which callers
+        would then cache as a normal result.
+        """
         try:
-            return json.loads(raw_output)
+            return loads(raw_output)
         except json.JSONDecodeError:
+            repaired = self.json_repairer.repair(raw_output)
+            if repaired.truncated:
+                return None
+            if repaired.data is not None:
+                self.logger.info("ai_json_repaired | fixes=%s", ",".join(repaired.fixes))
+                return repaired.data
+
+            # Local repair failed: fall back to an LLM validation round trip
             validated_text = await self._validate_with_model(raw_output)
             if validated_text is None:
                 raise AIResponseFormatError("LLM output is not valid JSON and could not be recovered")
             try:
-                return json.loads(validated_text)
+                return loads(validated_text)
             except json.JSONDecodeError as exc:
                 raise AIResponseFormatError("Validated LLM output is still not valid JSON") from exc
 
     async def _validate_with_model(self, raw_output: str) -> Optional[str]:
         validation_prompt = VALIDATE_JSON_PROMPT.replace("{{RAW_MODEL_OUTPUT}}", raw_output)
         try:
-            validated_output, _ = await self._call_model(validation_prompt)
-            return validated_output.strip() if validated_output else None
+            validated, _ = await self._call_model(validation_prompt, "validate_json")
+            return validated.content.strip() if validated.content else None
+        except AIUnavailableError:
+            # Circuit open: surface the 503 + Retry-After, not a format error
+            raise
         except AIRequestError:
             return None
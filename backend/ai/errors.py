@@ -1,3 +1,6 @@
+from typing import Optional
+
+
 class AIError(Exception):
     """Base class for AI-related errors."""
 
@@ -8,3 +11,15 @@ class AIRequestError(AIError):
 
 class AIResponseFormatError(AIError):
     """Raised when the AI response is not valid JSON after validation attempts."""
+
+
+class AIUnavailableError(AIRequestError):
+    """Raised when the provider is known to be unavailable (circuit open, rate limited)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AIOverloadedError(AIUnavailableError):
+    """Raised when a call waited too long for a slot in the local LLM limiter."""
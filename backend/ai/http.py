@@ -0,0 +1,66 @@
+"""Shared HTTP client for AI providers.
+
+One pooled `httpx.AsyncClient` is opened in the FastAPI lifespan and reused
+by every provider call, so LLM requests share keep-alive connections (and
+HTTP/2 multiplexing) instead of paying a TCP+TLS handshake per attempt.
+"""
+
+import logging
+from typing import Optional
+
+import httpx
+
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build a pooled client configured from settings."""
+    timeout = httpx.Timeout(
+        connect=30.0,  # Increased from 10s for slow networks
+        read=60.0,  # Timeout per chunk, not total
+        write=30.0,
+        pool=30.0,
+    )
+    limits = httpx.Limits(
+        max_connections=settings.ai_max_connections,
+        max_keepalive_connections=settings.ai_max_keepalive_connections,
+        keepalive_expiry=settings.ai_keepalive_expiry_seconds,
+    )
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=limits,
+        http2=settings.ai_http2,
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Open the shared client (called on application startup)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+        logger.info(
+            "ai_http_client_opened | http2=%s max_connections=%d",
+            settings.ai_http2,
+            settings.ai_max_connections,
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("ai_http_client_closed")
+
+
+def get_http_client() -> Optional[httpx.AsyncClient]:
+    """Return the shared client, or None if the app lifespan has not opened it."""
+    if _client is None or _client.is_closed:
+        return None
+    return _client
@@ -0,0 +1,222 @@
+"""Deterministic local repair of slightly malformed model JSON.
+
+Most unparseable model outputs are valid JSON wrapped in markdown fences or
+prose, or damaged in a few mechanical ways (trailing commas, single or
+typographic quotes, Python literals, raw newlines inside strings,
+truncated closing brackets). Fixing those locally takes microseconds; the
+LLM validator round trip is only needed when this repair fails.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from backend.core.serialization import loads
+
+# ```json ... ``` (closing fence optional: the output may be truncated)
+_FENCE = re.compile(r"```[a-zA-Z0-9_-]*[ \t]*\n?(.*?)(?:```|\Z)", re.DOTALL)
+
+# Trailing object key left without a value by truncation: , "key" :
+_DANGLING_KEY = re.compile(r'(?<=[{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$', re.DOTALL)
+
+# Incomplete literal/number at the end of truncated output
+_DANGLING_SCALAR = re.compile(r"(?<=[:\[,])\s*(?:-|[0-9.eE+-]*[.eE+-]|t|tr|tru|f|fa|fal|fals|n|nu|nul)$")
+
+_OPENING_QUOTES = {'"': '"', "'": "'", "“": "”", "”": "”"}
+_STRING_CONTROL = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_CLOSERS = {"{": "}", "[": "]"}
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+@dataclass
+class RepairStats:
+    """Counters for local repair attempts and the fixes they applied."""
+
+    attempts: int = 0
+    repaired: int = 0
+    failed: int = 0
+    fixes: Counter = field(default_factory=Counter)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "repaired": self.repaired,
+            "failed": self.failed,
+            "fixes": dict(self.fixes),
+        }
+
+
+@dataclass
+class RepairResult:
+    """Outcome of a repair attempt."""
+
+    data: Optional[dict[str, Any]]
+    fixes: list[str]
+
+    @property
+    def truncated(self) -> bool:
+        """True if the input was cut off and closed by guesswork.
+
+        Such data parses but may miss fields or hold a cut-off string, so
+        it must not be returned as a model result.
+        """
+        return "truncation" in self.fixes
+
+
+def _try_load(text: str) -> Optional[dict[str, Any]]:
+    try:
+        data = loads(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _strip_fences(text: str) -> Optional[str]:
+    """Return the content of the first fenced block, or None if unfenced."""
+    if "```" not in text:
+        return None
+    match = _FENCE.search(text)
+    if match is None:
+        return None
+    return match.group(1).strip()
+
+
+def _scan_object(text: str, fixes: set[str]) -> tuple[str, int]:
+    """Rewrite the object starting at text[0] into valid JSON syntax.
+
+    Walks the text once, tracking strings and bracket nesting. Returns the
+    rewritten object and the index where it ended in the input (stops at the
+    closing bracket of the top-level object, so trailing prose is dropped).
+    """
+    out: list[str] = []
+    stack: list[str] = []
+    closing_quote: Optional[str] = None  # set while inside a string
+    escape = False
+    i = 0
+    length = len(text)
+
+    while i < length:
+        char = text[i]
+        i += 1
+
+        if closing_quote is not None:
+            if escape:
+                escape = False
+                if char == "'":
+                    # \' is not a JSON escape
+                    out[-1] = "'"
+                    fixes.add("quotes")
+                else:
+                    out.append(char)
+            elif char == "\\":
+                out.append(char)
+                escape = True
+            elif char == closing_quote:
+                out.append('"')
+                closing_quote = None
+            elif char == '"':
+                out.append('\\"')
+            elif char in _STRING_CONTROL:
+                out.append(_STRING_CONTROL[char])
+                fixes.add("control_chars")
+            else:
+                out.append(char)
+            continue
+
+        if char in _OPENING_QUOTES:
+            if char != '"':
+                fixes.add("quotes")
+            closing_quote = _OPENING_QUOTES[char]
+            out.append('"')
+        elif char in _CLOSERS:
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            _drop_trailing_comma(out, fixes)
+            if not stack:
+                break
+            out.append(_CLOSERS[stack.pop()])
+            if not stack:
+                return "".join(out), i
+        elif char.isalpha():
+            start = i - 1
+            while i < length and text[i].isalnum():
+                i += 1
+            word = text[start:i]
+            if word in _PYTHON_LITERALS:
+                word = _PYTHON_LITERALS[word]
+                fixes.add("literals")
+            out.append(word)
+        else:
+            out.append(char)
+
+    # Input ended inside the object: complete it
+    fixes.add("truncation")
+    if closing_quote is not None:
+        if escape:
+            out.pop()
+        out.append('"')
+    result = "".join(out).rstrip()
+    if stack and stack[-1] == "{":
+        result = _DANGLING_KEY.sub("", result)
+    result = _DANGLING_SCALAR.sub("", result).rstrip()
+    if result.endswith(","):
+        result = result[:-1]
+    if result.endswith(":"):
+        result += " null"
+    return result + "".join(_CLOSERS[opener] for opener in reversed(stack)), length
+
+
+def _drop_trailing_comma(out: list[str], fixes: set[str]) -> None:
+    j = len(out) - 1
+    while j >= 0 and out[j].isspace():
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
+        fixes.add("trailing_commas")
+
+
+class JsonRepairer:
+    """Repair model output into a JSON object, counting which fixes fire."""
+
+    def __init__(self) -> None:
+        self.stats = RepairStats()
+
+    def repair(self, raw_output: str) -> RepairResult:
+        """Try to turn raw model output into a JSON object.
+
+        Returns a result with `data=None` if local repair was not enough.
+        """
+        result = self._repair(raw_output)
+        self.stats.attempts += 1
+        if result.data is None:
+            self.stats.failed += 1
+        else:
+            self.stats.repaired += 1
+            self.stats.fixes.update(result.fixes)
+        return result
+
+    def _repair(self, raw_output: str) -> RepairResult:
+        fixes: set[str] = set()
+        text = raw_output.strip().lstrip("\ufeff")
+
+        fenced = _strip_fences(text)
+        if fenced is not None:
+            fixes.add("fences")
+            text = fenced
+            data = _try_load(text)
+            if data is not None:
+                return RepairResult(data, sorted(fixes))
+
+        start = text.find("{")
+        if start == -1:
+            return RepairResult(None, sorted(fixes))
+
+        rewritten, end = _scan_object(text[start:], fixes)
+        if start > 0 or text[start + end:].strip():
+            fixes.add("extract_object")
+        return RepairResult(_try_load(rewritten), sorted(fixes))
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.stats.snapshot()
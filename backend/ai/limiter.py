@@ -0,0 +1,226 @@
+"""Concurrency and rate limiting for outbound LLM calls.
+
+Every provider HTTP attempt takes a slot from the shared `LLMLimiter`:
+- at most `max_in_flight` calls run at once;
+- optional requests/minute and tokens/minute token buckets keep the
+  process under the provider's rate limits instead of collecting 429s;
+  a call reserves its worst case and, once done, the unused part of the
+  reservation is returned to the bucket;
+- waiting calls are admitted by operation priority (lower value first),
+  then in arrival order;
+- a call that waits longer than `queue_timeout` fails with
+  AIOverloadedError (503 at the API).
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional
+
+from backend.ai.errors import AIOverloadedError
+
+DEFAULT_PRIORITY = 5
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` tokens per minute."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        # A request larger than the whole bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        """Return tokens taken by consume() (negative to take more)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+@dataclass
+class TokenReservation:
+    """Tokens reserved for one call; set `used` once the real size is known."""
+
+    reserved: int
+    used: Optional[int] = None
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class LLMLimiter:
+    """Priority-queued admission control shared by all provider calls."""
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        queue_timeout: float = 30.0,
+        priorities: Optional[dict[str, int]] = None,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self.priorities = priorities or {}
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.admitted = 0
+        self.queued = 0
+        self.timeouts = 0
+        self.max_queue_depth = 0
+        self.total_wait_ms = 0
+        self.refunded_tokens = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._queue if not waiter.future.done())
+
+    @asynccontextmanager
+    async def slot(
+        self, prompt_name: str, estimated_tokens: int = 0
+    ) -> AsyncIterator[TokenReservation]:
+        """Hold a call slot for the duration of the block.
+
+        If the block sets `used` on the yielded reservation, the difference
+        to `estimated_tokens` goes back to the tokens/minute bucket.
+        """
+        await self.acquire(prompt_name, estimated_tokens)
+        reservation = TokenReservation(estimated_tokens)
+        try:
+            yield reservation
+        finally:
+            self._settle(reservation)
+            self.release()
+
+    async def acquire(self, prompt_name: str, estimated_tokens: int = 0) -> None:
+        """Wait for admission; raise AIOverloadedError after queue_timeout."""
+        if not self._queue and self._admission_delay(estimated_tokens) == 0:
+            self._admit(estimated_tokens)
+            return
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(
+            priority=self.priorities.get(prompt_name, DEFAULT_PRIORITY),
+            seq=next(self._seq),
+            tokens=estimated_tokens,
+            future=loop.create_future(),
+        )
+        heapq.heappush(self._queue, waiter)
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        started = time.monotonic()
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._dispatch()
+            raise AIOverloadedError(
+                f"LLM queue wait exceeded {self.queue_timeout:.0f}s "
+                f"(in_flight={self._in_flight}, queued={self.queue_depth})",
+                retry_after=self.queue_timeout,
+            ) from None
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()  # Admitted just as the caller went away
+            else:
+                self._dispatch()
+            raise
+        self.total_wait_ms += int((time.monotonic() - started) * 1000)
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _settle(self, reservation: TokenReservation) -> None:
+        if self.token_bucket is None or reservation.used is None:
+            return
+        # consume() charged at most a full bucket
+        charged = min(reservation.reserved, self.token_bucket.capacity)
+        self.token_bucket.refund(charged - reservation.used)
+        self.refunded_tokens += charged - reservation.used
+
+    def _admission_delay(self, tokens: int) -> float:
+        """0 if a call can start now, seconds to wait for a bucket, or inf."""
+        if self._in_flight >= self.max_in_flight:
+            return float("inf")  # Woken by release()
+        delay = 0.0
+        if self.request_bucket is not None:
+            delay = max(delay, self.request_bucket.wait_time(1))
+        if self.token_bucket is not None and tokens:
+            delay = max(delay, self.token_bucket.wait_time(tokens))
+        return delay
+
+    def _admit(self, tokens: int) -> None:
+        self._in_flight += 1
+        self.admitted += 1
+        if self.request_bucket is not None:
+            self.request_bucket.consume(1)
+        if self.token_bucket is not None and tokens:
+            self.token_bucket.consume(tokens)
+
+    def _dispatch(self) -> None:
+        """Admit waiters from the head of the queue while capacity allows."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            waiter = self._queue[0]
+            if waiter.future.done():
+                heapq.heappop(self._queue)  # Timed out or cancelled
+                continue
+            delay = self._admission_delay(waiter.tokens)
+            if delay > 0:
+                if delay != float("inf"):
+                    loop = asyncio.get_running_loop()
+                    self._timer = loop.call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self._admit(waiter.tokens)
+            waiter.future.set_result(None)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "timeouts": self.timeouts,
+            "avg_queue_wait_ms": self.total_wait_ms // self.queued if self.queued else 0,
+            "refunded_tokens": int(self.refunded_tokens),
+        }
@@ -0,0 +1,48 @@
+"""In-process counters for outbound AI calls."""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class OperationStats:
+    """Counters for a single prompt/operation name."""
+
+    calls: int = 0
+    failures: int = 0
+    total_latency_ms: int = 0
+
+
+@dataclass
+class AIMetrics:
+    """Aggregated metrics shared by every provider call in the process."""
+
+    operations: dict[str, OperationStats] = field(
+        default_factory=lambda: defaultdict(OperationStats)
+    )
+
+    def record_success(self, prompt_name: str, latency_ms: int) -> None:
+        stats = self.operations[prompt_name]
+        stats.calls += 1
+        stats.total_latency_ms += latency_ms
+
+    def record_failure(self, prompt_name: str) -> None:
+        stats = self.operations[prompt_name]
+        stats.calls += 1
+        stats.failures += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a JSON-serializable view of the counters."""
+        return {
+            name: {
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "avg_latency_ms": (
+                    stats.total_latency_ms // (stats.calls - stats.failures)
+                    if stats.calls > stats.failures
+                    else 0
+                ),
+            }
+            for name, stats in self.operations.items()
+        }
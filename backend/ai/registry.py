@@ -0,0 +1,82 @@
+"""Process-wide AI provider registry.
+
+The registry is started once in the FastAPI lifespan. It owns the single
+provider instance and the state every call shares (HTTP connection pool,
+metrics), so services never construct providers per request.
+"""
+
+import logging
+from typing import Any, Optional
+
+from backend.ai.base import AIProvider
+from backend.ai.deepseek import DeepSeekProvider
+from backend.ai.http import close_http_client, get_http_client, init_http_client
+from backend.ai.json_repair import JsonRepairer
+from backend.ai.limiter import LLMLimiter
+from backend.ai.metrics import AIMetrics
+from backend.ai.resilience import CircuitBreaker
+from backend.core.config import settings
+
+
+class AIRegistry:
+    """Holds the configured provider and its shared resources."""
+
+    def __init__(self) -> None:
+        self.metrics = AIMetrics()
+        self.json_repairer = JsonRepairer()
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.ai_breaker_failure_threshold,
+            reset_seconds=settings.ai_breaker_reset_seconds,
+        )
+        self.limiter = LLMLimiter(
+            max_in_flight=settings.ai_max_in_flight,
+            requests_per_minute=settings.ai_requests_per_minute,
+            tokens_per_minute=settings.ai_tokens_per_minute,
+            queue_timeout=settings.ai_queue_timeout_seconds,
+            priorities=settings.ai_operation_priorities,
+        )
+        self._provider: Optional[AIProvider] = None
+        self.logger = logging.getLogger(__name__)
+
+    async def startup(self) -> None:
+        """Open the connection pool and build the provider."""
+        await init_http_client()
+        self._provider = self._build_provider()
+        self.logger.info("ai_registry_started | provider=%s", settings.ai_provider)
+
+    async def shutdown(self) -> None:
+        """Release the provider and close the connection pool."""
+        self._provider = None
+        await close_http_client()
+
+    @property
+    def provider(self) -> AIProvider:
+        """Return the shared provider, building it lazily outside the app."""
+        if self._provider is None:
+            self._provider = self._build_provider()
+        return self._provider
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return registry state for monitoring."""
+        return {
+            "provider": settings.ai_provider,
+            "operations": self.metrics.snapshot(),
+            "json_repair": self.json_repairer.snapshot(),
+            "circuit_breaker": self.breaker.snapshot(),
+            "limiter": self.limiter.snapshot(),
+        }
+
+    def _build_provider(self) -> AIProvider:
+        provider_name = settings.ai_provider.lower()
+        if provider_name != "deepseek":
+            raise ValueError(f"Only 'deepseek' provider is supported, got: {provider_name}")
+        return DeepSeekProvider(
+            client=get_http_client(),
+            metrics=self.metrics,
+            json_repairer=self.json_repairer,
+            breaker=self.breaker,
+            limiter=self.limiter,
+        )
+
+
+ai_registry = AIRegistry()
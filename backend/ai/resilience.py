@@ -0,0 +1,132 @@
+"""Retry classification, backoff and circuit breaking for AI provider calls."""
+
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: timeouts, rate limiting and server-side failures.
+# Other 4xx (bad request, auth, payload too large) will not succeed on retry.
+RETRYABLE_STATUS_CODES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Return True if a failed request may succeed when repeated."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """Read Retry-After (delta-seconds or HTTP date) from an HTTP error."""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    value = exc.response.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Full-jitter exponential backoff for the given (0-based) attempt."""
+    return random.uniform(0, min(max_seconds, base_seconds * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Shared provider health state.
+
+    Closed: calls pass. After `failure_threshold` consecutive retryable
+    failures the breaker opens and calls fail fast for `reset_seconds`.
+    Then it is half-open: one probe call is let through; its success
+    closes the breaker, its failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self.retry_after() == 0:
+            return self.HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a probe through."""
+        if self._state != self.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            return True
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state != self.CLOSED:
+            logger.info("ai_circuit_closed")
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._state == self.HALF_OPEN or (
+            self._state == self.CLOSED
+            and self._consecutive_failures >= self.failure_threshold
+        ):
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+            self.times_opened += 1
+            logger.warning(
+                "ai_circuit_opened | consecutive_failures=%d reset_seconds=%.1f",
+                self._consecutive_failures,
+                self.reset_seconds,
+            )
+
+    def release_probe(self) -> None:
+        """Forget the half-open probe if it ended without a verdict."""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls,
+        }
@@ -0,0 +1,289 @@
+"""Token streaming from AI providers to API clients.
+
+A `TokenStream` is handed to `AIProvider.generate_json`; the provider feeds
+raw model deltas into it while still assembling the full response for
+parsing and caching. The stream decodes the value of one JSON string field
+(e.g. `updated_resume_text`) as it arrives and queues it as events that an
+SSE endpoint can relay to the browser.
+
+`JsonObjectScanner` tracks the structure of the output as it streams, so
+the provider can stop reading once the top-level object is complete and
+report each top-level field as soon as its value is closed.
+"""
+
+import asyncio
+import re
+from typing import Any, AsyncIterator, Optional
+
+from backend.core.serialization import loads
+
+_JSON_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+# Run of characters inside a JSON string that need no decoding
+_PLAIN_RUN = re.compile(r'[^"\\]+')
+_HEX4 = re.compile(r"[0-9a-fA-F]{4}")
+
+# Characters that change scanner state; everything else is skipped
+_STRUCTURAL = re.compile(r'["\\{}\[\],]')
+
+
+class JsonStringFieldExtractor:
+    """Incrementally decode the value of one string field of a JSON object.
+
+    Raw model output is fed chunk by chunk; `feed` returns the newly decoded
+    part of the field value. Escape sequences split across chunks are held
+    back until complete. Only the first occurrence of the key is tracked.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self._key_pattern = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        self._pos = 0
+        self._state = "search"  # search | value | done
+
+    @property
+    def done(self) -> bool:
+        """True once the closing quote of the field value has been seen."""
+        return self._state == "done"
+
+    def reset(self) -> None:
+        """Forget everything seen so far (used when the provider retries)."""
+        self._buffer = ""
+        self._pos = 0
+        self._state = "search"
+
+    def feed(self, chunk: str) -> str:
+        """Consume a raw chunk and return newly decoded field text."""
+        if self._state == "done":
+            return ""
+        self._buffer += chunk
+
+        if self._state == "search":
+            match = self._key_pattern.search(self._buffer, self._pos)
+            if match is None:
+                # Keep enough tail to match a key split across chunks
+                self._pos = max(0, len(self._buffer) - len(self.field) - 64)
+                return ""
+            self._pos = match.end()
+            self._state = "value"
+
+        return self._decode()
+
+    def _decode(self) -> str:
+        buffer = self._buffer
+        length = len(buffer)
+        i = self._pos
+        out: list[str] = []
+
+        while i < length:
+            match = _PLAIN_RUN.match(buffer, i)
+            if match is not None:
+                out.append(match.group())
+                i = match.end()
+                continue
+
+            char = buffer[i]
+            if char == '"':
+                self._state = "done"
+                i += 1
+                break
+
+            # Backslash escape; wait for more input if it is incomplete
+            if i + 1 >= length:
+                break
+            escape = buffer[i + 1]
+            if escape != "u":
+                out.append(_JSON_ESCAPES.get(escape, escape))
+                i += 2
+                continue
+
+            if i + 6 > length:
+                break
+            if _HEX4.fullmatch(buffer, i + 2, i + 6) is None:
+                # Malformed escape from the model: pass it through as text
+                out.append(buffer[i:i + 2])
+                i += 2
+                continue
+            code = int(buffer[i + 2:i + 6], 16)
+            if 0xD800 <= code < 0xDC00:
+                # High surrogate: combine with the following low surrogate
+                if i + 12 > length:
+                    break
+                if buffer[i + 6:i + 8] == "\\u" and _HEX4.fullmatch(buffer, i + 8, i + 12):
+                    low = int(buffer[i + 8:i + 12], 16)
+                    if 0xDC00 <= low < 0xE000:
+                        out.append(chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)))
+                        i += 12
+                        continue
+            # An unpaired surrogate cannot be encoded as UTF-8
+            out.append("\ufffd" if 0xD800 <= code < 0xE000 else chr(code))
+            i += 6
+
+        self._pos = i
+        if self._state == "done" or i > 4096:
+            # Drop consumed input so the buffer does not grow with the output
+            self._buffer = buffer[i:]
+            self._pos = 0
+        return "".join(out)
+
+
+class JsonObjectScanner:
+    """Incrementally track the first top-level JSON object in model output.
+
+    Only structural characters are inspected (strings, brackets, commas), so
+    feeding is cheap. Text before the first `{` (prose, a markdown fence) is
+    skipped. `feed` returns `(name, value)` for each top-level member whose
+    value was completed by the chunk; `complete` turns true at the closing
+    brace, and `document()` returns the object text.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[str] = []
+        self._length = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape_pos = -1
+        self._start: Optional[int] = None
+        self._end: Optional[int] = None
+        self._member_start = 0
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    def _text(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def document(self) -> Optional[str]:
+        """Return the complete top-level object text, if seen."""
+        if self._start is None or self._end is None:
+            return None
+        return self._text()[self._start:self._end]
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Consume a raw chunk and return newly completed top-level members."""
+        if self._end is not None or not chunk:
+            return []
+        base = self._length
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        members: list[tuple[str, Any]] = []
+
+        for match in _STRUCTURAL.finditer(chunk):
+            pos = base + match.start()
+            if pos == self._escape_pos:
+                continue
+            char = match.group()
+
+            if self._in_string:
+                if char == "\\":
+                    self._escape_pos = pos + 1
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._start is None:
+                if char == "{":
+                    self._start = pos
+                    self._depth = 1
+                    self._member_start = pos + 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_member(pos, members)
+                    self._end = pos + 1
+                    break
+            elif char == "," and self._depth == 1:
+                self._close_member(pos, members)
+                self._member_start = pos + 1
+
+        return members
+
+    def _close_member(self, pos: int, members: list[tuple[str, Any]]) -> None:
+        member = self._text()[self._member_start:pos]
+        if not member.strip():
+            return
+        try:
+            parsed = loads("{" + member + "}")
+        except ValueError:
+            return  # Malformed member; the final parse/repair deals with it
+        if isinstance(parsed, dict):
+            members.extend(parsed.items())
+
+
+class TokenStream:
+    """Queue of streaming events produced while a generation is running.
+
+    Events are `(event, data)` tuples:
+    - `("delta", {"text": ...})` — decoded text of the streamed field
+    - `("field", {"name": ..., "value": ...})` — a top-level field of the
+      response is complete (the streamed text field itself is skipped)
+    - `("reset", {})` — the provider retried; discard text received so far
+
+    With `field=None` only `field` and `reset` events are produced, plus
+    whatever services emit through `publish()`.
+    Iterating the stream yields events until `close()` is called.
+    """
+
+    def __init__(self, field: Optional[str] = None) -> None:
+        self.extractor = JsonStringFieldExtractor(field) if field else None
+        self._queue: asyncio.Queue[Optional[tuple[str, dict[str, Any]]]] = asyncio.Queue()
+        self._closed = False
+
+    def feed(self, chunk: str) -> None:
+        """Feed a raw model delta (called by the provider)."""
+        if self._closed or self.extractor is None:
+            return
+        text = self.extractor.feed(chunk)
+        if text:
+            self._queue.put_nowait(("delta", {"text": text}))
+
+    def field_completed(self, name: str, value: Any) -> None:
+        """Publish a completed top-level field (called by the provider)."""
+        if self._closed or (self.extractor is not None and name == self.extractor.field):
+            return
+        self._queue.put_nowait(("field", {"name": name, "value": value}))
+
+    def publish(self, event: str, data: dict[str, Any]) -> None:
+        """Publish a service-level event (e.g. one item of a batch)."""
+        if not self._closed:
+            self._queue.put_nowait((event, data))
+
+    def reset(self) -> None:
+        """Signal that the provider restarted the generation."""
+        if self._closed:
+            return
+        if self.extractor is not None:
+            self.extractor.reset()
+        self._queue.put_nowait(("reset", {}))
+
+    def close(self) -> None:
+        """Stop iteration once queued events are drained."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put_nowait(None)
+
+    async def __aiter__(self) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            yield item
@@ -0,0 +1,19 @@
+"""HTTP mapping for AI provider errors shared by endpoints."""
+
+import math
+
+from fastapi import HTTPException
+
+from backend.ai.errors import AIUnavailableError
+
+
+def ai_unavailable(exc: AIUnavailableError) -> HTTPException:
+    """503 with Retry-After when the provider is temporarily unavailable."""
+    headers = None
+    if exc.retry_after is not None:
+        headers = {"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    return HTTPException(
+        status_code=503,
+        detail=f"AI provider unavailable: {exc}",
+        headers=headers,
+    )
@@ -0,0 +1,79 @@
+"""Server-Sent Events helpers for streaming generation endpoints."""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from pydantic import BaseModel
+
+from backend.ai.errors import AIError, AIUnavailableError
+from backend.ai.streaming import TokenStream
+from backend.core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Disable proxy buffering (nginx)
+}
+
+# Generations whose client went away keep running so the result is still
+# persisted; hold references so the tasks are not garbage collected.
+_background_tasks: set[asyncio.Task] = set()
+
+
+def sse_event(event: str, data: dict[str, Any]) -> bytes:
+    """Format one SSE frame."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+def _log_orphaned_failure(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("stream_generation_failed_after_disconnect", exc_info=task.exception())
+
+
+async def relay_generation(
+    stream: TokenStream,
+    run: Callable[[], Awaitable[BaseModel]],
+) -> AsyncIterator[bytes]:
+    """Run a generation and relay its stream as SSE frames.
+
+    Emits `delta`/`reset` events while the model generates, then a single
+    `result` event with the response model, or an `error` event carrying
+    the HTTP status the blocking endpoint would have returned.
+    """
+    task = asyncio.ensure_future(run())
+    task.add_done_callback(lambda _: stream.close())
+    finished = False
+    try:
+        # Flush headers immediately; parsing and analysis may run first
+        yield b": stream-open\n\n"
+        async for event, data in stream:
+            yield sse_event(event, data)
+
+        try:
+            response = await task
+        except ValueError as e:
+            yield sse_event("error", {"status_code": 400, "detail": str(e)})
+        except AIUnavailableError as e:
+            yield sse_event(
+                "error",
+                {
+                    "status_code": 503,
+                    "detail": f"AI provider unavailable: {e}",
+                    "retry_after": e.retry_after,
+                },
+            )
+        except AIError as e:
+            yield sse_event("error", {"status_code": 502, "detail": f"AI provider error: {e}"})
+        except Exception:
+            logger.exception("stream_generation_failed")
+            yield sse_event("error", {"status_code": 500, "detail": "Internal server error"})
+        else:
+            yield sse_event("result", response.model_dump(mode="json"))
+        finished = True
+    finally:
+        if not finished:
+            _background_tasks.add(task)
+            task.add_done_callback(_log_orphaned_failure)
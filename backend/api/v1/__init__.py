@@ -8,6 +8,7 @@ from .match import router as match_router
 from .adapt import router as adapt_router
 from .ideal import router as ideal_router
 from .versions import router as versions_router
+from .jobs import router as jobs_router
 
 router = APIRouter(prefix="/v1")
 
@@ -22,3 +23,6 @@ router.include_router(ideal_router)
 
 # Stage 3 routes
 router.include_router(versions_router)
+
+# Background generation jobs
+router.include_router(jobs_router)
@@ -1,35 +1,27 @@
 """Resume adaptation endpoint (Stage 2)."""
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.ai.errors import AIError
-from backend.db import get_db
+from backend.ai.base import AIProvider
+from backend.ai.errors import AIError, AIUnavailableError
+from backend.ai.factory import get_ai_provider
+from backend.ai.streaming import TokenStream
+from backend.api.errors import ai_unavailable
+from backend.api.sse import SSE_HEADERS, relay_generation
+from backend.db import AsyncSessionLocal, get_db
 from backend.schemas import AdaptResumeRequest, AdaptResumeResponse, ChangeLogEntry
 from backend.services import AdaptResumeService
-from backend.services.adapt import SelectedImprovement
+from backend.services.adapt import AdaptResumeResult, SelectedImprovement
 
 router = APIRouter(prefix="/resumes", tags=["resumes"])
 
 
-@router.post("/adapt", response_model=AdaptResumeResponse)
-async def adapt_resume(
-    request: AdaptResumeRequest,
-    db: AsyncSession = Depends(get_db),
-) -> AdaptResumeResponse:
-    """Adapt resume for a vacancy based on selected improvements.
-
-    This endpoint:
-    1. Parses resume and vacancy (uses cache if available)
-    2. Gets match analysis (uses cache if available)
-    3. Generates adapted resume applying selected checkbox improvements
-    4. Saves new resume version to database
-    5. Returns adapted text with change log
-
-    Either resume_text or resume_id must be provided.
-    Either vacancy_text or vacancy_id must be provided.
-    selected_improvements should contain improvements with optional user_input.
-    """
+def validate_request(request: AdaptResumeRequest) -> None:
+    """Reject requests without a resume, vacancy or improvement."""
     # Validate that at least one resume source is provided
     if not request.resume_text and not request.resume_id:
         raise HTTPException(
@@ -52,9 +44,11 @@ async def adapt_resume(
             detail="At least one improvement must be selected (use selected_improvements or selected_checkbox_ids)",
         )
 
-    service = AdaptResumeService(db)
-    
-    # Convert request improvements to service format
+
+def _selected_improvements(
+    request: AdaptResumeRequest,
+) -> Optional[list[SelectedImprovement]]:
+    """Convert request improvements to service format."""
     selected_improvements = None
     if request.selected_improvements:
         selected_improvements = [
@@ -65,23 +59,10 @@ async def adapt_resume(
             )
             for imp in request.selected_improvements
         ]
+    return selected_improvements
 
-    try:
-        result = await service.adapt_and_version(
-            resume_text=request.resume_text,
-            resume_id=request.resume_id,
-            vacancy_text=request.vacancy_text,
-            vacancy_id=request.vacancy_id,
-            selected_improvements=selected_improvements,
-            selected_checkbox_ids=request.selected_checkbox_ids,  # Legacy support
-            base_version_id=request.base_version_id,
-            options=request.options.model_dump() if request.options else {},
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except AIError as e:
-        raise HTTPException(status_code=502, detail=f"AI provider error: {e}")
 
+def _to_response(result: AdaptResumeResult) -> AdaptResumeResponse:
     return AdaptResumeResponse(
         version_id=result.version_id,
         parent_version_id=result.parent_version_id,
@@ -92,3 +73,86 @@ async def adapt_resume(
         applied_checkbox_ids=result.applied_checkbox_ids,
         cache_hit=result.cache_hit,
     )
+
+
+async def run_adapt(
+    session: AsyncSession,
+    ai_provider: AIProvider,
+    request: AdaptResumeRequest,
+    stream: Optional[TokenStream] = None,
+) -> AdaptResumeResponse:
+    """Run adaptation for a request (shared by the sync, stream and job paths)."""
+    service = AdaptResumeService(session, ai_provider)
+    result = await service.adapt_and_version(
+        resume_text=request.resume_text,
+        resume_id=request.resume_id,
+        vacancy_text=request.vacancy_text,
+        vacancy_id=request.vacancy_id,
+        selected_improvements=_selected_improvements(request),
+        selected_checkbox_ids=request.selected_checkbox_ids,  # Legacy support
+        base_version_id=request.base_version_id,
+        options=request.options.model_dump() if request.options else {},
+        stream=stream,
+    )
+    return _to_response(result)
+
+
+@router.post("/adapt", response_model=AdaptResumeResponse)
+async def adapt_resume(
+    request: AdaptResumeRequest,
+    db: AsyncSession = Depends(get_db),
+    ai_provider: AIProvider = Depends(get_ai_provider),
+) -> AdaptResumeResponse:
+    """Adapt resume for a vacancy based on selected improvements.
+
+    This endpoint:
+    1. Parses resume and vacancy (uses cache if available)
+    2. Gets match analysis (uses cache if available)
+    3. Generates adapted resume applying selected checkbox improvements
+    4. Saves new resume version to database
+    5. Returns adapted text with change log
+
+    Either resume_text or resume_id must be provided.
+    Either vacancy_text or vacancy_id must be provided.
+    selected_improvements should contain improvements with optional user_input.
+    """
+    validate_request(request)
+    try:
+        return await run_adapt(db, ai_provider, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AIUnavailableError as e:
+        raise ai_unavailable(e)
+    except AIError as e:
+        raise HTTPException(status_code=502, detail=f"AI provider error: {e}")
+
+
+@router.post("/adapt/stream")
+async def adapt_resume_stream(
+    request: AdaptResumeRequest,
+    ai_provider: AIProvider = Depends(get_ai_provider),
+) -> StreamingResponse:
+    """Streaming variant of /resumes/adapt (text/event-stream).
+
+    Events:
+    - `delta`: `{"text": ...}` next piece of updated_resume_text
+    - `reset`: the provider retried; discard text received so far
+    - `result`: the same body /resumes/adapt returns, sent once persisted
+    - `error`: `{"status_code": ..., "detail": ...}`
+    """
+    validate_request(request)
+    stream = TokenStream(field="updated_resume_text")
+
+    async def run() -> AdaptResumeResponse:
+        # Own session: request-scoped dependencies may be torn down
+        # before a streaming body finishes.
+        async with AsyncSessionLocal() as session:
+            response = await run_adapt(session, ai_provider, request, stream)
+            await session.commit()
+            return response
+
+    return StreamingResponse(
+        relay_generation(stream, run),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
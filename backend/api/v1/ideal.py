@@ -1,20 +1,66 @@
 """Ideal resume generation endpoint (Stage 2)."""
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.ai.errors import AIError
-from backend.db import get_db
+from backend.ai.base import AIProvider
+from backend.ai.errors import AIError, AIUnavailableError
+from backend.ai.factory import get_ai_provider
+from backend.ai.streaming import TokenStream
+from backend.api.errors import ai_unavailable
+from backend.api.sse import SSE_HEADERS, relay_generation
+from backend.db import AsyncSessionLocal, get_db
 from backend.schemas import IdealResumeRequest, IdealResumeResponse, IdealResumeMetadata
 from backend.services import IdealResumeService
+from backend.services.ideal import IdealResumeResult
 
 router = APIRouter(prefix="/resumes", tags=["resumes"])
 
 
+def validate_request(request: IdealResumeRequest) -> None:
+    """Reject requests without a vacancy source."""
+    if not request.vacancy_text and not request.vacancy_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Either vacancy_text or vacancy_id must be provided",
+        )
+
+
+def _to_response(result: IdealResumeResult) -> IdealResumeResponse:
+    return IdealResumeResponse(
+        ideal_id=result.ideal_id,
+        vacancy_id=result.vacancy_id,
+        ideal_resume_text=result.ideal_resume_text,
+        metadata=IdealResumeMetadata(**result.metadata) if result.metadata else IdealResumeMetadata(),
+        cache_hit=result.cache_hit,
+    )
+
+
+async def run_ideal(
+    session: AsyncSession,
+    ai_provider: AIProvider,
+    request: IdealResumeRequest,
+    stream: Optional[TokenStream] = None,
+) -> IdealResumeResponse:
+    """Run generation for a request (shared by the sync, stream and job paths)."""
+    service = IdealResumeService(session, ai_provider)
+    result = await service.generate_ideal(
+        vacancy_text=request.vacancy_text,
+        vacancy_id=request.vacancy_id,
+        options=request.options.model_dump() if request.options else {},
+        stream=stream,
+    )
+    return _to_response(result)
+
+
 @router.post("/ideal", response_model=IdealResumeResponse)
 async def generate_ideal_resume(
     request: IdealResumeRequest,
     db: AsyncSession = Depends(get_db),
+    ai_provider: AIProvider = Depends(get_ai_provider),
 ) -> IdealResumeResponse:
     """Generate an ideal resume template for a vacancy.
 
@@ -29,30 +75,39 @@ async def generate_ideal_resume(
     The generated resume uses placeholder data (fake name, email etc.)
     and is meant as a reference/template, not a real person's resume.
     """
-    # Validate that at least one vacancy source is provided
-    if not request.vacancy_text and not request.vacancy_id:
-        raise HTTPException(
-            status_code=400,
-            detail="Either vacancy_text or vacancy_id must be provided",
-        )
-
-    service = IdealResumeService(db)
-
+    validate_request(request)
     try:
-        result = await service.generate_ideal(
-            vacancy_text=request.vacancy_text,
-            vacancy_id=request.vacancy_id,
-            options=request.options.model_dump() if request.options else {},
-        )
+        return await run_ideal(db, ai_provider, request)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except AIUnavailableError as e:
+        raise ai_unavailable(e)
     except AIError as e:
         raise HTTPException(status_code=502, detail=f"AI provider error: {e}")
 
-    return IdealResumeResponse(
-        ideal_id=result.ideal_id,
-        vacancy_id=result.vacancy_id,
-        ideal_resume_text=result.ideal_resume_text,
-        metadata=IdealResumeMetadata(**result.metadata) if result.metadata else IdealResumeMetadata(),
-        cache_hit=result.cache_hit,
+
+@router.post("/ideal/stream")
+async def generate_ideal_resume_stream(
+    request: IdealResumeRequest,
+    ai_provider: AIProvider = Depends(get_ai_provider),
+) -> StreamingResponse:
+    """Streaming variant of /resumes/ideal (text/event-stream).
+
+    Emits `delta` events with pieces of ideal_resume_text, then `result`
+    with the same body /resumes/ideal returns (or `error`). See
+    /resumes/adapt/stream for the event format.
+    """
+    validate_request(request)
+    stream = TokenStream(field="ideal_resume_text")
+
+    async def run() -> IdealResumeResponse:
+        async with AsyncSessionLocal() as session:
+            response = await run_ideal(session, ai_provider, request, stream)
+            await session.commit()
+            return response
+
+    return StreamingResponse(
+        relay_generation(stream, run),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
     )
@@ -0,0 +1,151 @@
+"""Asynchronous generation job endpoints.
+
+POST returns 202 with a job id at once; a background worker runs the same
+pipeline as /resumes/adapt or /resumes/ideal. Poll GET /jobs/{id} or
+subscribe to GET /jobs/{id}/events for the result.
+"""
+
+from typing import Any, AsyncIterator
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.ai.factory import get_ai_provider
+from backend.api.sse import SSE_HEADERS, sse_event
+from backend.core.config import settings
+from backend.db import AsyncSessionLocal, get_db
+from backend.models import GenerationJob
+from backend.schemas import (
+    AdaptResumeRequest,
+    IdealResumeRequest,
+    JobStatusResponse,
+    JobSubmitResponse,
+)
+from backend.services import JobService, job_workers
+
+from . import adapt as adapt_api
+from . import ideal as ideal_api
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+ADAPT_JOB = "adapt_resume"
+IDEAL_JOB = "ideal_resume"
+
+
+async def _run_adapt_job(session: AsyncSession, payload: dict[str, Any]) -> dict[str, Any]:
+    request = AdaptResumeRequest.model_validate(payload)
+    response = await adapt_api.run_adapt(session, get_ai_provider(), request)
+    return response.model_dump(mode="json")
+
+
+async def _run_ideal_job(session: AsyncSession, payload: dict[str, Any]) -> dict[str, Any]:
+    request = IdealResumeRequest.model_validate(payload)
+    response = await ideal_api.run_ideal(session, get_ai_provider(), request)
+    return response.model_dump(mode="json")
+
+
+job_workers.register(ADAPT_JOB, _run_adapt_job)
+job_workers.register(IDEAL_JOB, _run_ideal_job)
+
+
+def _to_status(job: GenerationJob) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        result=job.result,
+        error=job.error,
+        error_status=job.error_status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+async def _submit(
+    db: AsyncSession,
+    response: Response,
+    kind: str,
+    payload: dict[str, Any],
+) -> JobSubmitResponse:
+    job, created = await JobService(db).submit(kind, payload)
+    response.headers["Location"] = f"/v1/jobs/{job.id}"
+    return JobSubmitResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        deduplicated=not created,
+    )
+
+
+@router.post("/adapt", response_model=JobSubmitResponse, status_code=202)
+async def submit_adapt_job(
+    request: AdaptResumeRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+) -> JobSubmitResponse:
+    """Queue resume adaptation; same body as POST /resumes/adapt."""
+    adapt_api.validate_request(request)
+    return await _submit(db, response, ADAPT_JOB, request.model_dump(mode="json"))
+
+
+@router.post("/ideal", response_model=JobSubmitResponse, status_code=202)
+async def submit_ideal_job(
+    request: IdealResumeRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+) -> JobSubmitResponse:
+    """Queue ideal resume generation; same body as POST /resumes/ideal."""
+    ideal_api.validate_request(request)
+    return await _submit(db, response, IDEAL_JOB, request.model_dump(mode="json"))
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db),
+) -> JobStatusResponse:
+    """Get job status; `result` holds the response body once succeeded."""
+    job = await JobService(db).get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return _to_status(job)
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: UUID) -> StreamingResponse:
+    """Stream job status changes (text/event-stream).
+
+    Emits `status` on every change and ends with `result` (response body)
+    or `error` (`{"status_code": ..., "detail": ...}`).
+    """
+    async with AsyncSessionLocal() as session:
+        if await JobService(session).get(job_id) is None:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    async def events() -> AsyncIterator[bytes]:
+        last_status = None
+        while True:
+            # Short session per poll: no connection is held while waiting
+            async with AsyncSessionLocal() as session:
+                job = await JobService(session).get(job_id)
+            if job is None:
+                return
+            if job.status != last_status:
+                last_status = job.status
+                yield sse_event("status", {"status": job.status, "attempts": job.attempts})
+            if job.status == GenerationJob.STATUS_SUCCEEDED:
+                yield sse_event("result", job.result or {})
+                return
+            if job.status == GenerationJob.STATUS_FAILED:
+                yield sse_event(
+                    "error",
+                    {"status_code": job.error_status or 500, "detail": job.error},
+                )
+                return
+            await job_workers.wait_for_update(job_id, settings.job_poll_interval_seconds)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
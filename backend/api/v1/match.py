@@ -1,20 +1,97 @@
 """Match analysis endpoint."""
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.ai.errors import AIError
-from backend.db import get_db
-from backend.schemas import MatchAnalyzeRequest, MatchAnalyzeResponse
-from backend.services import OrchestratorService
+from backend.ai.base import AIProvider
+from backend.ai.errors import AIError, AIUnavailableError
+from backend.ai.factory import get_ai_provider
+from backend.ai.streaming import TokenStream
+from backend.api.errors import ai_unavailable
+from backend.api.sse import SSE_HEADERS, relay_generation
+from backend.db import AsyncSessionLocal, get_db
+from backend.core.config import settings
+from backend.schemas import (
+    MatchAnalyzeRequest,
+    MatchAnalyzeResponse,
+    MatchBatchItem,
+    MatchBatchRequest,
+    MatchBatchResponse,
+)
+from backend.services import BatchMatchService, OrchestratorService
+from backend.services.batch_match import BatchMatchItem, BatchMatchResult, BatchVacancy
+from backend.services.orchestrator import FullAnalysisResult
 
 router = APIRouter(prefix="/match", tags=["match"])
 
 
+def _to_response(result: FullAnalysisResult) -> MatchAnalyzeResponse:
+    return MatchAnalyzeResponse(
+        resume_id=result.resume_id,
+        vacancy_id=result.vacancy_id,
+        analysis_id=result.analysis_id,
+        analysis=result.analysis,
+        cache_hit=result.cache_hit,
+    )
+
+
+def _validate_batch(request: MatchBatchRequest) -> None:
+    """Reject batches without a resume, with empty vacancies or too many."""
+    if not request.resume_text and not request.resume_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Either resume_text or resume_id must be provided",
+        )
+    if len(request.vacancies) > settings.batch_match_max_vacancies:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.batch_match_max_vacancies} vacancies per batch",
+        )
+    for index, vacancy in enumerate(request.vacancies):
+        if not vacancy.vacancy_text and not vacancy.vacancy_id:
+            raise HTTPException(
+                status_code=400,
+                detail=f"vacancies[{index}]: either vacancy_text or vacancy_id must be provided",
+            )
+
+
+def _batch_vacancies(request: MatchBatchRequest) -> list[BatchVacancy]:
+    return [
+        BatchVacancy(vacancy_text=vacancy.vacancy_text, vacancy_id=vacancy.vacancy_id)
+        for vacancy in request.vacancies
+    ]
+
+
+def _to_batch_item(item: BatchMatchItem) -> MatchBatchItem:
+    return MatchBatchItem(
+        index=item.index,
+        vacancy_id=item.vacancy_id,
+        analysis_id=item.analysis_id,
+        score=item.score,
+        prescore=item.prescore,
+        shortlisted=item.shortlisted,
+        analysis=item.analysis,
+        cache_hit=item.cache_hit,
+        error=item.error,
+        status_code=item.status_code,
+    )
+
+
+def _to_batch_response(result: BatchMatchResult) -> MatchBatchResponse:
+    return MatchBatchResponse(
+        resume_id=result.resume_id,
+        items=[_to_batch_item(item) for item in result.items],
+        succeeded=result.succeeded,
+        failed=result.failed,
+    )
+
+
 @router.post("/analyze", response_model=MatchAnalyzeResponse)
 async def analyze_match(
     request: MatchAnalyzeRequest,
     db: AsyncSession = Depends(get_db),
+    ai_provider: AIProvider = Depends(get_ai_provider),
 ) -> MatchAnalyzeResponse:
     """Analyze resume-vacancy match.
 
@@ -25,16 +102,110 @@ async def analyze_match(
 
     Returns cache_hit=true only if ALL steps were from cache.
     """
-    service = OrchestratorService(db)
+    service = OrchestratorService(db, ai_provider)
     try:
         result = await service.run_analysis(request.resume_text, request.vacancy_text)
+    except AIUnavailableError as e:
+        raise ai_unavailable(e)
     except AIError as e:
         raise HTTPException(status_code=502, detail=f"AI provider error: {e}")
 
-    return MatchAnalyzeResponse(
-        resume_id=result.resume_id,
-        vacancy_id=result.vacancy_id,
-        analysis_id=result.analysis_id,
-        analysis=result.analysis,
-        cache_hit=result.cache_hit,
+    return _to_response(result)
+
+
+@router.post("/analyze/stream")
+async def analyze_match_stream(
+    request: MatchAnalyzeRequest,
+    ai_provider: AIProvider = Depends(get_ai_provider),
+) -> StreamingResponse:
+    """Streaming variant of /match/analyze (text/event-stream).
+
+    Emits a `field` event (`{"name": ..., "value": ...}`) for each top-level
+    field of the analysis as soon as the model finishes it (e.g. `score`),
+    then `result` with the same body /match/analyze returns (or `error`).
+    """
+    stream = TokenStream()
+
+    async def run() -> MatchAnalyzeResponse:
+        async with AsyncSessionLocal() as session:
+            service = OrchestratorService(session, ai_provider)
+            result = await service.run_analysis(
+                request.resume_text, request.vacancy_text, stream=stream
+            )
+            await session.commit()
+        return _to_response(result)
+
+    return StreamingResponse(
+        relay_generation(stream, run),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.post("/batch", response_model=MatchBatchResponse)
+async def match_batch(
+    request: MatchBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    ai_provider: AIProvider = Depends(get_ai_provider),
+) -> MatchBatchResponse:
+    """Rank one resume against many vacancies.
+
+    The resume is parsed once; vacancies are parsed and analyzed in
+    parallel (bounded by BATCH_MATCH_CONCURRENCY), reusing cached
+    analyses. A failing vacancy gets `error`/`status_code` in its item
+    instead of failing the request; items are ranked by score. With
+    `shortlist`, only the best N by local pre-score are sent to the LLM.
+    """
+    _validate_batch(request)
+    service = BatchMatchService(db, ai_provider)
+    try:
+        result = await service.run(
+            _batch_vacancies(request),
+            resume_text=request.resume_text,
+            resume_id=request.resume_id,
+            shortlist=request.shortlist,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AIUnavailableError as e:
+        raise ai_unavailable(e)
+    except AIError as e:
+        raise HTTPException(status_code=502, detail=f"AI provider error: {e}")
+
+    return _to_batch_response(result)
+
+
+@router.post("/batch/stream")
+async def match_batch_stream(
+    request: MatchBatchRequest,
+    ai_provider: AIProvider = Depends(get_ai_provider),
+) -> StreamingResponse:
+    """Streaming variant of /match/batch (text/event-stream).
+
+    Emits an `item` event (MatchBatchItem) as each vacancy finishes, in
+    completion order, then `result` with the ranked /match/batch body (or
+    `error` if the resume itself could not be parsed).
+    """
+    _validate_batch(request)
+    stream = TokenStream()
+
+    def publish(item: BatchMatchItem) -> None:
+        stream.publish("item", _to_batch_item(item).model_dump(mode="json"))
+
+    async def run() -> MatchBatchResponse:
+        async with AsyncSessionLocal() as session:
+            service = BatchMatchService(session, ai_provider)
+            result = await service.run(
+                _batch_vacancies(request),
+                resume_text=request.resume_text,
+                resume_id=request.resume_id,
+                shortlist=request.shortlist,
+                on_item=publish,
+            )
+        return _to_batch_response(result)
+
+    return StreamingResponse(
+        relay_generation(stream, run),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
     )
@@ -5,7 +5,10 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.ai.errors import AIError
+from backend.ai.base import AIProvider
+from backend.ai.errors import AIError, AIUnavailableError
+from backend.ai.factory import get_ai_provider
+from backend.api.errors import ai_unavailable
 from backend.db import get_db
 from backend.schemas import (
     ResumeParseRequest,
@@ -23,15 +26,18 @@ router = APIRouter(prefix="/resumes", tags=["resumes"])
 async def parse_resume(
     request: ResumeParseRequest,
     db: AsyncSession = Depends(get_db),
+    ai_provider: AIProvider = Depends(get_ai_provider),
 ) -> ResumeParseResponse:
     """Parse resume text and return structured data.
 
     - Caches results by content hash
     - Returns cache_hit=true if result was from cache
     """
-    service = ResumeService(db)
+    service = ResumeService(db, ai_provider)
     try:
         result = await service.parse_and_cache(request.resume_text)
+    except AIUnavailableError as e:
+        raise ai_unavailable(e)
     except AIError as e:
         raise HTTPException(status_code=502, detail=f"AI provider error: {e}")
 
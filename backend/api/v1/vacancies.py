@@ -5,7 +5,11 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.ai.errors import AIError
+from backend.ai.base import AIProvider
+from backend.ai.errors import AIError, AIUnavailableError
+from backend.ai.factory import get_ai_provider
+from backend.api.errors import ai_unavailable
+from backend.core.config import settings
 from backend.db import get_db
 from backend.schemas import (
     VacancyParseRequest,
@@ -23,27 +27,35 @@ router = APIRouter(prefix="/vacancies", tags=["vacancies"])
 async def parse_vacancy(
     request: VacancyParseRequest,
     db: AsyncSession = Depends(get_db),
+    ai_provider: AIProvider = Depends(get_ai_provider),
 ) -> VacancyParseResponse:
     """Parse vacancy text and return structured data.
 
     - Caches results by content hash
     - Returns cache_hit=true if result was from cache
     """
-    service = VacancyService(db)
+    service = VacancyService(db, ai_provider)
     
     text = request.vacancy_text
+    structured = None
     if not text and request.url:
-        from backend.services.scraper import WebScraper
+        from backend.services.scraper import web_scraper
         try:
-            text = await WebScraper.fetch_text(request.url)
+            page = await web_scraper.fetch_page(request.url)
         except ValueError as e:
             raise HTTPException(status_code=422, detail=str(e))
+        text, structured = page.text, page.structured
             
     if not text or len(text) < 10:
         raise HTTPException(status_code=422, detail="Vacancy text is empty or too short")
 
     try:
-        result = await service.parse_and_cache(text)
+        if structured is not None and structured.complete and settings.vacancy_structured_skip_llm:
+            result = await service.store_structured(structured)
+        else:
+            result = await service.parse_and_cache(text)
+    except AIUnavailableError as e:
+        raise ai_unavailable(e)
     except AIError as e:
         raise HTTPException(status_code=502, detail=f"AI provider error: {e}")
 
@@ -52,6 +64,8 @@ async def parse_vacancy(
         vacancy_hash=result.vacancy_hash,
         parsed_vacancy=result.parsed_vacancy,
         cache_hit=result.cache_hit,
+        extracted_by=result.extracted_by,
+        near_duplicate_of_id=result.near_duplicate_of,
     )
 
 
@@ -71,6 +85,7 @@ async def get_vacancy(
         source_text=vacancy.source_text,
         content_hash=vacancy.content_hash,
         parsed_data=vacancy.get_parsed_data(),
+        near_duplicate_of_id=vacancy.near_duplicate_of_id,
         created_at=vacancy.created_at,
         parsed_at=vacancy.parsed_at,
     )
@@ -99,6 +114,7 @@ async def update_vacancy_parsed_data(
         source_text=vacancy.source_text,
         content_hash=vacancy.content_hash,
         parsed_data=vacancy.get_parsed_data(),
+        near_duplicate_of_id=vacancy.near_duplicate_of_id,
         created_at=vacancy.created_at,
         parsed_at=vacancy.parsed_at,
     )
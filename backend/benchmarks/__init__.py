@@ -0,0 +1 @@
+"""Manual micro-benchmarks (not imported by the application)."""
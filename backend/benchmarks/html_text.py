@@ -0,0 +1,117 @@
+"""Micro-benchmark for vacancy page cleaning (services/html_text.py).
+
+Compares the single-pass lxml extractor with the original BeautifulSoup
+implementation on job-board-sized pages: generated ones by default, or
+saved pages passed with --html. For each page it prints both timings and
+whether the extracted texts are identical.
+
+Usage (from repository root):
+    python -m backend.benchmarks.html_text [--html page.html ...] [--url URL]
+
+BeautifulSoup is only needed for the comparison (pip install beautifulsoup4).
+"""
+
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.html_text import html_to_text  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # comparison is skipped
+    BeautifulSoup = None
+
+
+def legacy_clean_html(html: str) -> str:
+    """Original WebScraper._clean_html, kept verbatim as the reference."""
+    soup = BeautifulSoup(html, "lxml")
+
+    for tag in soup(["script", "style", "nav", "footer", "header", "iframe", "svg", "noscript"]):
+        tag.decompose()
+
+    for tag in soup.find_all(True):
+        attrs = str(tag.attrs).lower()
+        if any(x in attrs for x in ["cookie", "banner", "popup", "sidebar", "ad-", "related-"]):
+            tag.decompose()
+
+    text = soup.get_text(separator="\n")
+
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = "\n".join(chunk for chunk in chunks if chunk)
+
+    return text[:30000]
+
+
+WORDS = ["Python", "FastAPI", "PostgreSQL", "опыт", "разработки", "Docker", "команда", "задачи"]
+
+
+def sample_page(description_chars: int = 6000, noise_blocks: int = 400, seed: int = 42) -> str:
+    """Job-board-like page: heavy scripts, menus and widgets around a description."""
+    rng = random.Random(seed)
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 14)))
+
+    parts = ["<html><head><title>Senior Python Developer</title>"]
+    parts += [f"<script>window.__state{i} = {{{'x' * 2000!r}: 1}};</script>" for i in range(20)]
+    parts.append("<style>" + "body{margin:0}" * 500 + "</style></head><body>")
+    parts.append("<header><nav>" + "".join(f"<a href='/m{i}'>Menu {i}</a>" for i in range(80)) + "</nav></header>")
+    parts.append("<div class='cookie-consent'>We use cookies</div>")
+    parts.append("<main><div class='vacancy'><h1>Senior Python Developer</h1><div data-qa='vacancy-description'>")
+    size = 0
+    while size < description_chars:
+        text = sentence()
+        size += len(text)
+        parts.append(f"<p>{text}</p>" if rng.random() < 0.7 else f"<ul><li>{text}</li></ul>")
+    parts.append("</div></div>")
+    for i in range(noise_blocks):
+        css = rng.choice(["card", "sidebar-item", "related-vacancy", "banner-slot", "tile"])
+        parts.append(
+            f"<div class='{css}' data-id='{i}'><a href='/vacancy/{i}'>{sentence()}</a>"
+            f"<span class='salary'>{rng.randint(100, 400)} 000 ₽</span></div>"
+        )
+    parts.append("</main><footer>" + "<p>footer</p>" * 50 + "</footer></body></html>")
+    return "".join(parts)
+
+
+def benchmark(pages: list[tuple[str, str]], url: str, number: int) -> None:
+    for label, html in pages:
+        print(f"{label}: {len(html) / 1024:.0f} KiB")
+        current = timeit.timeit(lambda: html_to_text(html), number=number) / number
+        print(f"  current (generic): {current * 1e3:8.2f} ms")
+        if url:
+            site = timeit.timeit(lambda: html_to_text(html, url=url), number=number) / number
+            print(f"  current ({url}): {site * 1e3:8.2f} ms")
+        if BeautifulSoup is None:
+            print("  legacy: skipped (beautifulsoup4 is not installed)")
+            continue
+        legacy = timeit.timeit(lambda: legacy_clean_html(html), number=number) / number
+        same = legacy_clean_html(html) == html_to_text(html)
+        print(f"  legacy:            {legacy * 1e3:8.2f} ms  ({legacy / current:.1f}x slower)")
+        print(f"  identical text:    {same}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--html", nargs="*", default=[], help="saved HTML pages")
+    parser.add_argument("--url", default="https://hh.ru/vacancy/1", help="URL for the site extractor")
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = [(path, Path(path).read_text(encoding="utf-8", errors="replace")) for path in args.html]
+    if not pages:
+        pages = [
+            ("generated small", sample_page(description_chars=3000, noise_blocks=100)),
+            ("generated large", sample_page(description_chars=12000, noise_blocks=1500)),
+        ]
+    benchmark(pages, args.url, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Micro-benchmark for normalize_text against the original implementation.
+
+Both are timed on resume-sized texts. Equivalence (identical output, so
+existing content_hash values stay valid) is asserted by
+backend/tests/test_normalize_text.py.
+
+Usage (from repository root):
+    python -m backend.benchmarks.normalize_text [--number N]
+"""
+
+import argparse
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.utils import normalize_text  # noqa: E402
+
+
+def legacy_normalize_text(text: str) -> str:
+    """Original implementation, kept verbatim as the reference."""
+    text = text.strip()
+    text = text.replace("\t", " ")
+    text = re.sub(r" +", " ", text)
+    text = re.sub(r"\n\s*\n+", "\n\n", text)
+    lines = [line.strip() for line in text.split("\n")]
+    text = "\n".join(lines)
+    return text
+
+
+def sample_resume(chars: int = 15000, noisy: bool = False) -> str:
+    """Resume-like text; `noisy` adds indentation and trailing spaces."""
+    rng = random.Random(42)
+    words = ["Python", "FastAPI", "PostgreSQL", "опыт", "разработки", "Docker", "team", "lead"]
+    parts = []
+    while sum(len(p) for p in parts) < chars:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(3, 12)))
+        if noisy:
+            line = rng.choice(["", "  ", "\t"]) + line + rng.choice(["", " ", "  "])
+        parts.append(line)
+        parts.append(rng.choices(["\n", "\n\n", "\n  \n\n"], [75, 20, 5])[0])
+    return "".join(parts)[:chars]
+
+
+def benchmark(number: int = 300) -> None:
+    for label, text in (("clean", sample_resume()), ("noisy", sample_resume(noisy=True))):
+        for name, fn in (("legacy", legacy_normalize_text), ("current", normalize_text)):
+            seconds = timeit.timeit(lambda: fn(text), number=number)
+            print(f"{label:>5} {name:>8}: {seconds / number * 1e6:8.1f} us per 15k-char resume")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=300)
+    args = parser.parse_args()
+    benchmark(args.number)
+
+
+if __name__ == "__main__":
+    main()
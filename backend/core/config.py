@@ -1,10 +1,13 @@
 """Application settings loaded from environment variables."""
 
 from pathlib import Path
+from typing import Optional
 
-from pydantic import computed_field
+from pydantic import Field, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from backend.core.simhash import MAX_INDEXED_DISTANCE
+
 # Корень проекта (edtonai/)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 
@@ -32,20 +35,35 @@ class Settings(BaseSettings):
     postgres_host: str
     postgres_port: int
     postgres_db: str
+    # Full URL override (e.g. for Supabase with special flags)
+    database_url_override: Optional[str] = Field(
+        default=None, validation_alias="DATABASE_URL"
+    )
 
     @computed_field
     @property
     def database_url(self) -> str:
         """Build DATABASE_URL from separate credentials."""
-        # Allow direct override if set (e.g. for Supabase with special flags)
-        if hasattr(self, "DATABASE_URL") and self.DATABASE_URL:
-            return self.DATABASE_URL
-            
+        if self.database_url_override:
+            return self.database_url_override
+
         return (
             f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}"
             f"@{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    # Database connection pool (SQLAlchemy + asyncpg)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_prepared_statement_cache_size: int = 100
+    # Transaction-mode PgBouncer / Supabase pooler: no server-side
+    # prepared statement reuse across transactions
+    db_pgbouncer: bool = False
+
     # AI provider
     ai_provider: str = "deepseek"
     deepseek_api_key: str
@@ -55,6 +73,78 @@ class Settings(BaseSettings):
     ai_max_retries: int
     ai_temperature: float
     ai_max_tokens: int
+    # Fresh generations to request when the output is cut off; output cut
+    # at max_tokens is retried with a doubled budget up to this cap
+    ai_truncation_retries: int = 1
+    ai_truncation_max_tokens: int = 8192
+
+    # AI HTTP connection pool (one shared client, opened in app lifespan)
+    ai_http2: bool = True
+    ai_max_connections: int = 20
+    ai_max_keepalive_connections: int = 10
+    ai_keepalive_expiry_seconds: float = 30.0
+
+    # Retry backoff and circuit breaker for the AI provider
+    ai_retry_base_delay_seconds: float = 0.5
+    ai_retry_max_delay_seconds: float = 20.0
+    ai_breaker_failure_threshold: int = 5
+    ai_breaker_reset_seconds: float = 30.0
+
+    # Outbound LLM limiter (0 disables a rate budget). Lower priority value
+    # is admitted first when calls queue.
+    ai_max_in_flight: int = 16
+    ai_requests_per_minute: int = 0
+    ai_tokens_per_minute: int = 0
+    ai_queue_timeout_seconds: float = 30.0
+    ai_operation_priorities: dict[str, int] = {
+        "parse_resume": 0,
+        "parse_vacancy": 0,
+        "analyze_match": 1,
+        "validate_json": 1,
+        "adapt_resume": 2,
+        "ideal_resume": 3,
+    }
+
+    # Cross-worker single-flight via Postgres advisory locks (ignored with
+    # db_pgbouncer: session-level locks leak behind a transaction pooler)
+    ai_singleflight_advisory_lock: bool = False
+    # Longest a worker polls for another worker's result before generating itself
+    ai_singleflight_lock_wait_seconds: float = 180.0
+
+    # In-memory tier in front of the AIResult cache table
+    ai_cache_max_bytes: int = 64 * 1024 * 1024
+    ai_cache_ttl_seconds: int = 3600
+    ai_cache_redis_url: Optional[str] = None
+
+    # Batch matching (one resume against many vacancies)
+    batch_match_max_vacancies: int = 200
+    batch_match_concurrency: int = 8
+
+    # Vacancy URL fetching: one pooled client, per-URL text cache revalidated
+    # with ETag/Last-Modified once older than the fresh window
+    scraper_timeout_seconds: float = 12.0
+    scraper_max_connections: int = 20
+    scraper_per_host_concurrency: int = 2
+    scraper_cache_max_entries: int = 1000
+    scraper_cache_fresh_seconds: float = 600.0
+    scraper_cache_ttl_seconds: float = 86400.0
+    # Read JobPosting JSON-LD / job board APIs; skip the LLM parse when the
+    # data has a title and skills
+    vacancy_extractors_enabled: bool = True
+    vacancy_structured_skip_llm: bool = True
+    # Serve the parse of a near-identical vacancy (SimHash Hamming distance;
+    # capped at what the band index is guaranteed to find). Off until the
+    # threshold is tuned on real data
+    vacancy_near_duplicate_enabled: bool = False
+    vacancy_near_duplicate_max_distance: int = Field(
+        default=MAX_INDEXED_DISTANCE, ge=0, le=MAX_INDEXED_DISTANCE
+    )
+
+    # Background generation jobs (0 workers: this node only enqueues)
+    job_workers: int = 2
+    job_poll_interval_seconds: float = 2.0
+    job_max_attempts: int = 3
+    job_stale_after_seconds: float = 900.0
 
     # Logging
     log_level: str
@@ -0,0 +1,50 @@
+"""Central JSON serialization for hashing, prompts and API responses.
+
+Everything goes through orjson, a hard dependency: cache keys are digests
+of `dumps_canonical` output, and a second backend would format floats
+(`1e16` vs `1e+16`), NaN/Infinity and wide integers differently, silently
+changing keys between installs. Canonical form is sorted keys, compact
+separators, raw UTF-8; NaN and Infinity are written as null, and integers
+wider than 64 bits raise TypeError.
+"""
+
+import hashlib
+from typing import Any, Union
+
+import orjson
+from fastapi.responses import JSONResponse
+
+_CANONICAL_OPTS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+_PRETTY_OPTS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
+def dumps_canonical(obj: Any) -> bytes:
+    """Serialize to canonical bytes (sorted keys, compact) for hashing."""
+    return orjson.dumps(obj, option=_CANONICAL_OPTS)
+
+
+def dumps_pretty(obj: Any) -> str:
+    """Serialize with 2-space indent and raw Unicode for prompt embedding."""
+    return orjson.dumps(obj, option=_PRETTY_OPTS).decode("utf-8")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to compact UTF-8 bytes."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON; raises json.JSONDecodeError on invalid input."""
+    return orjson.loads(data)
+
+
+def canonical_digest(obj: Any) -> str:
+    """SHA-256 hex digest of the canonical serialization of obj."""
+    return hashlib.sha256(dumps_canonical(obj)).hexdigest()
+
+
+class FastJSONResponse(JSONResponse):
+    """Default API response class rendering through orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,74 @@
+"""64-bit SimHash fingerprints for near-duplicate text detection.
+
+Texts are reduced to lowercase word 3-shingles, so line breaks, spacing
+and punctuation do not matter and a changed header or footer only flips a
+few bits. Two fingerprints within Hamming distance 3 always share at least
+one of their four 16-bit bands (pigeonhole), which lets Postgres find
+candidates with plain equality lookups on indexed band columns.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import Optional
+
+BITS = 64
+BAND_COUNT = 4
+BAND_BITS = BITS // BAND_COUNT
+# Largest distance the band index is guaranteed to find
+MAX_INDEXED_DISTANCE = BAND_COUNT - 1
+
+SHINGLE_WORDS = 3
+# Shorter texts have too few features for a meaningful fingerprint
+MIN_FEATURES = 20
+
+_MASK = (1 << BITS) - 1
+_WORD_RE = re.compile(r"\w+")
+# For each bit of a byte, the byte values that have it set
+_BYTES_WITH_BIT = [[value for value in range(256) if value >> bit & 1] for bit in range(8)]
+
+
+def simhash64(text: str) -> Optional[int]:
+    """Unsigned 64-bit SimHash of a text; None if the text is too short.
+
+    Per-feature hashes are tallied byte-wise (256 buckets per byte
+    position), so summing the 64 bit columns costs a fixed 16k additions
+    instead of 64 per shingle.
+    """
+    words = _WORD_RE.findall(text.lower())
+    features = Counter(
+        " ".join(words[i : i + SHINGLE_WORDS])
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    )
+    if len(features) < MIN_FEATURES:
+        return None
+
+    buckets = [[0] * 256 for _ in range(BITS // 8)]
+    for feature, weight in features.items():
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        for position, byte in enumerate(digest):
+            buckets[position][byte] += weight
+
+    half = sum(features.values()) / 2
+    fingerprint = 0
+    for position, counts in enumerate(buckets):
+        for bit, values in enumerate(_BYTES_WITH_BIT):
+            if sum(counts[value] for value in values) > half:
+                fingerprint |= 1 << (position * 8 + bit)
+    return fingerprint
+
+
+def simhash_bands(fingerprint: int) -> tuple[int, ...]:
+    """Split a fingerprint into BAND_COUNT unsigned 16-bit bands."""
+    fingerprint &= _MASK
+    return tuple(
+        (fingerprint >> (band * BAND_BITS)) & ((1 << BAND_BITS) - 1)
+        for band in range(BAND_COUNT)
+    )
+
+
+def to_signed64(fingerprint: int) -> int:
+    """Map an unsigned fingerprint to the BIGINT range for storage."""
+    fingerprint &= _MASK
+    return fingerprint - (1 << BITS) if fingerprint >> (BITS - 1) else fingerprint
+
@@ -1,6 +1,21 @@
 """Database module: session management and base model."""
 
-from .session import get_db, get_session, async_engine, AsyncSessionLocal
+from .session import (
+    get_db,
+    get_session,
+    async_engine,
+    AsyncSessionLocal,
+    pool_snapshot,
+    release_connection,
+)
 from .base import Base
 
-__all__ = ["get_db", "get_session", "async_engine", "AsyncSessionLocal", "Base"]
+__all__ = [
+    "get_db",
+    "get_session",
+    "async_engine",
+    "AsyncSessionLocal",
+    "pool_snapshot",
+    "release_connection",
+    "Base",
+]
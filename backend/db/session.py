@@ -1,15 +1,43 @@
 """Async database session management."""
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
+from uuid import uuid4
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from backend.core.config import settings
 
+
+def _connect_args() -> dict[str, Any]:
+    """asyncpg connection arguments for statement caching.
+
+    Behind a transaction-mode pooler (PgBouncer, Supabase) consecutive
+    transactions may land on different server connections, so prepared
+    statements must not be cached or reused by name.
+    """
+    if settings.db_pgbouncer:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+    }
+
+
 async_engine = create_async_engine(
     settings.database_url,
     echo=False,
     future=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout_seconds,
+    pool_recycle=settings.db_pool_recycle_seconds,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args=_connect_args(),
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -20,6 +48,52 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+class PoolStats:
+    """Checkout counters for the engine's connection pool."""
+
+    def __init__(self) -> None:
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.connects = 0
+
+    def on_checkout(self, *_: Any) -> None:
+        self.checkouts += 1
+        self.checked_out += 1
+        self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def on_checkin(self, *_: Any) -> None:
+        self.checked_out = max(0, self.checked_out - 1)
+
+    def on_connect(self, *_: Any) -> None:
+        self.connects += 1
+
+
+pool_stats = PoolStats()
+event.listen(async_engine.sync_engine, "checkout", pool_stats.on_checkout)
+event.listen(async_engine.sync_engine, "checkin", pool_stats.on_checkin)
+event.listen(async_engine.sync_engine, "connect", pool_stats.on_connect)
+
+
+def pool_snapshot() -> dict[str, Any]:
+    """Return pool occupancy for monitoring.
+
+    `checked_out` close to `size + max_overflow` means requests are about
+    to wait up to DB_POOL_TIMEOUT_SECONDS for a connection.
+    """
+    pool = async_engine.pool
+    return {
+        "size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "checked_out": pool_stats.checked_out,
+        "max_checked_out": pool_stats.max_checked_out,
+        "idle": pool.checkedin(),
+        "checkouts": pool_stats.checkouts,
+        "connects": pool_stats.connects,
+        "pgbouncer": settings.db_pgbouncer,
+    }
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for FastAPI to get async database session."""
     async with AsyncSessionLocal() as session:
@@ -31,5 +105,16 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+async def release_connection(session: AsyncSession) -> None:
+    """End the session's transaction so its pooled connection is returned.
+
+    Call before slow non-DB work such as an LLM request. Loaded objects stay
+    usable (expire_on_commit=False); the next statement checks a connection
+    out of the pool again.
+    """
+    if session.in_transaction():
+        await session.commit()
+
+
 # Alias for consistency
 get_session = get_db
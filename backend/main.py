@@ -1,5 +1,6 @@
 """FastAPI application entry point."""
 
+import logging
 import uuid
 from contextlib import asynccontextmanager
 
@@ -7,24 +8,44 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
+from backend.ai.registry import ai_registry
 from backend.api import v1_router
 from backend.core.config import settings, MAX_RESUME_CHARS, MAX_VACANCY_CHARS
+from backend.core.serialization import FastJSONResponse
 from backend.core.logging import setup_logging, request_id_ctx
-from backend.db import async_engine, Base, AsyncSessionLocal
+from backend.db import async_engine, Base, AsyncSessionLocal, pool_snapshot
+from backend.repositories.result_cache import ai_result_cache
+from backend.services.jobs import job_workers
+from backend.services.prescore import prescore_agreement
+from backend.services.scraper import web_scraper
+from backend.services.vacancy import near_duplicate_stats
+from backend.services.singleflight import llm_singleflight
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Application lifespan: create tables on startup."""
+    """Application lifespan: create tables and open shared clients on startup."""
     setup_logging()
+    if settings.ai_singleflight_advisory_lock and settings.db_pgbouncer:
+        logging.getLogger(__name__).warning(
+            "AI_SINGLEFLIGHT_ADVISORY_LOCK is ignored with DB_PGBOUNCER: "
+            "session-level advisory locks leak behind a transaction pooler"
+        )
+    await ai_registry.startup()
 
     # Create tables (for development; use Alembic in production)
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    await job_workers.start(settings.job_workers)
+
     yield
 
     # Cleanup
+    await job_workers.stop()
+    await ai_registry.shutdown()
+    await ai_result_cache.close()
+    await web_scraper.close()
     await async_engine.dispose()
 
 
@@ -33,6 +54,7 @@ app = FastAPI(
     description="API for adapting resumes to job vacancies using AI",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 
@@ -79,5 +101,20 @@ async def get_limits():
     }
 
 
+@app.get("/v1/metrics", tags=["config"])
+async def get_metrics():
+    """Get in-process runtime metrics for monitoring."""
+    return {
+        "ai": ai_registry.snapshot(),
+        "singleflight": llm_singleflight.snapshot(),
+        "ai_result_cache": ai_result_cache.snapshot(),
+        "jobs": job_workers.snapshot(),
+        "prescore": prescore_agreement.snapshot(),
+        "scraper": web_scraper.snapshot(),
+        "vacancy_near_duplicates": near_duplicate_stats.snapshot(),
+        "db_pool": pool_snapshot(),
+    }
+
+
 # Include API routers
 app.include_router(v1_router)
@@ -0,0 +1,12 @@
+-- Migration: Add parsed_digest (canonical SHA-256 of parsed JSON) for composite cache keys
+-- Created: 2026-10-17
+-- Existing rows are backfilled lazily by the application on first read.
+
+ALTER TABLE resume_raw
+ADD COLUMN IF NOT EXISTS parsed_digest VARCHAR(64);
+
+ALTER TABLE vacancy_raw
+ADD COLUMN IF NOT EXISTS parsed_digest VARCHAR(64);
+
+ALTER TABLE ai_result
+ADD COLUMN IF NOT EXISTS parsed_digest VARCHAR(64);
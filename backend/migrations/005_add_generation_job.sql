@@ -0,0 +1,29 @@
+-- Migration: Add generation_job queue table for asynchronous adapt/ideal generation
+-- Created: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS generation_job (
+    id UUID PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    dedup_key VARCHAR(64) NOT NULL,
+    payload JSONB NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    result JSONB,
+    error TEXT,
+    error_status INTEGER,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after TIMESTAMP NOT NULL DEFAULT NOW(),
+    locked_by VARCHAR(100),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- One queued/running job per identical request
+CREATE UNIQUE INDEX IF NOT EXISTS uq_generation_job_active_dedup
+ON generation_job(dedup_key)
+WHERE status IN ('queued', 'running');
+
+-- Claim query: WHERE status = 'queued' AND run_after <= NOW()
+CREATE INDEX IF NOT EXISTS ix_generation_job_status_run_after
+ON generation_job(status, run_after);
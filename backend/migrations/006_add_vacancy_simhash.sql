@@ -0,0 +1,19 @@
+-- Migration: Add SimHash near-duplicate index and reuse link to vacancy_raw
+-- Created: 2026-10-17
+-- Fingerprints are computed by the application (backend/core/simhash.py) when
+-- a vacancy row is inserted; older rows have NULL and are never candidates.
+
+ALTER TABLE vacancy_raw
+ADD COLUMN IF NOT EXISTS simhash BIGINT,
+ADD COLUMN IF NOT EXISTS simhash_band0 INTEGER,
+ADD COLUMN IF NOT EXISTS simhash_band1 INTEGER,
+ADD COLUMN IF NOT EXISTS simhash_band2 INTEGER,
+ADD COLUMN IF NOT EXISTS simhash_band3 INTEGER,
+ADD COLUMN IF NOT EXISTS near_duplicate_of_id UUID
+    REFERENCES vacancy_raw(id) ON DELETE SET NULL;
+
+-- Candidate lookup: band0 = ? OR band1 = ? OR band2 = ? OR band3 = ? (BitmapOr)
+CREATE INDEX IF NOT EXISTS ix_vacancy_raw_simhash_band0 ON vacancy_raw(simhash_band0);
+CREATE INDEX IF NOT EXISTS ix_vacancy_raw_simhash_band1 ON vacancy_raw(simhash_band1);
+CREATE INDEX IF NOT EXISTS ix_vacancy_raw_simhash_band2 ON vacancy_raw(simhash_band2);
+CREATE INDEX IF NOT EXISTS ix_vacancy_raw_simhash_band3 ON vacancy_raw(simhash_band3);
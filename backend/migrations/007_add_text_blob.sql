@@ -0,0 +1,62 @@
+-- Migration: Store version texts once in content-addressed text_blob rows
+-- Created: 2026-10-17
+-- Existing texts are moved uncompressed (codec 'plain'; Postgres still
+-- TOAST-compresses them). New blobs are zlib-compressed by the application.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS text_blob (
+    hash VARCHAR(64) PRIMARY KEY,
+    codec VARCHAR(10) NOT NULL,
+    data BYTEA NOT NULL,
+    size INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- One blob per distinct text (SHA-256 of the UTF-8 bytes, as in TextBlob.encode)
+INSERT INTO text_blob (hash, codec, data, size)
+SELECT encode(sha256(raw), 'hex'), 'plain', raw, octet_length(raw)
+FROM (
+    SELECT convert_to(resume_text, 'UTF8') AS raw FROM user_version
+    UNION SELECT convert_to(vacancy_text, 'UTF8') FROM user_version
+    UNION SELECT convert_to(result_text, 'UTF8') FROM user_version
+    UNION SELECT convert_to(text, 'UTF8') FROM resume_version
+) AS texts
+ON CONFLICT (hash) DO NOTHING;
+
+-- user_version: three text columns -> hashes
+ALTER TABLE user_version
+ADD COLUMN IF NOT EXISTS resume_text_hash VARCHAR(64) REFERENCES text_blob(hash),
+ADD COLUMN IF NOT EXISTS vacancy_text_hash VARCHAR(64) REFERENCES text_blob(hash),
+ADD COLUMN IF NOT EXISTS result_text_hash VARCHAR(64) REFERENCES text_blob(hash);
+
+UPDATE user_version SET
+    resume_text_hash = encode(sha256(convert_to(resume_text, 'UTF8')), 'hex'),
+    vacancy_text_hash = encode(sha256(convert_to(vacancy_text, 'UTF8')), 'hex'),
+    result_text_hash = encode(sha256(convert_to(result_text, 'UTF8')), 'hex');
+
+ALTER TABLE user_version
+ALTER COLUMN resume_text_hash SET NOT NULL,
+ALTER COLUMN vacancy_text_hash SET NOT NULL,
+ALTER COLUMN result_text_hash SET NOT NULL,
+DROP COLUMN resume_text,
+DROP COLUMN vacancy_text,
+DROP COLUMN result_text;
+
+-- resume_version: text -> hash
+ALTER TABLE resume_version
+ADD COLUMN IF NOT EXISTS text_hash VARCHAR(64) REFERENCES text_blob(hash);
+
+UPDATE resume_version SET text_hash = encode(sha256(convert_to(text, 'UTF8')), 'hex');
+
+ALTER TABLE resume_version
+ALTER COLUMN text_hash SET NOT NULL,
+DROP COLUMN text;
+
+-- Reference checks for TextBlobRepository.delete_unreferenced
+CREATE INDEX IF NOT EXISTS ix_user_version_resume_text_hash ON user_version(resume_text_hash);
+CREATE INDEX IF NOT EXISTS ix_user_version_vacancy_text_hash ON user_version(vacancy_text_hash);
+CREATE INDEX IF NOT EXISTS ix_user_version_result_text_hash ON user_version(result_text_hash);
+CREATE INDEX IF NOT EXISTS ix_resume_version_text_hash ON resume_version(text_hash);
+
+COMMIT;
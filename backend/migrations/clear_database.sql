@@ -6,17 +6,23 @@
 
 -- Clear all tables in correct order (respecting foreign keys)
 TRUNCATE TABLE 
+    generation_job,
     user_version,
     resume_version,
     ideal_resume,
     analysis_link,
     ai_result,
     vacancy_raw,
-    resume_raw
+    resume_raw,
+    text_blob
 CASCADE;
 
 -- Reset sequences if needed
 -- (PostgreSQL UUIDs don't use sequences, so this is just for any auto-increment IDs)
 
+-- Cached ai_result rows outlive this script: restart the backend workers
+-- (in-process cache) and, with AI_CACHE_REDIS_URL set, delete the Redis
+-- keys, e.g. redis-cli --scan --pattern 'ai_result:*' | xargs redis-cli del
+
 -- Confirm
 SELECT 'Database cleared successfully' as status;
@@ -1,5 +1,6 @@
 """ORM models for Stage 1, Stage 2, and Stage 3."""
 
+from .text_blob import TextBlob
 from .resume import ResumeRaw
 from .vacancy import VacancyRaw
 from .ai_result import AIResult
@@ -7,6 +8,7 @@ from .analysis_link import AnalysisLink
 from .resume_version import ResumeVersion
 from .ideal_resume import IdealResume
 from .user_version import UserVersion
+from .generation_job import GenerationJob
 
 __all__ = [
     "ResumeRaw",
@@ -16,4 +18,6 @@ __all__ = [
     "ResumeVersion",
     "IdealResume",
     "UserVersion",
+    "GenerationJob",
+    "TextBlob",
 ]
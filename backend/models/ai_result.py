@@ -39,6 +39,11 @@ class AIResult(Base):
         JSONB,
         nullable=False,
     )
+    # Canonical digest of output_json, used in downstream cache keys
+    parsed_digest: Mapped[Optional[str]] = mapped_column(
+        String(64),
+        nullable=True,
+    )
     model: Mapped[Optional[str]] = mapped_column(
         String(100),
         nullable=True,
@@ -0,0 +1,116 @@
+"""GenerationJob ORM model - queued long-running LLM generation."""
+
+import uuid
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import Text, String, Integer, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.db.base import Base
+
+
+class GenerationJob(Base):
+    """Queued adapt/ideal generation processed by background workers.
+
+    Workers on any node claim rows with FOR UPDATE SKIP LOCKED. The partial
+    unique index on dedup_key allows only one queued/running job per
+    identical request.
+    """
+
+    __tablename__ = "generation_job"
+    __table_args__ = (
+        Index(
+            "uq_generation_job_active_dedup",
+            "dedup_key",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        Index("ix_generation_job_status_run_after", "status", "run_after"),
+    )
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    kind: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        comment="adapt_resume | ideal_resume",
+    )
+    # Canonical digest of kind + payload
+    dedup_key: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+    )
+    # Request body as submitted
+    payload: Mapped[dict[str, Any]] = mapped_column(
+        JSONB,
+        nullable=False,
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default=STATUS_QUEUED,
+        comment="queued | running | succeeded | failed",
+    )
+    # Response body of the equivalent synchronous endpoint
+    result: Mapped[Optional[dict[str, Any]]] = mapped_column(
+        JSONB,
+        nullable=True,
+    )
+    error: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    # HTTP status the synchronous endpoint would have returned
+    error_status: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    # Not claimable before this time (backoff after provider unavailability)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False,
+    )
+    locked_by: Mapped[Optional[str]] = mapped_column(
+        String(100),
+        nullable=True,
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True,
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime,
+        nullable=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False,
+    )
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
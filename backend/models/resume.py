@@ -8,6 +8,7 @@ from sqlalchemy import Text, String, DateTime
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
+from backend.core.serialization import canonical_digest
 from backend.db.base import Base
 
 
@@ -94,6 +95,13 @@ class ResumeRaw(Base):
         default=dict,
     )
     
+    # Canonical digest of get_parsed_data(); refreshed whenever parsed data
+    # is written and used to build composite cache keys without re-hashing
+    parsed_digest: Mapped[Optional[str]] = mapped_column(
+        String(64),
+        nullable=True,
+    )
+    
     # ============ METADATA ============
     
     created_at: Mapped[datetime] = mapped_column(
@@ -136,3 +144,9 @@ class ResumeRaw(Base):
         self.certifications = data.get("certifications", [])
         self.languages = data.get("languages", [])
         self.raw_sections = data.get("raw_sections", {})
+        self.refresh_parsed_digest()
+    
+    def refresh_parsed_digest(self) -> str:
+        """Recompute parsed_digest from the current parsed columns."""
+        self.parsed_digest = canonical_digest(self.get_parsed_data())
+        return self.parsed_digest
@@ -4,18 +4,19 @@ import uuid
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlalchemy import Text, String, DateTime, ForeignKey
+from sqlalchemy import String, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.db.base import Base
+from backend.models.text_blob import TextBlob
 
 
 class ResumeVersion(Base):
     """Version of adapted resume with change history.
 
     Stores:
-    - Full text of the adapted resume
+    - Full text of the adapted resume (by hash, in text_blob)
     - Change log from LLM (what was changed and where)
     - Reference to parent version for history/rollback
     - Selected checkbox IDs that user chose for adaptation
@@ -54,9 +55,11 @@ class ResumeVersion(Base):
     )
 
     # Full adapted resume text
-    text: Mapped[str] = mapped_column(
-        Text,
+    text_hash: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("text_blob.hash"),
         nullable=False,
+        index=True,
     )
 
     # Change log from LLM: [{checkbox_id, what_changed, where, before_excerpt, after_excerpt}]
@@ -112,3 +115,11 @@ class ResumeVersion(Base):
     vacancy = relationship("VacancyRaw", foreign_keys=[vacancy_id])
     parent_version = relationship("ResumeVersion", remote_side=[id], foreign_keys=[parent_version_id])
     analysis = relationship("AIResult", foreign_keys=[analysis_id])
+    # Never loaded implicitly; see ResumeVersionRepository.get_by_id(with_text=True)
+    text_blob: Mapped[TextBlob] = relationship(
+        foreign_keys=[text_hash], lazy="raise", viewonly=True
+    )
+
+    @property
+    def text(self) -> str:
+        return self.text_blob.text
@@ -0,0 +1,64 @@
+"""TextBlob ORM model - content-addressed, compressed text storage."""
+
+import hashlib
+import zlib
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Integer, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.db.base import Base
+
+CODEC_ZLIB = "zlib"
+CODEC_PLAIN = "plain"
+# Below this many bytes zlib's header outweighs the savings
+MIN_COMPRESS_BYTES = 256
+
+
+class TextBlob(Base):
+    """One distinct text, stored once and referenced by its SHA-256.
+
+    Version tables point at blobs instead of repeating the same resume and
+    vacancy text in every row. Rows are immutable: the same hash always
+    means the same text.
+    """
+
+    __tablename__ = "text_blob"
+
+    # SHA-256 (hex) of the exact UTF-8 text, not of normalize_text()
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    # "zlib", or "plain" for short texts and rows moved by migration 007
+    codec: Mapped[str] = mapped_column(String(10), nullable=False)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    # Uncompressed size in bytes
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False,
+    )
+
+    @classmethod
+    def encode(cls, text: str) -> dict[str, Any]:
+        """Column values for a text."""
+        raw = text.encode("utf-8")
+        codec, data = CODEC_PLAIN, raw
+        if len(raw) >= MIN_COMPRESS_BYTES:
+            compressed = zlib.compress(raw, 6)
+            if len(compressed) < len(raw):
+                codec, data = CODEC_ZLIB, compressed
+        return {
+            "hash": hashlib.sha256(raw).hexdigest(),
+            "codec": codec,
+            "data": data,
+            "size": len(raw),
+        }
+
+    @property
+    def text(self) -> str:
+        data = zlib.decompress(self.data) if self.codec == CODEC_ZLIB else self.data
+        return bytes(data).decode("utf-8")
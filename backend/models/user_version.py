@@ -4,18 +4,21 @@ import uuid
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlalchemy import Text, String, DateTime
+from sqlalchemy import String, DateTime, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.db.base import Base
+from backend.models.text_blob import TextBlob
 
 
 class UserVersion(Base):
     """Standalone version storage for frontend history feature.
     
     Unlike ResumeVersion, this doesn't require foreign keys to parsed documents.
-    It stores the raw text inputs and result for easy retrieval.
+    It stores the raw text inputs and result for easy retrieval. Texts live
+    in text_blob (one row per distinct text) and are referenced by hash;
+    load the *_blob relationships explicitly to read them.
     """
 
     __tablename__ = "user_version"
@@ -39,21 +42,27 @@ class UserVersion(Base):
     )
 
     # Original resume text
-    resume_text: Mapped[str] = mapped_column(
-        Text,
+    resume_text_hash: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("text_blob.hash"),
         nullable=False,
+        index=True,
     )
 
     # Vacancy text used for adaptation
-    vacancy_text: Mapped[str] = mapped_column(
-        Text,
+    vacancy_text_hash: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("text_blob.hash"),
         nullable=False,
+        index=True,
     )
 
     # Result text (adapted or ideal resume)
-    result_text: Mapped[str] = mapped_column(
-        Text,
+    result_text_hash: Mapped[str] = mapped_column(
+        String(64),
+        ForeignKey("text_blob.hash"),
         nullable=False,
+        index=True,
     )
 
     # Change log from adaptation
@@ -81,3 +90,26 @@ class UserVersion(Base):
         onupdate=datetime.utcnow,
         nullable=False,
     )
+
+    # Blobs are never loaded implicitly (listing must not read texts)
+    resume_blob: Mapped[TextBlob] = relationship(
+        foreign_keys=[resume_text_hash], lazy="raise", viewonly=True
+    )
+    vacancy_blob: Mapped[TextBlob] = relationship(
+        foreign_keys=[vacancy_text_hash], lazy="raise", viewonly=True
+    )
+    result_blob: Mapped[TextBlob] = relationship(
+        foreign_keys=[result_text_hash], lazy="raise", viewonly=True
+    )
+
+    @property
+    def resume_text(self) -> str:
+        return self.resume_blob.text
+
+    @property
+    def vacancy_text(self) -> str:
+        return self.vacancy_blob.text
+
+    @property
+    def result_text(self) -> str:
+        return self.result_blob.text
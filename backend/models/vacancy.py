@@ -4,10 +4,12 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import Text, String, DateTime
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
+from backend.core.serialization import canonical_digest
+from backend.core.simhash import simhash_bands, to_signed64
 from backend.db.base import Base
 
 
@@ -22,6 +24,13 @@ class VacancyRaw(Base):
     """
 
     __tablename__ = "vacancy_raw"
+    __table_args__ = (
+        # Near-duplicate candidates: any band equal (see core/simhash.py)
+        Index("ix_vacancy_raw_simhash_band0", "simhash_band0"),
+        Index("ix_vacancy_raw_simhash_band1", "simhash_band1"),
+        Index("ix_vacancy_raw_simhash_band2", "simhash_band2"),
+        Index("ix_vacancy_raw_simhash_band3", "simhash_band3"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -98,6 +107,29 @@ class VacancyRaw(Base):
         default=list,
     )
     
+    # Canonical digest of get_parsed_data(); refreshed whenever parsed data
+    # is written and used to build composite cache keys without re-hashing
+    parsed_digest: Mapped[Optional[str]] = mapped_column(
+        String(64),
+        nullable=True,
+    )
+    
+    # ============ NEAR-DUPLICATE INDEX ============
+    
+    # 64-bit SimHash of source_text (stored signed) and its four 16-bit bands
+    simhash: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    simhash_band0: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    simhash_band1: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    simhash_band2: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    simhash_band3: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    
+    # Vacancy whose parsed data was served for this near-copy (audit link only)
+    near_duplicate_of_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("vacancy_raw.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    
     # ============ METADATA ============
     
     created_at: Mapped[datetime] = mapped_column(
@@ -142,3 +174,22 @@ class VacancyRaw(Base):
         self.experience_requirements = data.get("experience_requirements")
         self.responsibilities = data.get("responsibilities", [])
         self.ats_keywords = data.get("ats_keywords", [])
+        self.refresh_parsed_digest()
+    
+    def refresh_parsed_digest(self) -> str:
+        """Recompute parsed_digest from the current parsed columns."""
+        self.parsed_digest = canonical_digest(self.get_parsed_data())
+        return self.parsed_digest
+    
+    @staticmethod
+    def simhash_columns(fingerprint: Optional[int]) -> Dict[str, Optional[int]]:
+        """Column values for a SimHash fingerprint (all None without one)."""
+        if fingerprint is None:
+            bands: tuple[Optional[int], ...] = (None,) * 4
+            signed = None
+        else:
+            bands = simhash_bands(fingerprint)
+            signed = to_signed64(fingerprint)
+        columns = {f"simhash_band{i}": band for i, band in enumerate(bands)}
+        columns["simhash"] = signed
+        return columns
@@ -7,6 +7,8 @@ from .analysis import AnalysisRepository
 from .resume_version import ResumeVersionRepository
 from .ideal_resume import IdealResumeRepository
 from .user_version import UserVersionRepository
+from .generation_job import GenerationJobRepository
+from .text_blob import TextBlobRepository
 
 __all__ = [
     # Stage 1
@@ -19,4 +21,7 @@ __all__ = [
     "IdealResumeRepository",
     # Stage 3
     "UserVersionRepository",
+    "TextBlobRepository",
+    # Job queue
+    "GenerationJobRepository",
 ]
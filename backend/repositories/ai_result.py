@@ -6,7 +6,10 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.core.serialization import canonical_digest
 from backend.models import AIResult
+from backend.repositories.result_cache import CachedResult, ai_result_cache
+from backend.repositories.upsert import insert_or_get
 
 
 class AIResultRepository:
@@ -16,13 +19,45 @@ class AIResultRepository:
         self.session = session
 
     async def get(self, operation: str, input_hash: str) -> Optional[AIResult]:
-        """Get cached AI result by operation and input hash."""
+        """Get cached AI result by operation and input hash.
+
+        Served from the in-process tier when possible; the returned object is
+        then detached from the session and must be treated as read-only.
+        """
+        cached = await ai_result_cache.get(operation, input_hash)
+        if cached is not None:
+            return AIResult(
+                id=cached.id,
+                operation=cached.operation,
+                input_hash=cached.input_hash,
+                output_json=cached.output_json,
+                provider=cached.provider,
+                model=cached.model,
+                parsed_digest=cached.parsed_digest,
+            )
+
         stmt = select(AIResult).where(
             AIResult.operation == operation,
             AIResult.input_hash == input_hash,
         )
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        ai_result = result.scalar_one_or_none()
+        if ai_result is not None:
+            if ai_result.parsed_digest is None:
+                # Backfill rows written before parsed_digest existed
+                ai_result.parsed_digest = canonical_digest(ai_result.output_json)
+            await ai_result_cache.put(
+                CachedResult(
+                    id=ai_result.id,
+                    operation=ai_result.operation,
+                    input_hash=ai_result.input_hash,
+                    output_json=ai_result.output_json,
+                    provider=ai_result.provider,
+                    model=ai_result.model,
+                    parsed_digest=ai_result.parsed_digest,
+                )
+            )
+        return ai_result
 
     async def get_by_id(self, result_id: UUID) -> Optional[AIResult]:
         """Get AI result by ID."""
@@ -39,15 +74,24 @@ class AIResultRepository:
         model: Optional[str] = None,
         error: Optional[str] = None,
     ) -> AIResult:
-        """Save AI result to cache."""
-        ai_result = AIResult(
-            operation=operation,
-            input_hash=input_hash,
-            output_json=output_json,
-            provider=provider,
-            model=model,
-            error=error,
+        """Save AI result to cache.
+
+        If a concurrent request already stored the same (operation, input_hash),
+        the existing row is returned (insert_or_get), so no unique violation
+        can abort the transaction after an expensive LLM call.
+        """
+        ai_result, _ = await insert_or_get(
+            self.session,
+            AIResult,
+            {
+                "operation": operation,
+                "input_hash": input_hash,
+                "output_json": output_json,
+                "parsed_digest": canonical_digest(output_json),
+                "provider": provider,
+                "model": model,
+                "error": error,
+            },
+            index_elements=["operation", "input_hash"],
         )
-        self.session.add(ai_result)
-        await self.session.flush()
         return ai_result
@@ -5,6 +5,7 @@ from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from backend.models import AnalysisLink
 
@@ -43,3 +44,29 @@ class AnalysisRepository:
         self.session.add(link)
         await self.session.flush()
         return link
+
+    async def get_latest_with_documents(
+        self,
+        resume_id: UUID,
+        vacancy_id: UUID,
+    ) -> Optional[AnalysisLink]:
+        """Get the newest link for a pair with resume, vacancy and analysis loaded.
+
+        Everything is fetched in a single round trip via joined eager loads.
+        """
+        stmt = (
+            select(AnalysisLink)
+            .where(
+                AnalysisLink.resume_id == resume_id,
+                AnalysisLink.vacancy_id == vacancy_id,
+            )
+            .options(
+                joinedload(AnalysisLink.resume),
+                joinedload(AnalysisLink.vacancy),
+                joinedload(AnalysisLink.analysis_result),
+            )
+            .order_by(AnalysisLink.created_at.desc())
+            .limit(1)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
@@ -0,0 +1,161 @@
+"""Repository for GenerationJob model (Postgres-backed job queue)."""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import GenerationJob
+
+_ACTIVE_STATUSES = (GenerationJob.STATUS_QUEUED, GenerationJob.STATUS_RUNNING)
+
+
+class GenerationJobRepository:
+    """Queue operations for GenerationJob."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.logger = logging.getLogger(__name__)
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        dedup_key: str,
+    ) -> tuple[GenerationJob, bool]:
+        """Queue a job unless an identical one is queued or running.
+
+        Returns (job, created). The insert relies on the partial unique
+        index, so concurrent identical submissions resolve to one job.
+        """
+        for _ in range(3):
+            stmt = (
+                insert(GenerationJob)
+                .values(kind=kind, payload=payload, dedup_key=dedup_key)
+                .on_conflict_do_nothing(
+                    index_elements=[GenerationJob.dedup_key],
+                    index_where=text("status IN ('queued', 'running')"),
+                )
+                .returning(GenerationJob)
+            )
+            created = (await self.session.execute(stmt)).scalar_one_or_none()
+            if created is not None:
+                self.logger.info("Enqueued %s job: %s", kind, created.id)
+                return created, True
+
+            existing = await self.get_active_by_dedup_key(dedup_key)
+            if existing is not None:
+                return existing, False
+            # The conflicting job finished between the two statements; retry
+
+        raise RuntimeError(f"Could not enqueue {kind} job {dedup_key[:16]}")
+
+    async def get_by_id(self, job_id: UUID) -> Optional[GenerationJob]:
+        result = await self.session.execute(
+            select(GenerationJob).where(GenerationJob.id == job_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_active_by_dedup_key(self, dedup_key: str) -> Optional[GenerationJob]:
+        result = await self.session.execute(
+            select(GenerationJob).where(
+                GenerationJob.dedup_key == dedup_key,
+                GenerationJob.status.in_(_ACTIVE_STATUSES),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def claim(self, worker_id: str) -> Optional[GenerationJob]:
+        """Atomically take the oldest runnable job.
+
+        FOR UPDATE SKIP LOCKED lets workers on every node poll the same
+        table without blocking on or double-claiming each other's rows.
+        """
+        now = datetime.utcnow()
+        next_job = (
+            select(GenerationJob.id)
+            .where(
+                GenerationJob.status == GenerationJob.STATUS_QUEUED,
+                GenerationJob.run_after <= now,
+            )
+            .order_by(GenerationJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(GenerationJob)
+            .where(GenerationJob.id == next_job)
+            .values(
+                status=GenerationJob.STATUS_RUNNING,
+                locked_by=worker_id,
+                started_at=now,
+                attempts=GenerationJob.attempts + 1,
+                updated_at=now,
+            )
+            .returning(GenerationJob)
+            .execution_options(synchronize_session=False)
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def mark_succeeded(self, job_id: UUID, result: dict[str, Any]) -> None:
+        await self._finish(
+            job_id,
+            status=GenerationJob.STATUS_SUCCEEDED,
+            result=result,
+            error=None,
+            error_status=None,
+        )
+
+    async def mark_failed(self, job_id: UUID, error: str, error_status: int) -> None:
+        await self._finish(
+            job_id,
+            status=GenerationJob.STATUS_FAILED,
+            error=error,
+            error_status=error_status,
+        )
+
+    async def requeue(self, job_id: UUID, delay_seconds: float, error: str) -> None:
+        """Put a running job back in the queue after a transient failure."""
+        now = datetime.utcnow()
+        await self.session.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id)
+            .values(
+                status=GenerationJob.STATUS_QUEUED,
+                run_after=now + timedelta(seconds=delay_seconds),
+                locked_by=None,
+                error=error,
+                updated_at=now,
+            )
+        )
+
+    async def requeue_stale(self, older_than_seconds: float) -> int:
+        """Return jobs stuck in running (e.g. their worker died) to the queue."""
+        now = datetime.utcnow()
+        result = await self.session.execute(
+            update(GenerationJob)
+            .where(
+                GenerationJob.status == GenerationJob.STATUS_RUNNING,
+                GenerationJob.started_at < now - timedelta(seconds=older_than_seconds),
+            )
+            .values(
+                status=GenerationJob.STATUS_QUEUED,
+                locked_by=None,
+                run_after=now,
+                updated_at=now,
+            )
+        )
+        return result.rowcount or 0
+
+    async def _finish(self, job_id: UUID, **values: Any) -> None:
+        now = datetime.utcnow()
+        await self.session.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id)
+            .values(finished_at=now, updated_at=now, locked_by=None, **values)
+        )
@@ -8,6 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models import IdealResume
+from backend.repositories.upsert import insert_or_get
 
 
 class IdealResumeRepository:
@@ -29,21 +30,29 @@ class IdealResumeRepository:
         model: Optional[str] = None,
         prompt_version: Optional[str] = None,
     ) -> IdealResume:
-        """Create a new ideal resume record."""
-        ideal = IdealResume(
-            vacancy_id=vacancy_id,
-            vacancy_hash=vacancy_hash,
-            text=text,
-            generation_metadata=generation_metadata,
-            options=options,
-            input_hash=input_hash,
-            provider=provider,
-            model=model,
-            prompt_version=prompt_version,
+        """Create a new ideal resume record.
+
+        A concurrent request that stored the same input_hash first wins; its
+        row is returned.
+        """
+        ideal, created = await insert_or_get(
+            self.session,
+            IdealResume,
+            {
+                "vacancy_id": vacancy_id,
+                "vacancy_hash": vacancy_hash,
+                "text": text,
+                "generation_metadata": generation_metadata,
+                "options": options,
+                "input_hash": input_hash,
+                "provider": provider,
+                "model": model,
+                "prompt_version": prompt_version,
+            },
+            index_elements=["input_hash"],
         )
-        self.session.add(ideal)
-        await self.session.flush()
-        self.logger.info("Created ideal resume: %s", ideal.id)
+        if created:
+            self.logger.info("Created ideal resume: %s", ideal.id)
         return ideal
 
     async def get_by_id(self, ideal_id: UUID) -> Optional[IdealResume]:
@@ -0,0 +1,191 @@
+"""In-process LRU/TTL tier in front of the AIResult table.
+
+Entries are keyed by (operation, input_hash) and bounded by the estimated
+size of their output JSON in bytes, not by entry count. An optional shared
+tier (Redis) sits between this process and Postgres so hot results survive
+restarts and are shared across workers.
+
+The app never deletes AIResult rows, so entries are only dropped by TTL
+or eviction. After clearing the table out of band (clear_database.sql)
+restart the workers and delete the `ai_result:*` keys from Redis.
+"""
+
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+from backend.core.config import settings
+from backend.core.serialization import dumps, loads
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResult:
+    """Detached copy of an AIResult row.
+
+    output_json is shared between readers and must be treated as read-only.
+    """
+
+    id: uuid.UUID
+    operation: str
+    input_hash: str
+    output_json: dict[str, Any]
+    provider: Optional[str]
+    model: Optional[str]
+    parsed_digest: Optional[str] = None
+
+    def to_json(self) -> bytes:
+        return dumps(
+            {
+                "id": str(self.id),
+                "operation": self.operation,
+                "input_hash": self.input_hash,
+                "output_json": self.output_json,
+                "provider": self.provider,
+                "model": self.model,
+                "parsed_digest": self.parsed_digest,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, raw: Union[str, bytes]) -> "CachedResult":
+        data = loads(raw)
+        return cls(
+            id=uuid.UUID(data["id"]),
+            operation=data["operation"],
+            input_hash=data["input_hash"],
+            output_json=data["output_json"],
+            provider=data.get("provider"),
+            model=data.get("model"),
+            parsed_digest=data.get("parsed_digest"),
+        )
+
+
+class ResultCache:
+    """Byte-bounded LRU with TTL and an optional Redis tier."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl_seconds: int,
+        redis_url: Optional[str] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.redis_url = redis_url
+        self._entries: OrderedDict[tuple[str, str], tuple[CachedResult, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._redis = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, operation: str, input_hash: str) -> Optional[CachedResult]:
+        """Look up the memory tier, then the shared tier."""
+        key = (operation, input_hash)
+        entry = self._entries.get(key)
+        if entry is not None:
+            cached, _, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self._remove(key)
+
+        shared = await self._shared_get(key)
+        if shared is not None:
+            self.shared_hits += 1
+            self._put_local(key, shared, len(shared.to_json()))
+            return shared
+
+        self.misses += 1
+        return None
+
+    async def put(self, cached: CachedResult) -> None:
+        """Store a result in both tiers."""
+        if self.max_bytes <= 0:
+            return
+        key = (cached.operation, cached.input_hash)
+        payload = cached.to_json()
+        self._put_local(key, cached, len(payload))
+        await self._shared_set(key, payload)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return counters for monitoring."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "shared_tier": bool(self.redis_url and aioredis is not None),
+        }
+
+    def _put_local(self, key: tuple[str, str], cached: CachedResult, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (cached, size, time.monotonic() + self.ttl_seconds)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _get_redis(self):
+        if self._redis is None and self.redis_url and aioredis is not None:
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+    @staticmethod
+    def _redis_key(key: tuple[str, str]) -> str:
+        return f"ai_result:{key[0]}:{key[1]}"
+
+    async def _shared_get(self, key: tuple[str, str]) -> Optional[CachedResult]:
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(self._redis_key(key))
+        except Exception as exc:  # shared tier is best-effort
+            logger.warning("result_cache_shared_get_failed | error=%s", exc)
+            return None
+        return CachedResult.from_json(raw) if raw is not None else None
+
+    async def _shared_set(self, key: tuple[str, str], payload: bytes) -> None:
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.set(self._redis_key(key), payload, ex=self.ttl_seconds)
+        except Exception as exc:  # shared tier is best-effort
+            logger.warning("result_cache_shared_set_failed | error=%s", exc)
+
+
+ai_result_cache = ResultCache(
+    max_bytes=settings.ai_cache_max_bytes,
+    ttl_seconds=settings.ai_cache_ttl_seconds,
+    redis_url=settings.ai_cache_redis_url,
+)
@@ -8,6 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models import ResumeRaw
+from backend.repositories.upsert import insert_or_get
 
 
 class ResumeRepository:
@@ -28,12 +29,24 @@ class ResumeRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def create(self, source_text: str, content_hash: str) -> ResumeRaw:
-        """Create new resume record."""
-        resume = ResumeRaw(source_text=source_text, content_hash=content_hash)
-        self.session.add(resume)
-        await self.session.flush()
-        return resume
+    async def get_or_create(
+        self, source_text: str, content_hash: str
+    ) -> tuple[ResumeRaw, bool]:
+        """Get resume by content hash, creating it if missing.
+
+        Returns (resume, created). A hit is a single SELECT; only a miss
+        sends the text, via insert_or_get, which is safe against concurrent
+        identical inserts.
+        """
+        resume = await self.get_by_hash(content_hash)
+        if resume is not None:
+            return resume, False
+        return await insert_or_get(
+            self.session,
+            ResumeRaw,
+            {"source_text": source_text, "content_hash": content_hash},
+            index_elements=["content_hash"],
+        )
 
     async def update_parsed_data(
         self, resume_id: UUID, parsed_data: Dict[str, Any]
@@ -64,6 +77,7 @@ class ResumeRepository:
             raise ValueError(f"Field {field} is not allowed")
         
         setattr(resume, field, value)
+        resume.refresh_parsed_digest()
         resume.parsed_at = datetime.utcnow()
         await self.session.flush()
         return resume
@@ -6,8 +6,11 @@ from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from backend.models import ResumeVersion
+from backend.repositories.text_blob import TextBlobRepository
 
 
 class ResumeVersionRepository:
@@ -15,6 +18,7 @@ class ResumeVersionRepository:
 
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+        self.blob_repo = TextBlobRepository(session)
         self.logger = logging.getLogger(__name__)
 
     async def create(
@@ -30,11 +34,12 @@ class ResumeVersionRepository:
         model: Optional[str] = None,
         prompt_version: Optional[str] = None,
     ) -> ResumeVersion:
-        """Create a new resume version."""
+        """Create a new resume version; an already stored text is not rewritten."""
+        (text_blob,) = await self.blob_repo.put_many([text])
         version = ResumeVersion(
             resume_id=resume_id,
             vacancy_id=vacancy_id,
-            text=text,
+            text_hash=text_blob.hash,
             change_log=change_log,
             selected_checkbox_ids=selected_checkbox_ids,
             analysis_id=analysis_id,
@@ -45,14 +50,20 @@ class ResumeVersionRepository:
         )
         self.session.add(version)
         await self.session.flush()
+        set_committed_value(version, "text_blob", text_blob)
         self.logger.info("Created resume version: %s", version.id)
         return version
 
-    async def get_by_id(self, version_id: UUID) -> Optional[ResumeVersion]:
-        """Get resume version by ID."""
-        result = await self.session.execute(
-            select(ResumeVersion).where(ResumeVersion.id == version_id)
-        )
+    async def get_by_id(
+        self,
+        version_id: UUID,
+        with_text: bool = False,
+    ) -> Optional[ResumeVersion]:
+        """Get resume version by ID; `with_text` also loads its text."""
+        query = select(ResumeVersion).where(ResumeVersion.id == version_id)
+        if with_text:
+            query = query.options(joinedload(ResumeVersion.text_blob, innerjoin=True))
+        result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
     async def get_versions_for_resume(
@@ -60,7 +71,10 @@ class ResumeVersionRepository:
         resume_id: UUID,
         vacancy_id: Optional[UUID] = None,
     ) -> list[ResumeVersion]:
-        """Get all versions for a resume, optionally filtered by vacancy."""
+        """Get all versions for a resume, optionally filtered by vacancy.
+
+        Texts are not loaded; use get_by_id(with_text=True) for one version.
+        """
         query = select(ResumeVersion).where(ResumeVersion.resume_id == resume_id)
         if vacancy_id:
             query = query.where(ResumeVersion.vacancy_id == vacancy_id)
@@ -0,0 +1,77 @@
+"""Repository for content-addressed text blobs."""
+
+import logging
+from typing import Iterable
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import ResumeVersion, TextBlob, UserVersion
+
+
+class TextBlobRepository:
+    """Store texts once by SHA-256 and resolve hashes back to texts."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.logger = logging.getLogger(__name__)
+
+    async def put_many(self, texts: Iterable[str]) -> list[TextBlob]:
+        """Store texts that are not stored yet; returns blobs in input order.
+
+        One INSERT ... ON CONFLICT DO NOTHING for all distinct texts, so a
+        text already referenced by other versions costs no extra write. The
+        returned blobs are not attached to the session.
+        """
+        blobs: dict[str, TextBlob] = {}
+        ordered: list[TextBlob] = []
+        for text in texts:
+            values = TextBlob.encode(text)
+            blob = blobs.get(values["hash"])
+            if blob is None:
+                blob = blobs[values["hash"]] = TextBlob(**values)
+            ordered.append(blob)
+        if blobs:
+            stmt = insert(TextBlob).values(
+                [
+                    {
+                        "hash": blob.hash,
+                        "codec": blob.codec,
+                        "data": blob.data,
+                        "size": blob.size,
+                    }
+                    for blob in blobs.values()
+                ]
+            )
+            await self.session.execute(stmt.on_conflict_do_nothing(index_elements=["hash"]))
+        return ordered
+
+    async def get_many(self, hashes: Iterable[str]) -> dict[str, str]:
+        """Texts by hash; unknown hashes are left out."""
+        keys = set(hashes)
+        if not keys:
+            return {}
+        result = await self.session.execute(select(TextBlob).where(TextBlob.hash.in_(keys)))
+        return {blob.hash: blob.text for blob in result.scalars()}
+
+    async def delete_unreferenced(self) -> int:
+        """Delete blobs no version points at (maintenance; not run per request).
+
+        Versions share blobs, so deleting a version never deletes its texts
+        directly. Run this periodically, not concurrently with writes that
+        may be about to reference a blob it removes.
+        """
+        referenced = [
+            exists().where(UserVersion.resume_text_hash == TextBlob.hash),
+            exists().where(UserVersion.vacancy_text_hash == TextBlob.hash),
+            exists().where(UserVersion.result_text_hash == TextBlob.hash),
+            exists().where(ResumeVersion.text_hash == TextBlob.hash),
+        ]
+        result = await self.session.execute(
+            delete(TextBlob).where(*(~condition for condition in referenced))
+        )
+        await self.session.flush()
+        if result.rowcount:
+            self.logger.info("Deleted unreferenced text blobs: %d", result.rowcount)
+        return result.rowcount
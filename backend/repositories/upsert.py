@@ -0,0 +1,47 @@
+"""Single-statement get-or-create for rows with a natural unique key."""
+
+from typing import Any, Sequence, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+ModelT = TypeVar("ModelT")
+
+
+async def insert_or_get(
+    session: AsyncSession,
+    model: type[ModelT],
+    values: dict[str, Any],
+    index_elements: Sequence[str],
+) -> tuple[ModelT, bool]:
+    """Insert a row or return the one already holding its unique key.
+
+    Returns (row, created). INSERT ... ON CONFLICT DO NOTHING RETURNING
+    returns the new row; on a conflict it writes and locks nothing, and
+    the existing row is read with a plain SELECT. Concurrent identical
+    writes never raise a unique violation that would abort the
+    transaction: the INSERT waits for the other transaction, and the
+    SELECT then sees its committed row.
+    """
+    stmt = (
+        insert(model)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=list(index_elements))
+        .returning(model)
+    )
+    lookup = select(model).where(
+        *(getattr(model, column) == values[column] for column in index_elements)
+    )
+    # A conflicting row deleted before the SELECT sees it: insert again
+    for _ in range(3):
+        result = await session.execute(
+            stmt, execution_options={"populate_existing": True}
+        )
+        row = result.scalar_one_or_none()
+        if row is not None:
+            return row, True
+        row = (await session.execute(lookup)).scalar_one_or_none()
+        if row is not None:
+            return row, False
+    raise RuntimeError(f"insert_or_get: {model.__name__} row keeps disappearing")
@@ -6,8 +6,11 @@ from uuid import UUID
 
 from sqlalchemy import select, func, delete
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from backend.models import UserVersion
+from backend.repositories.text_blob import TextBlobRepository
 
 
 class UserVersionRepository:
@@ -15,6 +18,7 @@ class UserVersionRepository:
 
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+        self.blob_repo = TextBlobRepository(session)
         self.logger = logging.getLogger(__name__)
 
     async def create(
@@ -27,25 +31,38 @@ class UserVersionRepository:
         change_log: list[dict] = None,
         selected_checkbox_ids: list[str] = None,
     ) -> UserVersion:
-        """Create a new user version."""
+        """Create a new user version; texts already stored are not rewritten."""
+        resume_blob, vacancy_blob, result_blob = await self.blob_repo.put_many(
+            [resume_text, vacancy_text, result_text]
+        )
         version = UserVersion(
             type=type,
             title=title,
-            resume_text=resume_text,
-            vacancy_text=vacancy_text,
-            result_text=result_text,
+            resume_text_hash=resume_blob.hash,
+            vacancy_text_hash=vacancy_blob.hash,
+            result_text_hash=result_blob.hash,
             change_log=change_log or [],
             selected_checkbox_ids=selected_checkbox_ids or [],
         )
         self.session.add(version)
         await self.session.flush()
+        # Texts are at hand; make them readable without another query
+        set_committed_value(version, "resume_blob", resume_blob)
+        set_committed_value(version, "vacancy_blob", vacancy_blob)
+        set_committed_value(version, "result_blob", result_blob)
         self.logger.info("Created user version: %s", version.id)
         return version
 
     async def get_by_id(self, version_id: UUID) -> Optional[UserVersion]:
-        """Get user version by ID."""
+        """Get user version by ID, with its texts."""
         result = await self.session.execute(
-            select(UserVersion).where(UserVersion.id == version_id)
+            select(UserVersion)
+            .where(UserVersion.id == version_id)
+            .options(
+                joinedload(UserVersion.resume_blob, innerjoin=True),
+                joinedload(UserVersion.vacancy_blob, innerjoin=True),
+                joinedload(UserVersion.result_blob, innerjoin=True),
+            )
         )
         return result.scalar_one_or_none()
 
@@ -54,7 +71,10 @@ class UserVersionRepository:
         limit: int = 50,
         offset: int = 0,
     ) -> tuple[list[UserVersion], int]:
-        """List versions with pagination, ordered by created_at desc."""
+        """List versions with pagination, ordered by created_at desc.
+
+        Texts are not loaded (rows only hold their hashes).
+        """
         # Get total count
         count_result = await self.session.execute(
             select(func.count()).select_from(UserVersion)
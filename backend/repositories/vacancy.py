@@ -1,13 +1,15 @@
 """Vacancy repository for database operations."""
 
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import cast, func, or_, select
+from sqlalchemy.dialects.postgresql import BIT
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models import VacancyRaw
+from backend.repositories.upsert import insert_or_get
 
 
 class VacancyRepository:
@@ -28,12 +30,74 @@ class VacancyRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def create(self, source_text: str, content_hash: str) -> VacancyRaw:
-        """Create new vacancy record."""
-        vacancy = VacancyRaw(source_text=source_text, content_hash=content_hash)
-        self.session.add(vacancy)
-        await self.session.flush()
-        return vacancy
+    async def get_or_create(
+        self,
+        source_text: str,
+        content_hash: str,
+        fingerprint: Optional[Callable[[str], Optional[int]]] = None,
+    ) -> tuple[VacancyRaw, bool]:
+        """Get vacancy by content hash, creating it if missing.
+
+        Returns (vacancy, created). A hit is a single SELECT; only a miss
+        sends the text, via insert_or_get, which is safe against concurrent
+        identical inserts. `fingerprint` (e.g. core/simhash.py: simhash64)
+        is only called, and its value written, when a row is inserted.
+        """
+        vacancy = await self.get_by_hash(content_hash)
+        if vacancy is not None:
+            return vacancy, False
+        return await insert_or_get(
+            self.session,
+            VacancyRaw,
+            {
+                "source_text": source_text,
+                "content_hash": content_hash,
+                **VacancyRaw.simhash_columns(
+                    fingerprint(source_text) if fingerprint else None
+                ),
+            },
+            index_elements=["content_hash"],
+        )
+
+    async def find_near_duplicate(
+        self,
+        vacancy: VacancyRaw,
+        max_distance: int,
+    ) -> Optional[tuple[VacancyRaw, int]]:
+        """Closest parsed vacancy within `max_distance` SimHash bits.
+
+        Candidates share at least one 16-bit band (four indexed equality
+        lookups). The exact distance is computed and filtered in SQL
+        (`bit_count`, Postgres 14+) and the closest one is loaded, so common
+        band values cannot crowd the true match out. Returns
+        (vacancy, distance) or None.
+        """
+        if vacancy.simhash is None:
+            return None
+        distance = func.bit_count(
+            cast(VacancyRaw.simhash.op("#")(vacancy.simhash), BIT(64))
+        ).label("distance")
+        stmt = (
+            select(VacancyRaw.id, distance)
+            .where(
+                or_(
+                    VacancyRaw.simhash_band0 == vacancy.simhash_band0,
+                    VacancyRaw.simhash_band1 == vacancy.simhash_band1,
+                    VacancyRaw.simhash_band2 == vacancy.simhash_band2,
+                    VacancyRaw.simhash_band3 == vacancy.simhash_band3,
+                ),
+                VacancyRaw.id != vacancy.id,
+                VacancyRaw.parsed_at.is_not(None),
+                distance <= max_distance,
+            )
+            .order_by(distance, VacancyRaw.created_at)
+            .limit(1)
+        )
+        best = (await self.session.execute(stmt)).first()
+        if best is None:
+            return None
+        match = await self.get_by_id(best.id)
+        return (match, best.distance) if match is not None else None
 
     async def update_parsed_data(
         self, vacancy_id: UUID, parsed_data: Dict[str, Any]
@@ -65,6 +129,7 @@ class VacancyRepository:
             raise ValueError(f"Field {field} is not allowed")
         
         setattr(vacancy, field, value)
+        vacancy.refresh_parsed_digest()
         vacancy.parsed_at = datetime.utcnow()
         await self.session.flush()
         return vacancy
@@ -12,7 +12,14 @@ from .vacancy import (
     VacancyPatchRequest,
     VacancyDetailResponse,
 )
-from .match import MatchAnalyzeRequest, MatchAnalyzeResponse
+from .match import (
+    MatchAnalyzeRequest,
+    MatchAnalyzeResponse,
+    MatchBatchVacancy,
+    MatchBatchRequest,
+    MatchBatchItem,
+    MatchBatchResponse,
+)
 from .adapt import (
     AdaptResumeRequest,
     AdaptResumeResponse,
@@ -25,6 +32,7 @@ from .ideal import (
     IdealResumeOptions,
     IdealResumeMetadata,
 )
+from .job import JobSubmitResponse, JobStatusResponse
 from .version import (
     VersionCreateRequest,
     VersionItemResponse,
@@ -44,6 +52,10 @@ __all__ = [
     "VacancyDetailResponse",
     "MatchAnalyzeRequest",
     "MatchAnalyzeResponse",
+    "MatchBatchVacancy",
+    "MatchBatchRequest",
+    "MatchBatchItem",
+    "MatchBatchResponse",
     # Stage 2
     "AdaptResumeRequest",
     "AdaptResumeResponse",
@@ -58,4 +70,7 @@ __all__ = [
     "VersionItemResponse",
     "VersionDetailResponse",
     "VersionListResponse",
+    # Jobs
+    "JobSubmitResponse",
+    "JobStatusResponse",
 ]
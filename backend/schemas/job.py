@@ -0,0 +1,40 @@
+"""Schemas for asynchronous generation jobs."""
+
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class JobSubmitResponse(BaseModel):
+    """Response to a job submission (202 Accepted)."""
+
+    job_id: UUID = Field(..., description="UUID of the job")
+    kind: str = Field(..., description="adapt_resume | ideal_resume")
+    status: str = Field(..., description="queued | running | succeeded | failed")
+    deduplicated: bool = Field(
+        ...,
+        description="True if an identical queued/running job was reused",
+    )
+
+
+class JobStatusResponse(BaseModel):
+    """Current state of a job."""
+
+    job_id: UUID
+    kind: str
+    status: str = Field(..., description="queued | running | succeeded | failed")
+    attempts: int
+    result: Optional[dict[str, Any]] = Field(
+        default=None,
+        description="Body of the equivalent synchronous endpoint (when succeeded)",
+    )
+    error: Optional[str] = None
+    error_status: Optional[int] = Field(
+        default=None,
+        description="HTTP status the synchronous endpoint would have returned",
+    )
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,6 +1,6 @@
 """Match analysis request/response schemas."""
 
-from typing import Any
+from typing import Any, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -21,3 +21,49 @@ class MatchAnalyzeResponse(BaseModel):
     analysis_id: UUID = Field(..., description="UUID of analysis result")
     analysis: dict[str, Any] = Field(..., description="Match analysis JSON from LLM")
     cache_hit: bool = Field(..., description="True if all results were from cache")
+
+
+class MatchBatchVacancy(BaseModel):
+    """One vacancy of a batch: raw text or a stored vacancy ID."""
+
+    vacancy_text: Optional[str] = Field(None, min_length=10, description="Raw vacancy text")
+    vacancy_id: Optional[UUID] = Field(None, description="UUID of stored vacancy")
+
+
+class MatchBatchRequest(BaseModel):
+    """Request to match one resume against many vacancies."""
+
+    resume_text: Optional[str] = Field(None, min_length=10, description="Raw resume text")
+    resume_id: Optional[UUID] = Field(None, description="UUID of stored resume")
+    vacancies: list[MatchBatchVacancy] = Field(
+        ..., min_length=1, description="Vacancies to rank the resume against"
+    )
+    shortlist: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Analyze only the N vacancies with the best local pre-score",
+    )
+
+
+class MatchBatchItem(BaseModel):
+    """Result for one vacancy; `error` is set if this vacancy failed."""
+
+    index: int = Field(..., description="Position of the vacancy in the request")
+    vacancy_id: Optional[UUID] = Field(None, description="UUID of stored vacancy")
+    analysis_id: Optional[UUID] = Field(None, description="UUID of analysis result")
+    score: Optional[float] = Field(None, description="Match score from the analysis")
+    prescore: Optional[int] = Field(None, description="Local approximate score (0-100)")
+    shortlisted: bool = Field(True, description="False if skipped by the shortlist")
+    analysis: Optional[dict[str, Any]] = Field(None, description="Match analysis JSON")
+    cache_hit: bool = Field(False, description="True if parse and analysis were cached")
+    error: Optional[str] = Field(None, description="Error for this vacancy")
+    status_code: Optional[int] = Field(None, description="HTTP status of the error")
+
+
+class MatchBatchResponse(BaseModel):
+    """Batch result ranked by score (failures last)."""
+
+    resume_id: UUID = Field(..., description="UUID of stored resume")
+    items: list[MatchBatchItem] = Field(..., description="Ranked results")
+    succeeded: int = Field(..., description="Vacancies analyzed successfully")
+    failed: int = Field(..., description="Vacancies that failed")
@@ -25,6 +25,12 @@ class VacancyParseResponse(BaseModel):
     vacancy_hash: str = Field(..., description="SHA256 hash of normalized text")
     parsed_vacancy: dict[str, Any] = Field(..., description="Structured vacancy JSON from LLM")
     cache_hit: bool = Field(..., description="True if result was from cache")
+    extracted_by: Optional[str] = Field(
+        None, description="Structured-data extractor used instead of the LLM (URL intake)"
+    )
+    near_duplicate_of_id: Optional[UUID] = Field(
+        None, description="Near-identical vacancy whose parsed data was reused"
+    )
 
 
 class VacancyPatchRequest(BaseModel):
@@ -42,5 +48,6 @@ class VacancyDetailResponse(BaseModel):
     source_text: str
     content_hash: str
     parsed_data: Optional[dict[str, Any]] = None
+    near_duplicate_of_id: Optional[UUID] = None
     created_at: datetime
     parsed_at: Optional[datetime] = None
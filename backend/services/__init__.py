@@ -7,6 +7,8 @@ from .orchestrator import OrchestratorService
 from .utils import normalize_text, compute_hash
 from .adapt import AdaptResumeService
 from .ideal import IdealResumeService
+from .batch_match import BatchMatchService
+from .jobs import JobService, job_workers
 
 __all__ = [
     # Stage 1
@@ -14,9 +16,13 @@ __all__ = [
     "VacancyService",
     "MatchService",
     "OrchestratorService",
+    "BatchMatchService",
     "normalize_text",
     "compute_hash",
     # Stage 2
     "AdaptResumeService",
     "IdealResumeService",
+    # Jobs
+    "JobService",
+    "job_workers",
 ]
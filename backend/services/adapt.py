@@ -1,7 +1,6 @@
 """AdaptResumeService - adapt resume for vacancy based on selected improvements."""
 
 import hashlib
-import json
 import logging
 from dataclasses import dataclass
 from typing import Any, Optional
@@ -9,18 +8,24 @@ from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.ai.base import AIProvider
 from backend.ai.factory import get_ai_provider
+from backend.ai.streaming import TokenStream
 from backend.core.config import settings
+from backend.core.serialization import canonical_digest, dumps_pretty
+from backend.db import release_connection
 from backend.prompts import GENERATE_UPDATED_RESUME_PROMPT
 from backend.repositories import (
     ResumeRepository,
     VacancyRepository,
     AIResultRepository,
+    AnalysisRepository,
     ResumeVersionRepository,
 )
 from backend.services.resume import ResumeService
 from backend.services.vacancy import VacancyService
 from backend.services.match import MatchService
+from backend.services.singleflight import generate_ai_result
 
 
 @dataclass
@@ -31,6 +36,22 @@ class SelectedImprovement:
     ai_generate: bool = False
 
 
+@dataclass
+class AdaptContext:
+    """Resume, vacancy and match analysis resolved once per adaptation."""
+
+    resume_id: UUID
+    vacancy_id: UUID
+    resume_text: str
+    parsed_resume: dict[str, Any]
+    parsed_vacancy: dict[str, Any]
+    analysis: dict[str, Any]
+    analysis_id: UUID
+    resume_digest: str
+    vacancy_digest: str
+    analysis_digest: str
+
+
 @dataclass
 class AdaptResumeResult:
     """Result of resume adaptation."""
@@ -56,24 +77,29 @@ class AdaptResumeService:
 
     OPERATION = "adapt_resume"
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        ai_provider: Optional[AIProvider] = None,
+    ) -> None:
         self.session = session
+        self.ai_provider = ai_provider or get_ai_provider()
         self.resume_repo = ResumeRepository(session)
         self.vacancy_repo = VacancyRepository(session)
         self.ai_result_repo = AIResultRepository(session)
+        self.analysis_repo = AnalysisRepository(session)
         self.version_repo = ResumeVersionRepository(session)
-        self.resume_service = ResumeService(session)
-        self.vacancy_service = VacancyService(session)
-        self.match_service = MatchService(session)
-        self.ai_provider = get_ai_provider()
+        self.resume_service = ResumeService(session, self.ai_provider)
+        self.vacancy_service = VacancyService(session, self.ai_provider)
+        self.match_service = MatchService(session, self.ai_provider)
         self.logger = logging.getLogger(__name__)
 
     def _compute_adapt_hash(
         self,
         original_resume_text: str,
-        parsed_resume: dict[str, Any],
-        parsed_vacancy: dict[str, Any],
-        analysis: dict[str, Any],
+        resume_digest: str,
+        vacancy_digest: str,
+        analysis_digest: str,
         selected_improvements: list[SelectedImprovement],
         options: dict[str, Any],
     ) -> str:
@@ -81,9 +107,9 @@ class AdaptResumeService:
 
         Hash includes:
         - Original resume text hash
-        - Parsed resume JSON
-        - Parsed vacancy JSON
-        - Analysis JSON
+        - Parsed resume digest
+        - Parsed vacancy digest
+        - Analysis digest
         - Selected improvements (checkbox_id + user_input + ai_generate)
         - Options (language, template)
         """
@@ -102,22 +128,14 @@ class AdaptResumeService:
             "original_resume_text_hash": hashlib.sha256(
                 original_resume_text.encode("utf-8")
             ).hexdigest(),
-            "parsed_resume_hash": hashlib.sha256(
-                json.dumps(parsed_resume, sort_keys=True).encode("utf-8")
-            ).hexdigest(),
-            "parsed_vacancy_hash": hashlib.sha256(
-                json.dumps(parsed_vacancy, sort_keys=True).encode("utf-8")
-            ).hexdigest(),
-            "analysis_hash": hashlib.sha256(
-                json.dumps(analysis, sort_keys=True).encode("utf-8")
-            ).hexdigest(),
+            "parsed_resume_hash": resume_digest,
+            "parsed_vacancy_hash": vacancy_digest,
+            "analysis_hash": analysis_digest,
             "selected_improvements": improvements_data,
             "template": options.get("template"),
             "language": options.get("language"),
         }
-        return hashlib.sha256(
-            json.dumps(data, sort_keys=True).encode("utf-8")
-        ).hexdigest()
+        return canonical_digest(data)
 
     async def adapt_and_version(
         self,
@@ -129,6 +147,7 @@ class AdaptResumeService:
         selected_checkbox_ids: Optional[list[str]] = None,  # Legacy support
         base_version_id: Optional[UUID] = None,
         options: Optional[dict[str, Any]] = None,
+        stream: Optional[TokenStream] = None,
     ) -> AdaptResumeResult:
         """Adapt resume for vacancy and create new version.
 
@@ -141,6 +160,18 @@ class AdaptResumeService:
         6. If not cached, call LLM
         7. Create ResumeVersion
         8. Return result
+
+        Steps 1-4 are resolved once into an AdaptContext (see
+        _resolve_context) and reused for the rest of the pipeline.
+
+        If `stream` is given, generated text is relayed through it while the
+        LLM runs. Cache hits and requests coalesced onto an in-flight call
+        produce no deltas, only the final result. No connection is held
+        during the LLM call. The AIResult is committed on its own by
+        generate_ai_result (so other workers see it); the ResumeVersion is
+        written in a separate, later transaction. A failure in between
+        leaves a cached result without a version; a retry hits the cache
+        and writes the version.
         """
         options = options or {}
         
@@ -155,33 +186,19 @@ class AdaptResumeService:
         # Extract checkbox_ids for storing in version
         checkbox_ids_for_storage = [imp.checkbox_id for imp in selected_improvements]
 
-        # Step 1: Get resume
-        if resume_id:
-            resume = await self.resume_repo.get_by_id(resume_id)
-            if not resume:
-                raise ValueError(f"Resume not found: {resume_id}")
-            resume_text = resume.source_text
-            actual_resume_id = resume.id
-        elif resume_text:
-            resume_result = await self.resume_service.parse_and_cache(resume_text)
-            actual_resume_id = resume_result.resume_id
-        else:
-            raise ValueError("Either resume_text or resume_id must be provided")
-
-        # Step 2: Get vacancy
-        if vacancy_id:
-            vacancy = await self.vacancy_repo.get_by_id(vacancy_id)
-            if not vacancy:
-                raise ValueError(f"Vacancy not found: {vacancy_id}")
-            vacancy_text = vacancy.source_text
-            actual_vacancy_id = vacancy.id
-        elif vacancy_text:
-            vacancy_result = await self.vacancy_service.parse_and_cache(vacancy_text)
-            actual_vacancy_id = vacancy_result.vacancy_id
-        else:
-            raise ValueError("Either vacancy_text or vacancy_id must be provided")
+        # Steps 1-4: Resolve resume, vacancy, parsed data and analysis once
+        context = await self._resolve_context(
+            resume_text=resume_text,
+            resume_id=resume_id,
+            vacancy_text=vacancy_text,
+            vacancy_id=vacancy_id,
+        )
+        resume_text = context.resume_text
+        parsed_resume = context.parsed_resume
+        parsed_vacancy = context.parsed_vacancy
+        analysis = context.analysis
 
-        # Step 2.5: Validate base_version_id (if provided)
+        # Step 5: Validate base_version_id (if provided)
         if base_version_id:
             existing_version = await self.version_repo.get_by_id(base_version_id)
             if not existing_version:
@@ -190,92 +207,74 @@ class AdaptResumeService:
                 )
                 base_version_id = None  # Reset to None if not found
 
-        # Step 3: Get parsed resume
-        resume_result = await self.resume_service.parse_and_cache(resume_text)
-        parsed_resume = resume_result.parsed_resume
-
-        # Step 4: Get parsed vacancy
-        vacancy_result = await self.vacancy_service.parse_and_cache(vacancy_text)
-        parsed_vacancy = vacancy_result.parsed_vacancy
-
-        # Step 5: Get match analysis
-        match_result = await self.match_service.analyze_and_cache(
-            parsed_resume, parsed_vacancy
-        )
-        analysis = match_result.analysis
-        analysis_id = match_result.analysis_id
-
         # Step 6: Check adapt cache
         input_hash = self._compute_adapt_hash(
             resume_text,
-            parsed_resume,
-            parsed_vacancy,
-            analysis,
+            context.resume_digest,
+            context.vacancy_digest,
+            context.analysis_digest,
             selected_improvements,
             options,
         )
 
         cached_result = await self.ai_result_repo.get(self.OPERATION, input_hash)
-        if cached_result is not None:
-            self.logger.info("Cache hit for adapt_resume: %s", input_hash[:16])
-
-            # Still need to create version for history
-            adapt_output = cached_result.output_json
-            version = await self.version_repo.create(
-                resume_id=actual_resume_id,
-                vacancy_id=actual_vacancy_id,
-                text=adapt_output["updated_resume_text"],
-                change_log=adapt_output.get("change_log", []),
-                selected_checkbox_ids=checkbox_ids_for_storage,
-                analysis_id=analysis_id,
-                parent_version_id=base_version_id,
-                provider=self.ai_provider.provider_name,
-                model=settings.ai_model,
+        if cached_result is None:
+            # Don't hold a pooled connection while waiting on the lock or LLM
+            await release_connection(self.session)
+
+            # Steps 7-8: Build prompt, call LLM once across concurrent
+            # callers and save to the AIResult cache
+            prompt = self._build_prompt(
+                resume_text,
+                parsed_resume,
+                parsed_vacancy,
+                analysis,
+                selected_improvements,
             )
-            await self.session.commit()
-
-            return AdaptResumeResult(
-                version_id=version.id,
-                parent_version_id=base_version_id,
-                resume_id=actual_resume_id,
-                vacancy_id=actual_vacancy_id,
-                updated_resume_text=adapt_output["updated_resume_text"],
-                change_log=adapt_output.get("change_log", []),
-                applied_checkbox_ids=adapt_output.get("applied_checkbox_ids", []),
-                cache_hit=True,
+            cached_result, generated = await generate_ai_result(
+                self.OPERATION,
+                input_hash,
+                lambda: self.ai_provider.generate_json(
+                    prompt, prompt_name=self.OPERATION, stream=stream
+                ),
+                self.ai_provider.provider_name,
             )
+            if generated:
+                self.logger.info("Saved adapt_resume to cache: %s", input_hash[:16])
+                return await self._create_version(
+                    context,
+                    cached_result.output_json,
+                    checkbox_ids_for_storage,
+                    base_version_id,
+                    cache_hit=False,
+                )
 
-        # Step 7: Build prompt and call LLM
-        prompt = self._build_prompt(
-            resume_text,
-            parsed_resume,
-            parsed_vacancy,
-            analysis,
-            selected_improvements,
-        )
-
-        adapt_output = await self.ai_provider.generate_json(
-            prompt, prompt_name=self.OPERATION
-        )
-
-        # Step 8: Save to AIResult cache
-        await self.ai_result_repo.save(
-            operation=self.OPERATION,
-            input_hash=input_hash,
-            output_json=adapt_output,
-            provider=self.ai_provider.provider_name,
-            model=settings.ai_model,
+        self.logger.info("Cache hit for adapt_resume: %s", input_hash[:16])
+        # Still need to create version for history
+        return await self._create_version(
+            context,
+            cached_result.output_json,
+            checkbox_ids_for_storage,
+            base_version_id,
+            cache_hit=True,
         )
-        self.logger.info("Saved adapt_resume to cache: %s", input_hash[:16])
 
-        # Step 9: Create ResumeVersion
+    async def _create_version(
+        self,
+        context: AdaptContext,
+        adapt_output: dict[str, Any],
+        checkbox_ids: list[str],
+        base_version_id: Optional[UUID],
+        cache_hit: bool,
+    ) -> AdaptResumeResult:
+        """Step 9: Create and commit the ResumeVersion for an adapt output."""
         version = await self.version_repo.create(
-            resume_id=actual_resume_id,
-            vacancy_id=actual_vacancy_id,
+            resume_id=context.resume_id,
+            vacancy_id=context.vacancy_id,
             text=adapt_output["updated_resume_text"],
             change_log=adapt_output.get("change_log", []),
-            selected_checkbox_ids=checkbox_ids_for_storage,
-            analysis_id=analysis_id,
+            selected_checkbox_ids=checkbox_ids,
+            analysis_id=context.analysis_id,
             parent_version_id=base_version_id,
             provider=self.ai_provider.provider_name,
             model=settings.ai_model,
@@ -287,12 +286,104 @@ class AdaptResumeService:
         return AdaptResumeResult(
             version_id=version.id,
             parent_version_id=base_version_id,
-            resume_id=actual_resume_id,
-            vacancy_id=actual_vacancy_id,
+            resume_id=context.resume_id,
+            vacancy_id=context.vacancy_id,
             updated_resume_text=adapt_output["updated_resume_text"],
             change_log=adapt_output.get("change_log", []),
             applied_checkbox_ids=adapt_output.get("applied_checkbox_ids", []),
-            cache_hit=False,
+            cache_hit=cache_hit,
+        )
+
+    async def _resolve_context(
+        self,
+        resume_text: Optional[str],
+        resume_id: Optional[UUID],
+        vacancy_text: Optional[str],
+        vacancy_id: Optional[UUID],
+    ) -> AdaptContext:
+        """Fetch resume, vacancy, parsed data and match analysis exactly once.
+
+        When both IDs are given, the latest AnalysisLink for the pair loads
+        everything in one round trip; its analysis is reused as long as it
+        was computed from the current parsed data. Otherwise each side is
+        loaded or parsed once and the match analysis is looked up after.
+        """
+        if resume_id and vacancy_id:
+            link = await self.analysis_repo.get_latest_with_documents(
+                resume_id, vacancy_id
+            )
+            if (
+                link is not None
+                and link.resume.parsed_at is not None
+                and link.vacancy.parsed_at is not None
+            ):
+                resume = link.resume
+                vacancy = link.vacancy
+                analysis_result = link.analysis_result
+                resume_digest = resume.parsed_digest or resume.refresh_parsed_digest()
+                vacancy_digest = vacancy.parsed_digest or vacancy.refresh_parsed_digest()
+                match_hash = self.match_service._compute_match_hash(
+                    resume_digest, vacancy_digest
+                )
+                if analysis_result.input_hash == match_hash:
+                    return AdaptContext(
+                        resume_id=resume.id,
+                        vacancy_id=vacancy.id,
+                        resume_text=resume.source_text,
+                        parsed_resume=resume.get_parsed_data(),
+                        parsed_vacancy=vacancy.get_parsed_data(),
+                        analysis=analysis_result.output_json,
+                        analysis_id=analysis_result.id,
+                        resume_digest=resume_digest,
+                        vacancy_digest=vacancy_digest,
+                        analysis_digest=(
+                            analysis_result.parsed_digest
+                            or canonical_digest(analysis_result.output_json)
+                        ),
+                    )
+
+        # Resume
+        if resume_id:
+            resume = await self.resume_repo.get_by_id(resume_id)
+            if not resume:
+                raise ValueError(f"Resume not found: {resume_id}")
+            resume_result = await self.resume_service.ensure_parsed(resume)
+            resume_text = resume.source_text
+        elif resume_text:
+            resume_result = await self.resume_service.parse_and_cache(resume_text)
+        else:
+            raise ValueError("Either resume_text or resume_id must be provided")
+
+        # Vacancy
+        if vacancy_id:
+            vacancy = await self.vacancy_repo.get_by_id(vacancy_id)
+            if not vacancy:
+                raise ValueError(f"Vacancy not found: {vacancy_id}")
+            vacancy_result = await self.vacancy_service.ensure_parsed(vacancy)
+        elif vacancy_text:
+            vacancy_result = await self.vacancy_service.parse_and_cache(vacancy_text)
+        else:
+            raise ValueError("Either vacancy_text or vacancy_id must be provided")
+
+        # Match analysis
+        match_result = await self.match_service.analyze_and_cache(
+            resume_result.parsed_resume,
+            vacancy_result.parsed_vacancy,
+            resume_digest=resume_result.parsed_digest,
+            vacancy_digest=vacancy_result.parsed_digest,
+        )
+
+        return AdaptContext(
+            resume_id=resume_result.resume_id,
+            vacancy_id=vacancy_result.vacancy_id,
+            resume_text=resume_text,
+            parsed_resume=resume_result.parsed_resume,
+            parsed_vacancy=vacancy_result.parsed_vacancy,
+            analysis=match_result.analysis,
+            analysis_id=match_result.analysis_id,
+            resume_digest=resume_result.parsed_digest,
+            vacancy_digest=vacancy_result.parsed_digest,
+            analysis_digest=match_result.analysis_digest,
         )
 
     def _build_prompt(
@@ -319,18 +410,18 @@ class AdaptResumeService:
             .replace("{{ORIGINAL_RESUME_TEXT}}", original_resume_text)
             .replace(
                 "{{PARSED_RESUME_JSON}}",
-                json.dumps(parsed_resume, ensure_ascii=False, indent=2),
+                dumps_pretty(parsed_resume),
             )
             .replace(
                 "{{PARSED_VACANCY_JSON}}",
-                json.dumps(parsed_vacancy, ensure_ascii=False, indent=2),
+                dumps_pretty(parsed_vacancy),
             )
             .replace(
                 "{{MATCH_ANALYSIS_JSON}}",
-                json.dumps(analysis, ensure_ascii=False, indent=2),
+                dumps_pretty(analysis),
             )
             .replace(
                 "{{SELECTED_IMPROVEMENTS_JSON}}",
-                json.dumps(improvements_data, ensure_ascii=False, indent=2),
+                dumps_pretty(improvements_data),
             )
         )
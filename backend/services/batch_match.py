@@ -0,0 +1,319 @@
+"""Batch match service - rank one resume against many vacancies."""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.ai.base import AIProvider
+from backend.ai.errors import AIError, AIUnavailableError
+from backend.ai.factory import get_ai_provider
+from backend.core.config import settings
+from backend.db.session import AsyncSessionLocal
+from backend.repositories import AnalysisRepository, ResumeRepository, VacancyRepository
+from backend.services.match import MatchService
+from backend.services.prescore import SkillVocabulary, prescore_agreement, prescorer
+from backend.services.resume import ResumeParseResult, ResumeService
+from backend.services.vacancy import VacancyParseResult, VacancyService
+
+
+@dataclass
+class BatchVacancy:
+    """One vacancy of a batch: raw text or an already stored vacancy."""
+
+    vacancy_text: Optional[str] = None
+    vacancy_id: Optional[UUID] = None
+
+
+@dataclass
+class BatchMatchItem:
+    """Outcome of matching the resume against one vacancy."""
+
+    index: int  # Position in the request
+    vacancy_id: Optional[UUID] = None
+    analysis_id: Optional[UUID] = None
+    score: Optional[float] = None
+    prescore: Optional[int] = None  # Local estimate, see services/prescore.py
+    shortlisted: bool = True  # False: skipped LLM analysis (score is None)
+    analysis: Optional[dict[str, Any]] = None
+    cache_hit: bool = False
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class _Loaded:
+    item: BatchMatchItem
+    parsed: Optional[VacancyParseResult] = None
+
+
+@dataclass
+class BatchMatchResult:
+    """Ranked result of a batch: best score first, failures last."""
+
+    resume_id: UUID
+    items: list[BatchMatchItem] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for item in self.items if item.ok)
+
+    @property
+    def failed(self) -> int:
+        return len(self.items) - self.succeeded
+
+
+def rank_items(items: list[BatchMatchItem]) -> list[BatchMatchItem]:
+    """Order by LLM score, then pre-score (highest first); failures last."""
+    return sorted(
+        items,
+        key=lambda item: (
+            not item.ok,
+            item.score is None,
+            -(item.score or 0.0),
+            -(item.prescore or 0),
+            item.index,
+        ),
+    )
+
+
+def _score(analysis: dict[str, Any]) -> Optional[float]:
+    score = analysis.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        return None
+    return float(score)
+
+
+class BatchMatchService:
+    """Match one resume against many vacancies.
+
+    The resume is parsed once; every vacancy is then parsed (or loaded),
+    pre-scored locally and analyzed on its own session, at most
+    `batch_match_concurrency` at a time. Cached analyses are reused, and
+    missing ones go through the shared LLM limiter like any other call. A
+    failing vacancy is reported in its item and does not fail the batch.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        ai_provider: Optional[AIProvider] = None,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        self.session = session
+        self.session_factory = session_factory
+        self.ai_provider = ai_provider or get_ai_provider()
+        self.resume_service = ResumeService(session, self.ai_provider)
+        self.resume_repo = ResumeRepository(session)
+        self.logger = logging.getLogger(__name__)
+
+    async def run(
+        self,
+        vacancies: list[BatchVacancy],
+        resume_text: Optional[str] = None,
+        resume_id: Optional[UUID] = None,
+        shortlist: Optional[int] = None,
+        on_item: Optional[Callable[[BatchMatchItem], None]] = None,
+    ) -> BatchMatchResult:
+        """Run the batch; `on_item` is called as each vacancy finishes.
+
+        With `shortlist`, every vacancy is parsed and pre-scored locally
+        first and only the `shortlist` best go to the LLM analysis; the
+        rest are returned with their pre-score only.
+
+        Raises ValueError (or an AI error) only if the resume itself cannot
+        be loaded or parsed.
+        """
+        if len(vacancies) > settings.batch_match_max_vacancies:
+            raise ValueError(
+                f"Too many vacancies: {len(vacancies)} "
+                f"(max {settings.batch_match_max_vacancies})"
+            )
+
+        resume = await self._parse_resume(resume_text, resume_id)
+        await self.session.commit()
+
+        semaphore = asyncio.Semaphore(settings.batch_match_concurrency)
+        tasks: list[asyncio.Future] = []
+
+        def finish(item: BatchMatchItem) -> None:
+            if on_item is not None:
+                on_item(item)
+
+        async def load(index: int, vacancy: BatchVacancy) -> _Loaded:
+            async with semaphore:
+                loaded = await self._load_vacancy(index, vacancy)
+                if shortlist is None and loaded.parsed is not None:
+                    self._prescore(resume, [loaded])
+                    await self._analyze(loaded, resume)
+            if shortlist is None or loaded.parsed is None:
+                finish(loaded.item)
+            return loaded
+
+        async def analyze(loaded: _Loaded) -> None:
+            async with semaphore:
+                await self._analyze(loaded, resume)
+            finish(loaded.item)
+
+        try:
+            tasks = [
+                asyncio.ensure_future(load(index, vacancy))
+                for index, vacancy in enumerate(vacancies)
+            ]
+            loaded_all = await asyncio.gather(*tasks)
+
+            if shortlist is not None:
+                parsed = [loaded for loaded in loaded_all if loaded.parsed is not None]
+                self._prescore(resume, parsed)
+                # Vacancies that could not be pre-scored go after scored ones
+                parsed.sort(
+                    key=lambda loaded: (
+                        loaded.item.prescore is None,
+                        -(loaded.item.prescore or 0),
+                        loaded.item.index,
+                    )
+                )
+                for loaded in parsed[shortlist:]:
+                    loaded.item.shortlisted = False
+                    finish(loaded.item)
+                tasks = [
+                    asyncio.ensure_future(analyze(loaded))
+                    for loaded in parsed[:shortlist]
+                ]
+                await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        items = [loaded.item for loaded in loaded_all]
+        result = BatchMatchResult(resume_id=resume.resume_id, items=rank_items(items))
+        self.logger.info(
+            "batch_match_done | resume=%s vacancies=%d shortlist=%s "
+            "succeeded=%d failed=%d",
+            resume.resume_id,
+            len(items),
+            shortlist,
+            result.succeeded,
+            result.failed,
+        )
+        return result
+
+    async def _parse_resume(
+        self,
+        resume_text: Optional[str],
+        resume_id: Optional[UUID],
+    ) -> ResumeParseResult:
+        if resume_id:
+            resume = await self.resume_repo.get_by_id(resume_id)
+            if resume is None:
+                raise ValueError(f"Resume not found: {resume_id}")
+            return await self.resume_service.ensure_parsed(resume)
+        if resume_text:
+            return await self.resume_service.parse_and_cache(resume_text)
+        raise ValueError("Either resume_text or resume_id must be provided")
+
+    async def _load_vacancy(self, index: int, vacancy: BatchVacancy) -> _Loaded:
+        """Parse or load one vacancy; errors are recorded in the item."""
+        loaded = _Loaded(
+            item=BatchMatchItem(index=index, vacancy_id=vacancy.vacancy_id)
+        )
+        try:
+            async with self.session_factory() as session:
+                loaded.parsed = await self._parse_vacancy(session, vacancy)
+                await session.commit()
+        except Exception as e:
+            self._record_error(loaded.item, e)
+        else:
+            loaded.item.vacancy_id = loaded.parsed.vacancy_id
+        return loaded
+
+    def _prescore(self, resume: ResumeParseResult, loaded_items: list[_Loaded]) -> None:
+        """Pre-score parsed vacancies; a failing one keeps prescore=None.
+
+        Parsed data comes from the LLM or from PATCH edits and may not have
+        the expected shape; that must not fail the item or the batch.
+        """
+        vocabulary = SkillVocabulary()
+        try:
+            profile = prescorer.resume_profile(vocabulary, resume.parsed_resume)
+        except Exception:
+            self.logger.warning(
+                "batch_match_prescore_failed | resume=%s", resume.resume_id, exc_info=True
+            )
+            return
+        for loaded in loaded_items:
+            try:
+                vacancy = prescorer.vacancy_profile(vocabulary, loaded.parsed.parsed_vacancy)
+                loaded.item.prescore = prescorer.score_profiles(
+                    vocabulary, profile, vacancy
+                ).score
+            except Exception:
+                self.logger.warning(
+                    "batch_match_prescore_failed | index=%d", loaded.item.index, exc_info=True
+                )
+
+    async def _analyze(self, loaded: _Loaded, resume: ResumeParseResult) -> None:
+        """Analyze a parsed vacancy and link it; errors go to the item."""
+        item, vacancy_result = loaded.item, loaded.parsed
+        try:
+            async with self.session_factory() as session:
+                match_result = await MatchService(
+                    session, self.ai_provider
+                ).analyze_and_cache(
+                    resume.parsed_resume,
+                    vacancy_result.parsed_vacancy,
+                    resume_digest=resume.parsed_digest,
+                    vacancy_digest=vacancy_result.parsed_digest,
+                )
+                await AnalysisRepository(session).link(
+                    resume_id=resume.resume_id,
+                    vacancy_id=vacancy_result.vacancy_id,
+                    analysis_result_id=match_result.analysis_id,
+                )
+                await session.commit()
+        except Exception as e:
+            self._record_error(item, e)
+            return
+
+        item.analysis_id = match_result.analysis_id
+        item.analysis = match_result.analysis
+        item.score = _score(match_result.analysis)
+        item.cache_hit = vacancy_result.cache_hit and match_result.cache_hit
+        if item.score is not None and item.prescore is not None:
+            prescore_agreement.record(item.prescore, item.score)
+
+    def _record_error(self, item: BatchMatchItem, exc: Exception) -> None:
+        """Map an exception to the status the single endpoints would return."""
+        if isinstance(exc, ValueError):
+            item.error, item.status_code = str(exc), 400
+        elif isinstance(exc, AIUnavailableError):
+            item.error, item.status_code = f"AI provider unavailable: {exc}", 503
+        elif isinstance(exc, AIError):
+            item.error, item.status_code = f"AI provider error: {exc}", 502
+        else:
+            self.logger.error(
+                "batch_match_item_failed | index=%d", item.index, exc_info=exc
+            )
+            item.error, item.status_code = f"Internal error: {type(exc).__name__}", 500
+
+    async def _parse_vacancy(
+        self,
+        session: AsyncSession,
+        vacancy: BatchVacancy,
+    ) -> VacancyParseResult:
+        service = VacancyService(session, self.ai_provider)
+        if vacancy.vacancy_id:
+            record = await VacancyRepository(session).get_by_id(vacancy.vacancy_id)
+            if record is None:
+                raise ValueError(f"Vacancy not found: {vacancy.vacancy_id}")
+            return await service.ensure_parsed(record)
+        if vacancy.vacancy_text:
+            return await service.parse_and_cache(vacancy.vacancy_text)
+        raise ValueError("Either vacancy_text or vacancy_id must be provided")
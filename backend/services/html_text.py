@@ -0,0 +1,198 @@
+"""Reduce a vacancy HTML page to readable text in one pass.
+
+The page is parsed once by lxml (C parser, no BeautifulSoup tree) and
+walked with `etree.iterwalk`. Boilerplate subtrees (scripts, navigation,
+cookie banners, sidebars) are skipped as a whole the moment their start
+tag is seen, and the walk stops as soon as the text budget is filled.
+For known job boards only the vacancy blocks are walked instead of the
+whole page.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+from lxml import etree, html as lxml_html
+
+MAX_TEXT_CHARS = 30000
+
+# Subtrees that never contain vacancy text
+SKIP_TAGS = frozenset(
+    {"script", "style", "nav", "footer", "header", "iframe", "svg", "noscript", "template"}
+)
+
+# Checked against class and id only (precompiled, one search per element)
+BOILERPLATE_ATTR_RE = re.compile(
+    r"cookie|banner|popup|sidebar|related-|(?:^|[\s_-])ads?(?:$|[\s_-])"
+)
+
+
+@dataclass(frozen=True)
+class SiteExtractor:
+    """Vacancy blocks of one job board, as XPath expressions.
+
+    Blocks are collected in document order. If none of them is found (the
+    layout changed), the whole page is cleaned as for an unknown site.
+    """
+
+    name: str
+    hosts: tuple[str, ...]  # Host or parent domain, e.g. "hh.ru" matches "spb.hh.ru"
+    xpath: str
+
+    def matches(self, host: str) -> bool:
+        return any(host == h or host.endswith("." + h) for h in self.hosts)
+
+
+SITE_EXTRACTORS: tuple[SiteExtractor, ...] = (
+    SiteExtractor(
+        name="hh",
+        hosts=("hh.ru", "hh.kz", "rabota.by", "headhunter.ge"),
+        # Cheap attribute-presence test first: most elements are rejected by it
+        xpath=(
+            "//*[@data-qa][contains("
+            "'|vacancy-title|vacancy-company-name|vacancy-salary|vacancy-experience"
+            "|vacancy-view-employment-mode|vacancy-view-raw-address"
+            "|vacancy-view-location|vacancy-description|skills-element|',"
+            " concat('|', @data-qa, '|'))]"
+        ),
+    ),
+    SiteExtractor(
+        name="habr_career",
+        hosts=("career.habr.com",),
+        xpath=(
+            "//*[@class][contains(@class, 'page-title__title')"
+            " or contains(@class, 'company_name')"
+            " or contains(@class, 'vacancy-description__text')]"
+        ),
+    ),
+    SiteExtractor(
+        name="linkedin",
+        hosts=("linkedin.com",),
+        xpath=(
+            "//*[@class][contains(@class, 'top-card-layout__title')"
+            " or contains(@class, 'topcard__org-name-link')"
+            " or contains(@class, 'show-more-less-html__markup')"
+            " or contains(@class, 'description__job-criteria-list')]"
+        ),
+    ),
+    SiteExtractor(
+        name="indeed",
+        hosts=("indeed.com",),
+        xpath=(
+            "//*[@data-testid or @id][@data-testid='jobsearch-JobInfoHeader-title'"
+            " or @data-testid='inlineHeader-companyName'"
+            " or @id='jobDescriptionText']"
+        ),
+    ),
+)
+
+_compiled_xpaths: dict[str, etree.XPath] = {}
+
+
+def find_site_extractor(url: Optional[str]) -> Optional[SiteExtractor]:
+    """Return the extractor for the URL's host, if it is a known job board."""
+    if not url:
+        return None
+    host = (urlsplit(url).hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    for extractor in SITE_EXTRACTORS:
+        if extractor.matches(host):
+            return extractor
+    return None
+
+
+def parse_html(html: str) -> Optional[etree._Element]:
+    """Parse a page into an lxml tree; None for an empty document."""
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # str input with an XML encoding declaration is rejected by lxml
+        try:
+            return lxml_html.document_fromstring(html.encode("utf-8"))
+        except (ValueError, etree.ParserError):
+            return None
+    except etree.ParserError:
+        return None
+
+
+def _is_boilerplate(element: etree._Element) -> bool:
+    if element.tag in SKIP_TAGS:
+        return True
+    attrs = element.get("class", "") + " " + element.get("id", "")
+    return BOILERPLATE_ATTR_RE.search(attrs.lower()) is not None
+
+
+def _iter_strings(root: etree._Element) -> Iterator[str]:
+    """Yield the text nodes under `root` in document order, pruning boilerplate."""
+    walker = etree.iterwalk(root, events=("start", "end", "comment", "pi"))
+    for event, element in walker:
+        if event == "start":
+            if _is_boilerplate(element):
+                walker.skip_subtree()
+            elif element.text:
+                yield element.text
+        elif element is not root and element.tail:
+            # "end", or a comment/PI whose own text is not page text
+            yield element.tail
+
+
+def element_text(roots: list[etree._Element], max_chars: int = MAX_TEXT_CHARS) -> str:
+    """Text of the given subtrees: one phrase per line, at most max_chars.
+
+    Whitespace is normalized like `get_text("\\n")` followed by stripping
+    lines and splitting on double spaces.
+    """
+    chunks: list[str] = []
+    size = 0
+    for root in roots:
+        for string in _iter_strings(root):
+            for line in string.splitlines():
+                for phrase in line.strip().split("  "):
+                    phrase = phrase.strip()
+                    if phrase:
+                        chunks.append(phrase)
+                        size += len(phrase) + 1
+            if size >= max_chars:
+                return "\n".join(chunks)[:max_chars]
+    return "\n".join(chunks)[:max_chars]
+
+
+def html_to_text(
+    html: str,
+    url: Optional[str] = None,
+    max_chars: int = MAX_TEXT_CHARS,
+    tree: Optional[etree._Element] = None,
+) -> str:
+    """Extract readable vacancy text from a page, without boilerplate.
+
+    Pass `tree` when the page was already parsed with `parse_html`.
+    """
+    if tree is None:
+        tree = parse_html(html)
+    if tree is None:
+        return ""
+
+    extractor = find_site_extractor(url)
+    if extractor is not None:
+        xpath = _compiled_xpaths.get(extractor.name)
+        if xpath is None:
+            xpath = _compiled_xpaths[extractor.name] = etree.XPath(extractor.xpath)
+        blocks = _outermost(xpath(tree))
+        if blocks:
+            text = element_text(blocks, max_chars)
+            if text:
+                return text
+
+    return element_text([tree], max_chars)
+
+
+def _outermost(elements: list[etree._Element]) -> list[etree._Element]:
+    """Drop matches nested inside another match, so text is not repeated."""
+    selected = set(elements)
+    return [
+        element
+        for element in elements
+        if not any(parent in selected for parent in element.iterancestors())
+    ]
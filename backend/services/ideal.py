@@ -1,7 +1,5 @@
 """IdealResumeService - generate ideal resume template for vacancy."""
 
-import hashlib
-import json
 import logging
 from dataclasses import dataclass
 from typing import Any, Optional
@@ -9,14 +7,20 @@ from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.ai.base import AIProvider
 from backend.ai.factory import get_ai_provider
+from backend.ai.streaming import TokenStream
 from backend.core.config import settings
+from backend.core.serialization import canonical_digest, dumps_pretty
+from backend.db import release_connection
+from backend.models import IdealResume
 from backend.prompts import IDEAL_RESUME_PROMPT
 from backend.repositories import (
     VacancyRepository,
     IdealResumeRepository,
 )
 from backend.services.vacancy import VacancyService
+from backend.services.singleflight import generate_once
 from backend.services.utils import compute_hash
 
 
@@ -40,46 +44,47 @@ class IdealResumeService:
 
     OPERATION = "ideal_resume"
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        ai_provider: Optional[AIProvider] = None,
+    ) -> None:
         self.session = session
+        self.ai_provider = ai_provider or get_ai_provider()
         self.vacancy_repo = VacancyRepository(session)
         self.ideal_repo = IdealResumeRepository(session)
-        self.vacancy_service = VacancyService(session)
-        self.ai_provider = get_ai_provider()
+        self.vacancy_service = VacancyService(session, self.ai_provider)
         self.logger = logging.getLogger(__name__)
 
     def _compute_ideal_hash(
         self,
-        parsed_vacancy: dict[str, Any],
+        vacancy_digest: str,
         vacancy_hash: str,
         options: dict[str, Any],
     ) -> str:
         """Compute hash for caching ideal_resume operation.
 
         Hash includes:
-        - Parsed vacancy JSON hash
+        - Parsed vacancy digest
         - Vacancy content hash
         - Options (language, template, seniority)
         """
         data = {
             "operation": self.OPERATION,
-            "parsed_vacancy_hash": hashlib.sha256(
-                json.dumps(parsed_vacancy, sort_keys=True).encode("utf-8")
-            ).hexdigest(),
+            "parsed_vacancy_hash": vacancy_digest,
             "vacancy_hash": vacancy_hash,
             "template": options.get("template"),
             "language": options.get("language"),
             "seniority": options.get("seniority"),
         }
-        return hashlib.sha256(
-            json.dumps(data, sort_keys=True).encode("utf-8")
-        ).hexdigest()
+        return canonical_digest(data)
 
     async def generate_ideal(
         self,
         vacancy_text: Optional[str] = None,
         vacancy_id: Optional[UUID] = None,
         options: Optional[dict[str, Any]] = None,
+        stream: Optional[TokenStream] = None,
     ) -> IdealResumeResult:
         """Generate ideal resume for vacancy.
 
@@ -90,6 +95,11 @@ class IdealResumeService:
         4. If not cached, call LLM
         5. Save IdealResume
         6. Return result
+
+        If `stream` is given, generated text is relayed through it while the
+        LLM runs. Cache hits and requests coalesced onto an in-flight call
+        produce no deltas, only the final result. No connection is held
+        during the LLM call.
         """
         options = options or {}
 
@@ -113,47 +123,79 @@ class IdealResumeService:
         parsed_vacancy = vacancy_result.parsed_vacancy
 
         # Step 3: Check cache
-        input_hash = self._compute_ideal_hash(parsed_vacancy, vacancy_hash, options)
+        input_hash = self._compute_ideal_hash(
+            vacancy_result.parsed_digest, vacancy_hash, options
+        )
 
         cached = await self.ideal_repo.get_by_input_hash(input_hash)
-        if cached is not None:
-            self.logger.info("Cache hit for ideal_resume: %s", input_hash[:16])
-            return IdealResumeResult(
-                ideal_id=cached.id,
-                vacancy_id=actual_vacancy_id,
-                ideal_resume_text=cached.text,
-                metadata=cached.generation_metadata,
-                cache_hit=True,
+        if cached is None:
+            # Steps 4-5: Call LLM and save IdealResume
+            return await self._generate_with_llm(
+                parsed_vacancy,
+                actual_vacancy_id,
+                vacancy_hash,
+                options,
+                input_hash,
+                stream,
             )
 
-        # Step 4: Build prompt and call LLM
+        self.logger.info("Cache hit for ideal_resume: %s", input_hash[:16])
+        return IdealResumeResult(
+            ideal_id=cached.id,
+            vacancy_id=actual_vacancy_id,
+            ideal_resume_text=cached.text,
+            metadata=cached.generation_metadata,
+            cache_hit=True,
+        )
+
+    async def _generate_with_llm(
+        self,
+        parsed_vacancy: dict[str, Any],
+        vacancy_id: UUID,
+        vacancy_hash: str,
+        options: dict[str, Any],
+        input_hash: str,
+        stream: Optional[TokenStream],
+    ) -> IdealResumeResult:
+        """Generate the ideal resume once across concurrent callers.
+
+        The shared generation creates and commits the IdealResume itself;
+        this request's session holds no connection meanwhile.
+        """
+        # Don't hold a pooled connection while waiting on the lock or LLM
+        await release_connection(self.session)
         prompt = self._build_prompt(parsed_vacancy, options)
 
-        ideal_output = await self.ai_provider.generate_json(
-            prompt, prompt_name=self.OPERATION
-        )
+        async def lookup(session: AsyncSession) -> Optional[IdealResume]:
+            return await IdealResumeRepository(session).get_by_input_hash(input_hash)
 
-        # Step 5: Save IdealResume
-        ideal = await self.ideal_repo.create(
-            vacancy_id=actual_vacancy_id,
-            vacancy_hash=vacancy_hash,
-            text=ideal_output["ideal_resume_text"],
-            generation_metadata=ideal_output.get("metadata", {}),
-            options=options,
-            input_hash=input_hash,
-            provider=self.ai_provider.provider_name,
-            model=settings.ai_model,
-        )
-        await self.session.commit()
+        async def produce(session: AsyncSession) -> IdealResume:
+            ideal_output = await self.ai_provider.generate_json(
+                prompt, prompt_name=self.OPERATION, stream=stream
+            )
+            ideal = await IdealResumeRepository(session).create(
+                vacancy_id=vacancy_id,
+                vacancy_hash=vacancy_hash,
+                text=ideal_output["ideal_resume_text"],
+                generation_metadata=ideal_output.get("metadata", {}),
+                options=options,
+                input_hash=input_hash,
+                provider=self.ai_provider.provider_name,
+                model=settings.ai_model,
+            )
+            await session.commit()
+            return ideal
 
-        self.logger.info("Created ideal resume: %s", ideal.id)
+        ideal, generated = await generate_once(self.OPERATION, input_hash, lookup, produce)
+        if generated:
+            self.logger.info("Created ideal resume: %s", ideal.id)
 
         return IdealResumeResult(
             ideal_id=ideal.id,
-            vacancy_id=actual_vacancy_id,
-            ideal_resume_text=ideal_output["ideal_resume_text"],
-            metadata=ideal_output.get("metadata", {}),
-            cache_hit=False,
+            vacancy_id=vacancy_id,
+            ideal_resume_text=ideal.text,
+            metadata=ideal.generation_metadata,
+            cache_hit=not generated,
         )
 
     def _build_prompt(
@@ -172,10 +214,10 @@ class IdealResumeService:
             IDEAL_RESUME_PROMPT
             .replace(
                 "{{PARSED_VACANCY_JSON}}",
-                json.dumps(parsed_vacancy, ensure_ascii=False, indent=2),
+                dumps_pretty(parsed_vacancy),
             )
             .replace(
                 "{{IDEAL_OPTIONS_JSON}}",
-                json.dumps(options_json, ensure_ascii=False, indent=2),
+                dumps_pretty(options_json),
             )
         )
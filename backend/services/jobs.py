@@ -0,0 +1,231 @@
+"""Asynchronous generation jobs: enqueue, background workers, status waits.
+
+Long adapt/ideal generations can be submitted as jobs instead of holding an
+HTTP request (and a DB session) open for the whole LLM call. Jobs live in
+the generation_job table; in-process asyncio workers claim them with
+FOR UPDATE SKIP LOCKED, so any number of nodes can share one queue. Job
+handlers are registered per kind by the API layer, which owns request and
+response schemas.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Any, Awaitable, Callable, Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.ai.errors import AIError, AIUnavailableError
+from backend.core.config import settings
+from backend.core.serialization import canonical_digest
+from backend.db.session import AsyncSessionLocal
+from backend.models import GenerationJob
+from backend.repositories import GenerationJobRepository
+
+# handler(session, payload) -> JSON-serializable response body
+JobHandler = Callable[[AsyncSession, dict[str, Any]], Awaitable[dict[str, Any]]]
+
+
+class JobService:
+    """Submit and look up generation jobs."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self.job_repo = GenerationJobRepository(session)
+        self.logger = logging.getLogger(__name__)
+
+    async def submit(self, kind: str, payload: dict[str, Any]) -> tuple[GenerationJob, bool]:
+        """Queue a job, reusing an identical queued/running one.
+
+        Returns (job, created). Commits so workers can see the job at once.
+        """
+        dedup_key = canonical_digest({"kind": kind, "payload": payload})
+        job, created = await self.job_repo.enqueue(kind, payload, dedup_key)
+        await self.session.commit()
+        if created:
+            job_workers.wake()
+        else:
+            self.logger.info("Deduplicated %s job: %s", kind, job.id)
+        return job, created
+
+    async def get(self, job_id: UUID) -> Optional[GenerationJob]:
+        return await self.job_repo.get_by_id(job_id)
+
+
+class JobWorkerPool:
+    """In-process asyncio workers that drain the generation_job queue."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        self.session_factory = session_factory
+        self._handlers: dict[str, JobHandler] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._waiters: dict[UUID, set[asyncio.Event]] = {}
+        self._stopping = False
+        self._worker_count = 0
+        self.logger = logging.getLogger(__name__)
+
+        self.completed = 0
+        self.failed = 0
+        self.requeued = 0
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine that executes jobs of `kind`."""
+        self._handlers[kind] = handler
+
+    async def start(self, worker_count: int) -> None:
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._worker_count = worker_count
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for index in range(worker_count):
+            task = asyncio.create_task(self._run_worker(f"{prefix}:{index}"))
+            self._tasks.append(task)
+        if worker_count:
+            self._tasks.append(asyncio.create_task(self._run_reaper()))
+        self.logger.info("job_workers_started | workers=%d", worker_count)
+
+    async def stop(self) -> None:
+        """Stop workers; a job being executed is cancelled and later reaped."""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._worker_count = 0
+
+    def wake(self) -> None:
+        """Tell idle workers on this node that a job was queued."""
+        self._wakeup.set()
+
+    async def wait_for_update(self, job_id: UUID, timeout: float) -> None:
+        """Wait until a local worker finishes `job_id` or `timeout` passes.
+
+        Jobs finished on another node are only seen when the caller polls
+        again after the timeout.
+        """
+        event = asyncio.Event()
+        self._waiters.setdefault(job_id, set()).add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = self._waiters.get(job_id)
+            if waiters is not None:
+                waiters.discard(event)
+                if not waiters:
+                    del self._waiters[job_id]
+
+    def _notify(self, job_id: UUID) -> None:
+        for event in self._waiters.get(job_id, ()):
+            event.set()
+
+    async def _run_worker(self, worker_id: str) -> None:
+        while not self._stopping:
+            try:
+                async with self.session_factory() as session:
+                    job = await GenerationJobRepository(session).claim(worker_id)
+                    await session.commit()
+            except Exception:
+                self.logger.exception("job_claim_failed | worker=%s", worker_id)
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), settings.job_poll_interval_seconds
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._execute(job)
+            except Exception:
+                # Status could not be stored; the reaper will requeue the job
+                self.logger.exception("job_finish_failed | id=%s", job.id)
+
+    async def _execute(self, job: GenerationJob) -> None:
+        self.logger.info(
+            "job_started | id=%s kind=%s attempt=%d", job.id, job.kind, job.attempts
+        )
+        self._notify(job.id)
+        result: Optional[dict[str, Any]] = None
+        error: Optional[str] = None
+        error_status = 500
+        retry_after: Optional[float] = None
+
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            error = f"Unknown job kind: {job.kind}"
+        elif job.attempts > settings.job_max_attempts:
+            # Requeued by the reaper after its workers kept dying
+            error, error_status = "Job exceeded max attempts", 503
+        else:
+            try:
+                async with self.session_factory() as session:
+                    result = await handler(session, job.payload)
+                    await session.commit()
+            except ValueError as e:
+                error, error_status = str(e), 400
+            except AIUnavailableError as e:
+                error, error_status = f"AI provider unavailable: {e}", 503
+                retry_after = e.retry_after or settings.job_poll_interval_seconds
+            except AIError as e:
+                error, error_status = f"AI provider error: {e}", 502
+            except Exception as e:
+                self.logger.exception("job_failed | id=%s", job.id)
+                error = f"Internal error: {type(e).__name__}"
+
+        async with self.session_factory() as session:
+            repo = GenerationJobRepository(session)
+            if result is not None:
+                await repo.mark_succeeded(job.id, result)
+                self.completed += 1
+            elif retry_after is not None and job.attempts < settings.job_max_attempts:
+                await repo.requeue(job.id, retry_after, error)
+                self.requeued += 1
+            else:
+                await repo.mark_failed(job.id, error, error_status)
+                self.failed += 1
+            await session.commit()
+
+        self.logger.info(
+            "job_finished | id=%s kind=%s ok=%s", job.id, job.kind, result is not None
+        )
+        self._notify(job.id)
+
+    async def _run_reaper(self) -> None:
+        """Periodically requeue jobs whose worker died mid-run."""
+        while not self._stopping:
+            await asyncio.sleep(max(60.0, settings.job_stale_after_seconds / 4))
+            try:
+                async with self.session_factory() as session:
+                    count = await GenerationJobRepository(session).requeue_stale(
+                        settings.job_stale_after_seconds
+                    )
+                    await session.commit()
+                if count:
+                    self.logger.warning("job_stale_requeued | count=%d", count)
+                    self.wake()
+            except Exception:
+                self.logger.exception("job_reaper_failed")
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "workers": self._worker_count,
+            "completed": self.completed,
+            "failed": self.failed,
+            "requeued": self.requeued,
+            "status_waiters": sum(len(waiters) for waiters in self._waiters.values()),
+        }
+
+
+job_workers = JobWorkerPool()
@@ -1,18 +1,21 @@
 """Match service - analyze resume-vacancy match and cache result."""
 
 import hashlib
-import json
 import logging
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.ai.base import AIProvider
 from backend.ai.factory import get_ai_provider
-from backend.core.config import settings
+from backend.ai.streaming import TokenStream
+from backend.core.serialization import canonical_digest, dumps_pretty
+from backend.db import release_connection
 from backend.prompts import ANALYZE_MATCH_PROMPT
 from backend.repositories import AIResultRepository
+from backend.services.singleflight import generate_ai_result
 
 
 @dataclass
@@ -21,6 +24,7 @@ class MatchAnalysisResult:
 
     analysis_id: UUID
     analysis: dict[str, Any]
+    analysis_digest: str
     cache_hit: bool
 
 
@@ -29,68 +33,105 @@ class MatchService:
 
     OPERATION = "analyze_match"
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        ai_provider: Optional[AIProvider] = None,
+    ) -> None:
         self.session = session
         self.ai_result_repo = AIResultRepository(session)
-        self.ai_provider = get_ai_provider()
+        self.ai_provider = ai_provider or get_ai_provider()
         self.logger = logging.getLogger(__name__)
 
     def _compute_match_hash(
         self,
-        parsed_resume: dict[str, Any],
-        parsed_vacancy: dict[str, Any],
+        resume_digest: str,
+        vacancy_digest: str,
     ) -> str:
-        """Compute hash from parsed resume and vacancy JSONs."""
-        combined = json.dumps(parsed_resume, sort_keys=True) + json.dumps(
-            parsed_vacancy, sort_keys=True
-        )
+        """Compute hash from the parsed resume and vacancy digests."""
+        combined = f"{self.OPERATION}:{resume_digest}:{vacancy_digest}"
         return hashlib.sha256(combined.encode("utf-8")).hexdigest()
 
     async def analyze_and_cache(
         self,
         parsed_resume: dict[str, Any],
         parsed_vacancy: dict[str, Any],
+        resume_digest: Optional[str] = None,
+        vacancy_digest: Optional[str] = None,
+        stream: Optional[TokenStream] = None,
     ) -> MatchAnalysisResult:
         """Analyze match and cache result.
 
-        1. Compute hash from both parsed JSONs
+        1. Compute hash from both parsed JSON digests
         2. Check AIResult cache
         3. If not cached, call LLM and save result
+
+        Callers holding a parse result should pass its parsed_digest so the
+        documents are not re-serialized here. If `stream` is given, top-level
+        fields of the analysis (e.g. score) are published as they complete.
+        No connection is held during the LLM call.
         """
-        input_hash = self._compute_match_hash(parsed_resume, parsed_vacancy)
+        resume_digest = resume_digest or canonical_digest(parsed_resume)
+        vacancy_digest = vacancy_digest or canonical_digest(parsed_vacancy)
+        input_hash = self._compute_match_hash(resume_digest, vacancy_digest)
 
         # Check cache
         cached_result = await self.ai_result_repo.get(self.OPERATION, input_hash)
-        if cached_result is not None:
-            self.logger.info("Cache hit for match analysis: %s", input_hash[:16])
-            return MatchAnalysisResult(
-                analysis_id=cached_result.id,
-                analysis=cached_result.output_json,
-                cache_hit=True,
+        if cached_result is None:
+            return await self._analyze_with_llm(
+                parsed_resume, parsed_vacancy, input_hash, stream
             )
 
+        self.logger.info("Cache hit for match analysis: %s", input_hash[:16])
+        return MatchAnalysisResult(
+            analysis_id=cached_result.id,
+            analysis=cached_result.output_json,
+            analysis_digest=(
+                cached_result.parsed_digest
+                or canonical_digest(cached_result.output_json)
+            ),
+            cache_hit=True,
+        )
+
+    async def _analyze_with_llm(
+        self,
+        parsed_resume: dict[str, Any],
+        parsed_vacancy: dict[str, Any],
+        input_hash: str,
+        stream: Optional[TokenStream],
+    ) -> MatchAnalysisResult:
+        """Generate the analysis once across concurrent callers.
+
+        The shared generation commits the AIResult itself; this request's
+        session holds no connection meanwhile.
+        """
+        # Don't hold a pooled connection while waiting on the lock or LLM
+        await release_connection(self.session)
+
         # Build prompt
         prompt = ANALYZE_MATCH_PROMPT.replace(
-            "{{PARSED_RESUME_JSON}}", json.dumps(parsed_resume, ensure_ascii=False, indent=2)
+            "{{PARSED_RESUME_JSON}}", dumps_pretty(parsed_resume)
         ).replace(
-            "{{PARSED_VACANCY_JSON}}", json.dumps(parsed_vacancy, ensure_ascii=False, indent=2)
+            "{{PARSED_VACANCY_JSON}}", dumps_pretty(parsed_vacancy)
         )
 
-        # Call LLM
-        analysis_json = await self.ai_provider.generate_json(prompt, prompt_name=self.OPERATION)
-
-        # Save to cache
-        ai_result = await self.ai_result_repo.save(
-            operation=self.OPERATION,
-            input_hash=input_hash,
-            output_json=analysis_json,
-            provider=self.ai_provider.provider_name,
-            model=settings.ai_model,
+        # Call LLM and save to cache
+        ai_result, generated = await generate_ai_result(
+            self.OPERATION,
+            input_hash,
+            lambda: self.ai_provider.generate_json(
+                prompt, prompt_name=self.OPERATION, stream=stream
+            ),
+            self.ai_provider.provider_name,
         )
-        self.logger.info("Saved match analysis to cache: %s", input_hash[:16])
+        if generated:
+            self.logger.info("Saved match analysis to cache: %s", input_hash[:16])
 
         return MatchAnalysisResult(
             analysis_id=ai_result.id,
-            analysis=analysis_json,
-            cache_hit=False,
+            analysis=ai_result.output_json,
+            analysis_digest=(
+                ai_result.parsed_digest or canonical_digest(ai_result.output_json)
+            ),
+            cache_hit=not generated,
         )
@@ -1,15 +1,20 @@
 """Orchestrator service - coordinates full analysis pipeline."""
 
+import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 from uuid import UUID
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from backend.ai.base import AIProvider
+from backend.ai.factory import get_ai_provider
+from backend.ai.streaming import TokenStream
+from backend.db.session import AsyncSessionLocal
 from backend.repositories import AnalysisRepository
-from backend.services.resume import ResumeService
-from backend.services.vacancy import VacancyService
+from backend.services.resume import ResumeService, ResumeParseResult
+from backend.services.vacancy import VacancyService, VacancyParseResult
 from backend.services.match import MatchService
 
 
@@ -29,11 +34,16 @@ class FullAnalysisResult:
 class OrchestratorService:
     """Orchestrates the full resume-vacancy analysis pipeline."""
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        ai_provider: Optional[AIProvider] = None,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ) -> None:
         self.session = session
-        self.resume_service = ResumeService(session)
-        self.vacancy_service = VacancyService(session)
-        self.match_service = MatchService(session)
+        self.session_factory = session_factory
+        self.ai_provider = ai_provider or get_ai_provider()
+        self.match_service = MatchService(session, self.ai_provider)
         self.analysis_repo = AnalysisRepository(session)
         self.logger = logging.getLogger(__name__)
 
@@ -41,6 +51,7 @@ class OrchestratorService:
         self,
         resume_text: str,
         vacancy_text: str,
+        stream: Optional[TokenStream] = None,
     ) -> FullAnalysisResult:
         """Run full analysis pipeline.
 
@@ -48,17 +59,22 @@ class OrchestratorService:
         2. Parse vacancy (with cache)
         3. Analyze match (with cache)
         4. Create AnalysisLink
+
+        Steps 1 and 2 are independent LLM calls, so they run concurrently,
+        each on its own session (an AsyncSession is not safe to share
+        between tasks) and committed before the match step reads them.
+        `stream` receives match analysis fields as the LLM produces them.
         """
-        # Step 1: Parse resume
-        resume_result = await self.resume_service.parse_and_cache(resume_text)
+        # Steps 1-2: Parse resume and vacancy concurrently
+        resume_result, vacancy_result = await asyncio.gather(
+            self._parse_resume(resume_text),
+            self._parse_vacancy(vacancy_text),
+        )
         self.logger.info(
             "Resume parsed: id=%s cache_hit=%s",
             resume_result.resume_id,
             resume_result.cache_hit,
         )
-
-        # Step 2: Parse vacancy
-        vacancy_result = await self.vacancy_service.parse_and_cache(vacancy_text)
         self.logger.info(
             "Vacancy parsed: id=%s cache_hit=%s",
             vacancy_result.vacancy_id,
@@ -69,6 +85,9 @@ class OrchestratorService:
         match_result = await self.match_service.analyze_and_cache(
             resume_result.parsed_resume,
             vacancy_result.parsed_vacancy,
+            resume_digest=resume_result.parsed_digest,
+            vacancy_digest=vacancy_result.parsed_digest,
+            stream=stream,
         )
         self.logger.info(
             "Match analyzed: id=%s cache_hit=%s",
@@ -99,3 +118,21 @@ class OrchestratorService:
             analysis=match_result.analysis,
             cache_hit=all_cache_hit,
         )
+
+    async def _parse_resume(self, resume_text: str) -> ResumeParseResult:
+        """Parse resume on a dedicated session (safe to run concurrently)."""
+        async with self.session_factory() as session:
+            result = await ResumeService(session, self.ai_provider).parse_and_cache(
+                resume_text
+            )
+            await session.commit()
+        return result
+
+    async def _parse_vacancy(self, vacancy_text: str) -> VacancyParseResult:
+        """Parse vacancy on a dedicated session (safe to run concurrently)."""
+        async with self.session_factory() as session:
+            result = await VacancyService(session, self.ai_provider).parse_and_cache(
+                vacancy_text
+            )
+            await session.commit()
+        return result
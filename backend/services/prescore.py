@@ -0,0 +1,420 @@
+"""Local pre-scoring of resume-vacancy fit, without an LLM call.
+
+Approximates the analyze_match scoring formula (see ANALYZE_MATCH_PROMPT)
+from parsed resume and vacancy data:
+
+- Skill Fit (50): required (40) and preferred (10) skills matched by a
+  normalized name with synonyms;
+- Experience Fit (25): total years from work_experience dates against
+  min_years (15), plus required skills evidenced in experience (10);
+- ATS Fit (15): ats_keywords found in skills or experience/summary text;
+- Clarity & Evidence (10): share of experience entries with responsibilities
+  or achievements.
+
+Skill sets are encoded as bitmasks over a vocabulary built per batch, so
+scoring N vacancies costs a few integer ANDs and popcounts each. The
+result is only used to shortlist vacancies before the LLM analysis;
+`prescore_agreement` tracks how well it agrees with LLM scores.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Iterable, Optional
+
+# Compact form (lowercase, no spaces/dots/hyphens) -> canonical compact form
+SKILL_SYNONYMS: dict[str, str] = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "es6": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "mssql": "sqlserver",
+    "microsoftsqlserver": "sqlserver",
+    "k8s": "kubernetes",
+    "kube": "kubernetes",
+    "reactjs": "react",
+    "vuejs": "vue",
+    "angularjs": "angular",
+    "node": "nodejs",
+    "nextjs": "next",
+    "amazonwebservices": "aws",
+    "gcp": "googlecloud",
+    "googlecloudplatform": "googlecloud",
+    "msazure": "azure",
+    "microsoftazure": "azure",
+    "cicd": "ci/cd",
+    "ci": "ci/cd",
+    "continuousintegration": "ci/cd",
+    "restapi": "rest",
+    "restful": "rest",
+    "restfulapi": "rest",
+    "drf": "djangorestframework",
+    "sklearn": "scikitlearn",
+    "ml": "machinelearning",
+    "машинноеобучение": "machinelearning",
+    "dl": "deeplearning",
+    "nlp": "naturallanguageprocessing",
+    "llm": "largelanguagemodels",
+    "llms": "largelanguagemodels",
+    "oop": "objectorientedprogramming",
+    "ооп": "objectorientedprogramming",
+    "tdd": "testdrivendevelopment",
+    "unittests": "unittesting",
+    "unittest": "unittesting",
+    "юниттесты": "unittesting",
+    "gitlabci": "gitlab",
+    "githubactions": "github",
+    "английский": "english",
+    "английскийязык": "english",
+    "scrum/agile": "agile",
+    "аджайл": "agile",
+    "скрам": "scrum",
+}
+
+_VERSION = re.compile(r"\s+v?\d+(\.\d+)*$")
+_COMPACT = re.compile(r"[\s.\-_]+")
+_WORDS = re.compile(r"[^\w+#/]+")
+_YEAR = re.compile(r"(19|20)\d{2}")
+_NUMERIC_MONTH = re.compile(
+    r"\b(0?[1-9]|1[0-2])[./-]((?:19|20)\d{2})\b"  # 03.2020, 3/2020
+    r"|\b((?:19|20)\d{2})[./-](0?[1-9]|1[0-2])\b"  # 2020-03
+)
+_CURRENT = (
+    "настоящ", "н.в", "н. в", "сейчас", "по сей день",
+    "present", "current", "now", "today",
+)
+_MONTH_NAMES = {
+    "янв": 1, "фев": 2, "мар": 3, "апр": 4, "май": 5, "мая": 5, "июн": 6,
+    "июл": 7, "авг": 8, "сен": 9, "окт": 10, "ноя": 11, "дек": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+
+def normalize_skill(name: str, synonyms: dict[str, str] = SKILL_SYNONYMS) -> str:
+    """Map a skill or keyword to its canonical compact form.
+
+    "Node.js", "node" and "NodeJS" all become "nodejs"; "Python 3.11"
+    becomes "python"; "K8s" becomes "kubernetes".
+    """
+    term = name.strip().lower().replace("ё", "е")
+    term = _VERSION.sub("", term)
+    compact = _COMPACT.sub("", term)
+    return synonyms.get(compact, compact)
+
+
+def _phrase(text: str) -> str:
+    """Lowercase text padded and split on punctuation, for phrase lookups."""
+    return " " + _WORDS.sub(" ", text.lower().replace("ё", "е")) + " "
+
+
+def _month_index(text: Any, today: date, is_end: bool) -> Optional[int]:
+    """Parse a free-form resume date into months since year 0.
+
+    Only strings are parsed; other values (e.g. a bare year as int from the
+    LLM or a PATCH edit) count as unparseable.
+    """
+    if text is None or text == "":
+        return today.year * 12 + today.month - 1 if is_end else None
+    if not isinstance(text, str):
+        return None
+    lowered = text.strip().lower()
+    if any(marker in lowered for marker in _CURRENT):
+        return today.year * 12 + today.month - 1
+    numeric = _NUMERIC_MONTH.search(lowered)
+    if numeric:
+        if numeric.group(1):
+            month, year = int(numeric.group(1)), int(numeric.group(2))
+        else:
+            year, month = int(numeric.group(3)), int(numeric.group(4))
+        return year * 12 + month - 1
+    year_match = _YEAR.search(lowered)
+    if year_match is None:
+        return None
+    year = int(year_match.group(0))
+    month = next(
+        (number for prefix, number in _MONTH_NAMES.items() if prefix in lowered),
+        12 if is_end else 1,
+    )
+    return year * 12 + month - 1
+
+
+def experience_years(
+    work_experience: Iterable[dict[str, Any]],
+    today: Optional[date] = None,
+) -> Optional[float]:
+    """Total years covered by work_experience dates, overlaps merged.
+
+    Returns None if no entry has a parseable start date ("not confirmed").
+    """
+    today = today or date.today()
+    intervals = []
+    for entry in work_experience:
+        start = _month_index(entry.get("start_date"), today, is_end=False)
+        end = _month_index(entry.get("end_date"), today, is_end=True)
+        if start is None or end is None or end < start:
+            continue
+        intervals.append((start, end + 1))
+    if not intervals:
+        return None
+
+    intervals.sort()
+    months = 0
+    current_start, current_end = intervals[0]
+    for start, end in intervals[1:]:
+        if start > current_end:
+            months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    months += current_end - current_start
+    return months / 12
+
+
+class SkillVocabulary:
+    """Assigns each canonical term a bit, so term sets become int bitmasks."""
+
+    def __init__(self) -> None:
+        self._bits: dict[str, int] = {}
+
+    def mask(self, terms: Iterable[str]) -> int:
+        mask = 0
+        for term in terms:
+            bit = self._bits.get(term)
+            if bit is None:
+                bit = self._bits[term] = len(self._bits)
+            mask |= 1 << bit
+        return mask
+
+    def terms(self, mask: int) -> list[str]:
+        return [term for term, bit in self._bits.items() if mask >> bit & 1]
+
+
+@dataclass
+class ResumeProfile:
+    """Resume features reused across all vacancies of a batch."""
+
+    skills: int  # Declared skills and tech_stack
+    evidenced: int  # tech_stack only: skills backed by experience
+    text: str  # Experience and summary text for phrase lookups
+    years: Optional[float]
+    evidence_ratio: float
+
+
+@dataclass
+class VacancyProfile:
+    required: int
+    preferred: int
+    keywords: int
+    keyword_phrases: dict[str, str]  # canonical -> phrase form
+    min_years: Optional[float]
+
+
+@dataclass
+class PreScore:
+    """Approximate analyze_match score with its breakdown."""
+
+    score: int
+    skill_fit: float
+    experience_fit: float
+    ats_fit: float
+    clarity_evidence: float
+    matched_required_skills: list[str] = field(default_factory=list)
+    missing_required_skills: list[str] = field(default_factory=list)
+
+
+def _items(value: Any) -> list[Any]:
+    """List-valued parsed field; a bare string is one item, other types none."""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return []
+
+
+def _strings(value: Any) -> list[str]:
+    return [item for item in _items(value) if isinstance(item, str)]
+
+
+def _names(items: Any) -> list[str]:
+    names = []
+    for item in _items(items):
+        name = item.get("name") if isinstance(item, dict) else item
+        if isinstance(name, str) and name.strip():
+            names.append(name)
+    return names
+
+
+class PreScorer:
+    """Deterministic local scorer mirroring the analyze_match formula."""
+
+    def __init__(self, synonyms: dict[str, str] = SKILL_SYNONYMS) -> None:
+        self.synonyms = synonyms
+
+    def _canonical(self, names: Iterable[str]) -> list[str]:
+        return [normalize_skill(name, self.synonyms) for name in names]
+
+    def resume_profile(
+        self,
+        vocabulary: SkillVocabulary,
+        parsed_resume: dict[str, Any],
+    ) -> ResumeProfile:
+        experience = [
+            entry
+            for entry in _items(parsed_resume.get("work_experience"))
+            if isinstance(entry, dict)
+        ]
+        tech_stack = [
+            name for entry in experience for name in _names(entry.get("tech_stack"))
+        ]
+        declared = _names(parsed_resume.get("skills"))
+
+        texts = _strings(parsed_resume.get("summary"))
+        for entry in experience:
+            texts.extend(_strings(entry.get("position")))
+            texts.extend(_strings(entry.get("responsibilities")))
+            texts.extend(_strings(entry.get("achievements")))
+            texts.extend(_names(entry.get("tech_stack")))
+        evidenced_entries = sum(
+            1
+            for entry in experience
+            if _strings(entry.get("responsibilities")) or _strings(entry.get("achievements"))
+        )
+
+        return ResumeProfile(
+            skills=vocabulary.mask(self._canonical(declared + tech_stack)),
+            evidenced=vocabulary.mask(self._canonical(tech_stack)),
+            text=_phrase(" ".join(texts)),
+            years=experience_years(experience),
+            evidence_ratio=evidenced_entries / len(experience) if experience else 0.0,
+        )
+
+    def vacancy_profile(
+        self,
+        vocabulary: SkillVocabulary,
+        parsed_vacancy: dict[str, Any],
+    ) -> VacancyProfile:
+        keywords = [
+            keyword
+            for keyword in _strings(parsed_vacancy.get("ats_keywords"))
+            if keyword.strip()
+        ]
+        canonical_keywords = self._canonical(keywords)
+        requirements = parsed_vacancy.get("experience_requirements") or {}
+        min_years = requirements.get("min_years") if isinstance(requirements, dict) else None
+        if not isinstance(min_years, (int, float)) or min_years <= 0:
+            min_years = None
+        return VacancyProfile(
+            required=vocabulary.mask(
+                self._canonical(_names(parsed_vacancy.get("required_skills")))
+            ),
+            preferred=vocabulary.mask(
+                self._canonical(_names(parsed_vacancy.get("preferred_skills")))
+            ),
+            keywords=vocabulary.mask(canonical_keywords),
+            keyword_phrases={
+                term: _phrase(keyword).strip()
+                for term, keyword in zip(canonical_keywords, keywords)
+            },
+            min_years=min_years,
+        )
+
+    def score_profiles(
+        self,
+        vocabulary: SkillVocabulary,
+        resume: ResumeProfile,
+        vacancy: VacancyProfile,
+    ) -> PreScore:
+        def ratio(part: int, whole: int) -> float:
+            # Formula convention: an empty requirement list counts as met
+            return part.bit_count() / whole.bit_count() if whole else 1.0
+
+        matched_required = vacancy.required & resume.skills
+        skill_fit = (
+            40.0 * ratio(matched_required, vacancy.required)
+            + 10.0 * ratio(vacancy.preferred & resume.skills, vacancy.preferred)
+        )
+
+        if resume.years is None:
+            years_fit = 8.0  # Dates not confirmed: capped at 8
+        elif vacancy.min_years is None:
+            years_fit = 15.0
+        else:
+            years_fit = 15.0 * min(1.0, resume.years / vacancy.min_years)
+        experience_fit = years_fit + 10.0 * ratio(
+            vacancy.required & resume.evidenced, vacancy.required
+        )
+
+        covered = vacancy.keywords & resume.skills
+        # Keywords not among the skills may still appear in experience text
+        for term in vocabulary.terms(vacancy.keywords & ~covered):
+            phrase = vacancy.keyword_phrases.get(term)
+            if phrase and f" {phrase} " in resume.text:
+                covered |= vocabulary.mask([term])
+        ats_fit = 15.0 * ratio(covered, vacancy.keywords)
+
+        clarity_evidence = 10.0 * resume.evidence_ratio
+        return PreScore(
+            score=int(round(skill_fit + experience_fit + ats_fit + clarity_evidence)),
+            skill_fit=round(skill_fit, 1),
+            experience_fit=round(experience_fit, 1),
+            ats_fit=round(ats_fit, 1),
+            clarity_evidence=round(clarity_evidence, 1),
+            matched_required_skills=vocabulary.terms(matched_required),
+            missing_required_skills=vocabulary.terms(vacancy.required & ~resume.skills),
+        )
+
+
+class AgreementStats:
+    """Running agreement between pre-scores and LLM scores for the same pair."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.within_10 = 0
+        self._sum_error = 0.0
+        self._sum_abs_error = 0.0
+        self._sx = self._sy = self._sxx = self._syy = self._sxy = 0.0
+
+    def record(self, prescore: float, llm_score: float) -> None:
+        error = prescore - llm_score
+        self.count += 1
+        self.within_10 += abs(error) <= 10
+        self._sum_error += error
+        self._sum_abs_error += abs(error)
+        self._sx += prescore
+        self._sy += llm_score
+        self._sxx += prescore * prescore
+        self._syy += llm_score * llm_score
+        self._sxy += prescore * llm_score
+
+    def _correlation(self) -> Optional[float]:
+        n = self.count
+        if n < 2:
+            return None
+        cov = n * self._sxy - self._sx * self._sy
+        var = (n * self._sxx - self._sx ** 2) * (n * self._syy - self._sy ** 2)
+        if var <= 0:
+            return None
+        return round(cov / math.sqrt(var), 3)
+
+    def snapshot(self) -> dict[str, Any]:
+        if not self.count:
+            return {"pairs": 0}
+        return {
+            "pairs": self.count,
+            "mean_abs_error": round(self._sum_abs_error / self.count, 2),
+            "mean_bias": round(self._sum_error / self.count, 2),
+            "within_10_ratio": round(self.within_10 / self.count, 3),
+            "correlation": self._correlation(),
+        }
+
+
+prescorer = PreScorer()
+prescore_agreement = AgreementStats()
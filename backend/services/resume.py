@@ -3,15 +3,18 @@
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.ai.base import AIProvider
 from backend.ai.factory import get_ai_provider
-from backend.core.config import settings
+from backend.db import release_connection
+from backend.models import ResumeRaw
 from backend.prompts import PARSE_RESUME_PROMPT
 from backend.repositories import ResumeRepository, AIResultRepository
+from backend.services.singleflight import generate_ai_result
 from backend.services.utils import compute_hash
 
 
@@ -22,6 +25,7 @@ class ResumeParseResult:
     resume_id: UUID
     resume_hash: str
     parsed_resume: dict[str, Any]
+    parsed_digest: str
     cache_hit: bool
 
 
@@ -30,70 +34,111 @@ class ResumeService:
 
     OPERATION = "parse_resume"
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        ai_provider: Optional[AIProvider] = None,
+    ) -> None:
         self.session = session
         self.resume_repo = ResumeRepository(session)
         self.ai_result_repo = AIResultRepository(session)
-        self.ai_provider = get_ai_provider()
+        self.ai_provider = ai_provider or get_ai_provider()
         self.logger = logging.getLogger(__name__)
 
     async def parse_and_cache(self, resume_text: str) -> ResumeParseResult:
         """Parse resume and cache result.
 
         1. Compute hash of normalized text
-        2. Get or create ResumeRaw record
+        2. Get or create ResumeRaw record (SELECT; insert_or_get on a miss)
         3. Check AIResult cache
         4. If not cached, call LLM and save result
         5. Save parsed data to individual columns
+
+        No connection is held during the LLM call: the lookup transaction
+        is committed first and the result is written in a short one.
         """
         content_hash = compute_hash(resume_text)
 
         # Get or create resume record
-        resume = await self.resume_repo.get_by_hash(content_hash)
-        if resume is None:
-            resume = await self.resume_repo.create(resume_text, content_hash)
+        resume, created = await self.resume_repo.get_or_create(
+            resume_text, content_hash
+        )
+        if created:
             self.logger.info("Created new resume record: %s", resume.id)
 
         # Check cache
         cached_result = await self.ai_result_repo.get(self.OPERATION, content_hash)
-        if cached_result is not None:
-            self.logger.info("Cache hit for resume parsing: %s", content_hash[:16])
-            
-            # Update parsed columns if not set (e.g., migrated data)
-            if resume.parsed_at is None:
-                resume.set_parsed_data(cached_result.output_json)
-                resume.parsed_at = datetime.utcnow()
-                await self.session.flush()
-            
-            return ResumeParseResult(
-                resume_id=resume.id,
-                resume_hash=content_hash,
-                parsed_resume=resume.get_parsed_data(),
-                cache_hit=True,
-            )
-
-        # Call LLM
+        if cached_result is None:
+            return await self._parse_with_llm(resume, resume_text, content_hash)
+
+        self.logger.info("Cache hit for resume parsing: %s", content_hash[:16])
+
+        # Update parsed columns if not set (e.g., migrated data)
+        if resume.parsed_at is None:
+            resume.set_parsed_data(cached_result.output_json)
+            resume.parsed_at = datetime.utcnow()
+            await self.session.flush()
+
+        return ResumeParseResult(
+            resume_id=resume.id,
+            resume_hash=content_hash,
+            parsed_resume=resume.get_parsed_data(),
+            parsed_digest=resume.parsed_digest or resume.refresh_parsed_digest(),
+            cache_hit=True,
+        )
+
+    async def _parse_with_llm(
+        self,
+        resume: ResumeRaw,
+        resume_text: str,
+        content_hash: str,
+    ) -> ResumeParseResult:
+        """Generate the parse once across concurrent callers, then store it.
+
+        The shared generation commits the AIResult itself, so workers
+        waiting on the advisory lock see it; this request's session holds no
+        connection meanwhile and only writes the parsed columns afterwards.
+        If another worker committed the parse first, this is a cache hit.
+        """
+        # Don't hold a pooled connection while waiting on the lock or LLM
+        await release_connection(self.session)
         prompt = PARSE_RESUME_PROMPT.replace("{{RESUME_TEXT}}", resume_text)
-        parsed_json = await self.ai_provider.generate_json(prompt, prompt_name=self.OPERATION)
-
-        # Save to cache
-        await self.ai_result_repo.save(
-            operation=self.OPERATION,
-            input_hash=content_hash,
-            output_json=parsed_json,
-            provider=self.ai_provider.provider_name,
-            model=settings.ai_model,
+        ai_result, generated = await generate_ai_result(
+            self.OPERATION,
+            content_hash,
+            lambda: self.ai_provider.generate_json(prompt, prompt_name=self.OPERATION),
+            self.ai_provider.provider_name,
         )
-        self.logger.info("Saved parsed resume to cache: %s", content_hash[:16])
+        parsed_json = ai_result.output_json
+        if generated:
+            self.logger.info("Saved parsed resume to cache: %s", content_hash[:16])
 
         # Save parsed data to individual columns
         resume.set_parsed_data(parsed_json)
         resume.parsed_at = datetime.utcnow()
-        await self.session.flush()
+        await self.session.commit()
 
         return ResumeParseResult(
             resume_id=resume.id,
             resume_hash=content_hash,
             parsed_resume=resume.get_parsed_data(),
-            cache_hit=False,
+            parsed_digest=resume.parsed_digest or resume.refresh_parsed_digest(),
+            cache_hit=not generated,
+        )
+
+    async def ensure_parsed(self, resume: ResumeRaw) -> ResumeParseResult:
+        """Return parsed data for an already loaded resume record.
+
+        Uses the stored columns directly when the record has been parsed,
+        avoiding a re-hash and cache lookup; otherwise falls back to
+        parse_and_cache.
+        """
+        if resume.parsed_at is None:
+            return await self.parse_and_cache(resume.source_text)
+        return ResumeParseResult(
+            resume_id=resume.id,
+            resume_hash=resume.content_hash,
+            parsed_resume=resume.get_parsed_data(),
+            parsed_digest=resume.parsed_digest or resume.refresh_parsed_digest(),
+            cache_hit=True,
         )
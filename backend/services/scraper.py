@@ -1,13 +1,69 @@
+"""Fetch vacancy pages by URL and reduce them to readable text.
 
+One pooled `httpx.AsyncClient` is shared by all fetches. Cleaned text is
+cached per URL together with the page's ETag/Last-Modified validators: a
+fresh entry is returned without any request, an older one is revalidated
+with a conditional GET, and a 304 reuses the cached text without parsing
+the page again. Requests to one host are capped so job boards that
+throttle aggressive clients are not hit by a burst of parallel fetches.
+Pages with structured vacancy data (see vacancy_extractors.py) are cached
+with that data and its canonical text instead of the flattened page.
+"""
+
+import asyncio
 import logging
-import re
-from typing import Optional
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
 
 import httpx
-from bs4 import BeautifulSoup
+from backend.core.config import settings
+from backend.core.serialization import loads
+from backend.services.html_text import html_to_text, parse_html
+from backend.services.singleflight import SingleFlight
+from backend.services.vacancy_extractors import (
+    StructuredVacancy,
+    VacancyExtractor,
+    vacancy_extractors,
+)
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class CachedPage:
+    """Cleaned text of a fetched URL and the validators to revalidate it."""
+
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float  # time.monotonic() of the last 200/304
+    source_url: str = ""  # URL the validators belong to (page or API)
+    structured: Optional[StructuredVacancy] = None  # See vacancy_extractors.py
+
+
+@dataclass
+class FetchResult:
+    """Outcome of one URL of `fetch_many`."""
+
+    url: str
+    text: Optional[str] = None
+    structured: Optional[StructuredVacancy] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class _HostLimit:
+    semaphore: asyncio.Semaphore
+    users: int = 0  # Requests holding or waiting for a slot
+
+
 class WebScraper:
     """Service to scrape and clean text from URLs."""
 
@@ -16,45 +72,248 @@ class WebScraper:
         "Accept-Language": "en-US,en;q=0.9,ru;q=0.8",
     }
 
-    @classmethod
-    async def fetch_text(cls, url: str) -> str:
-        """Fetch URL and return cleaned text content."""
+    def __init__(
+        self,
+        max_entries: int,
+        fresh_seconds: float,
+        ttl_seconds: float,
+        per_host_concurrency: int,
+    ) -> None:
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self.ttl_seconds = ttl_seconds
+        self.per_host_concurrency = per_host_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._entries: OrderedDict[str, CachedPage] = OrderedDict()
+        self._flights = SingleFlight()
+        self._host_limits: dict[str, _HostLimit] = {}
+
+        self.hits = 0
+        self.revalidated = 0
+        self.fetches = 0
+        self.stale_served = 0
+        self.structured = 0
+        self.errors = 0
+
+    async def fetch_text(self, url: str) -> str:
+        """Fetch URL and return cleaned text content.
+
+        Raises ValueError with a user-facing message if the page cannot be
+        fetched.
+        """
+        return (await self.fetch_page(url)).text
+
+    async def fetch_page(self, url: str) -> CachedPage:
+        """Fetch URL; the result also carries structured vacancy data if any.
+
+        For pages with structured data `text` is the extractor's canonical
+        text rather than the flattened page. Raises ValueError like
+        `fetch_text`.
+        """
         if not url.startswith(("http://", "https://")):
             raise ValueError("URL must start with http:// or https://")
+        key = url.split("#", 1)[0]
+
+        cached = self._get(key)
+        age = time.monotonic() - cached.fetched_at if cached is not None else None
+        if age is not None and age < self.fresh_seconds:
+            self.hits += 1
+            return cached
+
+        # Concurrent requests for one URL share a single fetch; it runs in
+        # its own task, so a cancelled caller does not cancel the others
+        return await self._flights.do(("scrape", key), lambda: self._fetch(key, cached))
 
-        async with httpx.AsyncClient(follow_redirects=True, timeout=12.0) as client:
+    async def fetch_many(self, urls: list[str]) -> list[FetchResult]:
+        """Fetch several URLs concurrently; results keep the input order.
+
+        A failing URL is reported in its result and does not fail the rest.
+        """
+        async def fetch_one(url: str) -> FetchResult:
             try:
-                response = await client.get(url, headers=cls.HEADERS)
-                response.raise_for_status()
-                html = response.text
-                return cls._clean_html(html)
-            except (httpx.HTTPError, Exception) as e:
-                logger.error(f"Failed to fetch vacancy URL {url}: {e}")
-                # HH.ru and others might block bots. We should propagate this as a user-friendly error.
-                raise ValueError(f"Failed to fetch URL (site may block bots): {str(e)}")
-
-    @classmethod
-    def _clean_html(cls, html: str) -> str:
-        """Use BeautifulSoup to extract readable text, removing boilerplate."""
-        soup = BeautifulSoup(html, "lxml")
-
-        # Remove irrelevant tags
-        for tag in soup(["script", "style", "nav", "footer", "header", "iframe", "svg", "noscript"]):
-            tag.decompose()
-
-        # Specific cleanup for common job sites keywords in classes/ids
-        # (Very basic heuristic to reduce noise)
-        for tag in soup.find_all(True):
-            attrs = str(tag.attrs).lower()
-            if any(x in attrs for x in ["cookie", "banner", "popup", "sidebar", "ad-", "related-"]):
-                tag.decompose()
-
-        text = soup.get_text(separator="\n")
-
-        # Normalize whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = "\n".join(chunk for chunk in chunks if chunk)
-        
-        # Limit length to avoid blowing up LLM context
-        return text[:30000]
+                page = await self.fetch_page(url)
+            except ValueError as e:
+                return FetchResult(url=url, error=str(e))
+            return FetchResult(url=url, text=page.text, structured=page.structured)
+
+        return list(await asyncio.gather(*(fetch_one(url) for url in urls)))
+
+    async def close(self) -> None:
+        """Close the shared client (called on application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return counters for monitoring."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "fetches": self.fetches,
+            "stale_served": self.stale_served,
+            "coalesced": self._flights.followers,
+            "structured": self.structured,
+            "errors": self.errors,
+            "in_flight": self._flights.snapshot()["in_flight"],
+            "hosts_limited": len(self._host_limits),
+        }
+
+    async def _fetch(self, url: str, cached: Optional[CachedPage]) -> CachedPage:
+        api = vacancy_extractors.find_api(url) if settings.vacancy_extractors_enabled else None
+        try:
+            page = None
+            if api is not None:
+                try:
+                    page = await self._fetch_api(url, *api, cached)
+                except Exception as e:
+                    # The page itself may still be readable
+                    logger.warning("vacancy_api_failed | url=%s error=%s", api[1], e)
+            if page is None:
+                page = await self._fetch_html(url, cached)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Failed to fetch vacancy URL {url}: {e}")
+            if cached is not None:
+                # Serve the last good copy rather than fail on a throttled refetch
+                self.stale_served += 1
+                return cached
+            # HH.ru and others might block bots. We should propagate this as a user-friendly error.
+            raise ValueError(f"Failed to fetch URL (site may block bots): {str(e)}")
+
+        self._put(url, page)
+        return page
+
+    async def _fetch_api(
+        self,
+        url: str,
+        extractor: VacancyExtractor,
+        api_url: str,
+        cached: Optional[CachedPage],
+    ) -> Optional[CachedPage]:
+        response = await self._request(api_url, cached, extractor.api_headers)
+        if response is None:
+            return cached
+        structured = extractor.from_api(url, loads(response.content))
+        if structured is None:
+            return None
+        self.fetches += 1
+        self.structured += 1
+        return self._page(api_url, response, structured.text, structured)
+
+    async def _fetch_html(self, url: str, cached: Optional[CachedPage]) -> CachedPage:
+        response = await self._request(url, cached, self.HEADERS)
+        if response is None:
+            return cached
+        self.fetches += 1
+        html = response.text
+        final_url = str(response.url)
+        tree = parse_html(html)
+        structured = None
+        if tree is not None and settings.vacancy_extractors_enabled:
+            structured = vacancy_extractors.from_page(tree, final_url)
+        if structured is not None:
+            self.structured += 1
+            return self._page(url, response, structured.text, structured)
+        return self._page(url, response, html_to_text(html, url=final_url, tree=tree))
+
+    async def _request(
+        self,
+        url: str,
+        cached: Optional[CachedPage],
+        headers: dict[str, str],
+    ) -> Optional[httpx.Response]:
+        """GET with the cached validators; None on 304 Not Modified."""
+        headers = dict(headers)
+        conditional = cached is not None and cached.source_url == url
+        if conditional:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        async with self._host_slot(url):
+            response = await self._get_client().get(url, headers=headers)
+        if response.status_code == 304 and conditional:
+            self.revalidated += 1
+            cached.fetched_at = time.monotonic()
+            return None
+        response.raise_for_status()
+        return response
+
+    @staticmethod
+    def _page(
+        source_url: str,
+        response: httpx.Response,
+        text: str,
+        structured: Optional[StructuredVacancy] = None,
+    ) -> CachedPage:
+        return CachedPage(
+            text=text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched_at=time.monotonic(),
+            source_url=source_url,
+            structured=structured,
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=settings.scraper_timeout_seconds,
+                limits=httpx.Limits(
+                    max_connections=settings.scraper_max_connections,
+                    max_keepalive_connections=settings.scraper_max_connections,
+                ),
+            )
+        return self._client
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str) -> AsyncIterator[None]:
+        """Hold one of the host's request slots.
+
+        A host's semaphore exists only while requests to it hold or wait
+        for a slot, so the map does not grow with every host ever seen.
+        """
+        host = httpx.URL(url).host
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = _HostLimit(
+                asyncio.Semaphore(self.per_host_concurrency)
+            )
+        limit.users += 1
+        try:
+            async with limit.semaphore:
+                yield
+        finally:
+            limit.users -= 1
+            if limit.users == 0:
+                del self._host_limits[host]
+
+    def _get(self, url: str) -> Optional[CachedPage]:
+        cached = self._entries.get(url)
+        if cached is None:
+            return None
+        if time.monotonic() - cached.fetched_at >= self.ttl_seconds:
+            del self._entries[url]
+            return None
+        self._entries.move_to_end(url)
+        return cached
+
+    def _put(self, url: str, cached: CachedPage) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[url] = cached
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+web_scraper = WebScraper(
+    max_entries=settings.scraper_cache_max_entries,
+    fresh_seconds=settings.scraper_cache_fresh_seconds,
+    ttl_seconds=settings.scraper_cache_ttl_seconds,
+    per_host_concurrency=settings.scraper_per_host_concurrency,
+)
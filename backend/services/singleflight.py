@@ -0,0 +1,213 @@
+"""Single-flight coalescing for identical in-flight LLM operations.
+
+Concurrent callers that miss the cache for the same
+`(operation, input_hash)` share one generation instead of each paying for
+their own. `generate_once` runs the whole generation (cross-worker lock,
+cache re-check, LLM call, result write) once per key in this process.
+Optionally a Postgres advisory lock extends this across workers: a worker
+that finds the key locked polls until the lock holder has committed the
+result, without holding a pooled connection while it waits.
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from backend.core.config import settings
+from backend.db.session import AsyncSessionLocal, async_engine
+from backend.models import AIResult
+from backend.repositories import AIResultRepository
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Backoff between pg_try_advisory_lock attempts while another worker generates
+LOCK_POLL_INITIAL_SECONDS = 0.2
+LOCK_POLL_MAX_SECONDS = 2.0
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key within this process."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: tuple[str, str], fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn` once per key; concurrent callers share its result.
+
+        The call runs in its own task, so a cancelled caller (e.g. a client
+        disconnect) does not cancel the work other callers are waiting on.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.followers += 1
+            logger.info("singleflight_join | operation=%s input_hash=%s", key[0], key[1][:16])
+        return await asyncio.shield(task)
+
+    def _finished(self, key: tuple[str, str], task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Retrieved even if every caller was cancelled
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return counters for monitoring."""
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+
+def _advisory_key(operation: str, input_hash: str) -> int:
+    digest = hashlib.sha256(f"{operation}:{input_hash}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def advisory_locks_enabled() -> bool:
+    """Whether cross-worker locking is configured and safe to use.
+
+    Session-level advisory locks belong to a server connection; behind a
+    transaction-mode pooler (DB_PGBOUNCER) the unlock may run on another
+    one and the lock would leak, so they are never taken there.
+    """
+    return settings.ai_singleflight_advisory_lock and not settings.db_pgbouncer
+
+
+async def _try_advisory_lock(key: int) -> Optional[AsyncConnection]:
+    """Take the lock without waiting; return its connection, or None if busy."""
+    conn = await async_engine.connect()
+    try:
+        result = await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+        locked = bool(result.scalar())
+        await conn.commit()  # Session-level lock outlives the transaction
+    except BaseException:
+        await conn.close()
+        raise
+    if locked:
+        return conn
+    await conn.close()
+    return None
+
+
+async def _advisory_unlock(conn: AsyncConnection, key: int) -> None:
+    try:
+        await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+        await conn.commit()
+    except BaseException:
+        # Never return a connection that may still hold the lock to the pool
+        await conn.invalidate()
+        raise
+    finally:
+        await conn.close()
+
+
+async def generate_once(
+    operation: str,
+    input_hash: str,
+    lookup: Callable[[AsyncSession], Awaitable[Optional[T]]],
+    produce: Callable[[AsyncSession], Awaitable[T]],
+) -> tuple[T, bool]:
+    """Produce the cached result for a key once across concurrent callers.
+
+    `lookup` reads the cache; `produce` calls the LLM, writes the result
+    and commits. Both get a short-lived session of their own, so the
+    generation does not depend on any caller's request session. Returns
+    the result and whether it was produced by this call (False when
+    another worker committed it first).
+
+    Callers in this process share one flight, so at most one of them polls
+    or holds the advisory lock. With the lock enabled, the holder keeps one
+    connection (the lock's) for the duration of the generation and runs its
+    reads and writes on it; waiting workers hold none between polls.
+    """
+    return await llm_singleflight.do(
+        (operation, input_hash),
+        lambda: _generate_locked(operation, input_hash, lookup, produce),
+    )
+
+
+async def generate_ai_result(
+    operation: str,
+    input_hash: str,
+    call: Callable[[], Awaitable[dict[str, Any]]],
+    provider: str,
+) -> tuple[AIResult, bool]:
+    """`generate_once` for operations cached in the ai_result table."""
+
+    async def lookup(session: AsyncSession) -> Optional[AIResult]:
+        return await AIResultRepository(session).get(operation, input_hash)
+
+    async def produce(session: AsyncSession) -> AIResult:
+        output_json = await call()
+        ai_result = await AIResultRepository(session).save(
+            operation=operation,
+            input_hash=input_hash,
+            output_json=output_json,
+            provider=provider,
+            model=settings.ai_model,
+        )
+        await session.commit()
+        return ai_result
+
+    return await generate_once(operation, input_hash, lookup, produce)
+
+
+async def _generate_locked(
+    operation: str,
+    input_hash: str,
+    lookup: Callable[[AsyncSession], Awaitable[Optional[T]]],
+    produce: Callable[[AsyncSession], Awaitable[T]],
+) -> tuple[T, bool]:
+    if not advisory_locks_enabled():
+        async with AsyncSessionLocal() as session:
+            return await produce(session), True
+
+    key = _advisory_key(operation, input_hash)
+    deadline = time.monotonic() + settings.ai_singleflight_lock_wait_seconds
+    delay = LOCK_POLL_INITIAL_SECONDS
+    while True:
+        conn = await _try_advisory_lock(key)
+        if conn is not None:
+            break
+        # Another worker is generating; its result may already be committed
+        async with AsyncSessionLocal() as session:
+            found = await lookup(session)
+        if found is not None:
+            return found, False
+        if time.monotonic() >= deadline:
+            logger.warning(
+                "singleflight_lock_timeout | operation=%s input_hash=%s",
+                operation,
+                input_hash[:16],
+            )
+            async with AsyncSessionLocal() as session:
+                return await produce(session), True
+        await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+        delay = min(delay * 2, LOCK_POLL_MAX_SECONDS)
+
+    try:
+        async with AsyncSession(bind=conn, expire_on_commit=False, autoflush=False) as session:
+            found = await lookup(session)
+            if found is not None:
+                return found, False
+            await session.commit()
+            return await produce(session), True
+    finally:
+        await _advisory_unlock(conn, key)
+
+
+llm_singleflight = SingleFlight()
@@ -2,6 +2,14 @@
 
 import hashlib
 import re
+from functools import lru_cache
+
+# Precompiled patterns. Each one starts with a literal, so the regex engine
+# can jump between candidate positions instead of testing every character.
+_MULTI_SPACE = re.compile(r"  +")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+# A newline with non-newline whitespace directly before or after it
+_LINE_EDGE_SPACE = re.compile(r"\n(?:(?=[^\S\n])|(?<=[^\S\n]\n))")
 
 
 def normalize_text(text: str) -> str:
@@ -10,27 +18,40 @@ def normalize_text(text: str) -> str:
     - Trim whitespace
     - Unify spaces (collapse multiple spaces/tabs to single space)
     - Remove repeated empty lines
+
+    Output is identical to the original strip/replace/sub/sub/split-strip-join
+    pipeline (checked by benchmarks/normalize_text.py), so stored content_hash
+    values stay valid. Steps that cannot change the text are skipped via cheap
+    substring checks; already-clean text takes the fast path.
     """
     # Trim
     text = text.strip()
 
     # Replace tabs with spaces
-    text = text.replace("\t", " ")
+    if "\t" in text:
+        text = text.replace("\t", " ")
 
-    # Collapse multiple spaces to single
-    text = re.sub(r" +", " ", text)
+    # Collapse multiple spaces to single (single spaces are left untouched)
+    if "  " in text:
+        text = _MULTI_SPACE.sub(" ", text)
 
-    # Collapse multiple newlines to single
-    text = re.sub(r"\n\s*\n+", "\n\n", text)
+    if "\n" in text:
+        # Collapse multiple newlines to single
+        text = _BLANK_LINES.sub("\n\n", text)
 
-    # Trim each line
-    lines = [line.strip() for line in text.split("\n")]
-    text = "\n".join(lines)
+        # Trim each line (outer edges were already trimmed above)
+        if _LINE_EDGE_SPACE.search(text):
+            text = "\n".join([line.strip() for line in text.split("\n")])
 
     return text
 
 
+@lru_cache(maxsize=128)
 def compute_hash(text: str) -> str:
-    """Compute SHA256 hash of normalized text."""
+    """Compute SHA256 hash of normalized text.
+
+    Memoized: the same text is typically hashed several times per request,
+    and str caches its own hash, so repeat lookups are cheap.
+    """
     normalized = normalize_text(text)
     return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
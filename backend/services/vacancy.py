@@ -1,18 +1,27 @@
 """Vacancy service - parse and cache vacancy text."""
 
+import difflib
 import logging
+import re
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable, Optional
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.ai.base import AIProvider
 from backend.ai.factory import get_ai_provider
 from backend.core.config import settings
+from backend.core.simhash import simhash64
+from backend.db import release_connection
+from backend.models import VacancyRaw
 from backend.prompts import PARSE_VACANCY_PROMPT
 from backend.repositories import VacancyRepository, AIResultRepository
+from backend.services.singleflight import generate_ai_result
 from backend.services.utils import compute_hash
+from backend.services.vacancy_extractors import StructuredVacancy
 
 
 @dataclass
@@ -22,7 +31,95 @@ class VacancyParseResult:
     vacancy_id: UUID
     vacancy_hash: str
     parsed_vacancy: dict[str, Any]
+    parsed_digest: str
     cache_hit: bool
+    extracted_by: Optional[str] = None  # Extractor name when no LLM was used
+    near_duplicate_of: Optional[UUID] = None  # Vacancy whose parse was reused
+
+
+class NearDuplicateStats:
+    """How often a cache miss was served from a near-duplicate vacancy."""
+
+    def __init__(self) -> None:
+        self.checked = 0
+        self.caught = 0
+        self.rejected = 0  # Found, but the edit touched parsed fields
+        self.distances: Counter[int] = Counter()
+
+    def record(self, distance: Optional[int], rejected: bool = False) -> None:
+        self.checked += 1
+        if distance is None:
+            return
+        if rejected:
+            self.rejected += 1
+        else:
+            self.caught += 1
+            self.distances[distance] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "caught": self.caught,
+            "rejected": self.rejected,
+            "catch_rate": round(self.caught / self.checked, 3) if self.checked else None,
+            "distances": dict(sorted(self.distances.items())),
+        }
+
+
+near_duplicate_stats = NearDuplicateStats()
+
+_WORD_RE = re.compile(r"\w+")
+# Parsed fields that identify the job; responsibilities are free text
+_IDENTITY_FIELDS = (
+    "job_title",
+    "company",
+    "employment_type",
+    "location",
+    "required_skills",
+    "preferred_skills",
+    "experience_requirements",
+    "ats_keywords",
+)
+
+
+def _words(value: Any) -> set[str]:
+    """Lowercase words of all strings and numbers in a parsed value."""
+    if isinstance(value, str):
+        return set(_WORD_RE.findall(value.lower()))
+    if isinstance(value, bool) or value is None:
+        return set()
+    if isinstance(value, (int, float)):
+        return {str(int(value)) if value == int(value) else str(value)}
+    if isinstance(value, dict):
+        return set().union(*(_words(item) for item in value.values()))
+    if isinstance(value, (list, tuple)):
+        return set().union(*(_words(item) for item in value))
+    return set()
+
+
+def _lines(text: str) -> list[str]:
+    return [line for line in (raw.strip() for raw in text.splitlines()) if line]
+
+
+def edit_keeps_parse(parsed: dict[str, Any], old_text: str, new_text: str) -> bool:
+    """Whether `parsed` (the parse of old_text) also holds for new_text.
+
+    Accepts only edits confined to leading and trailing lines (headers,
+    footers, tracking lines) that add or remove no word occurring in an
+    identifying parsed field. Two postings of one employer template that
+    differ in title, skills or years are rejected even at a tiny SimHash
+    distance.
+    """
+    old_lines, new_lines = _lines(old_text), _lines(new_text)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, _, _ in matcher.get_opcodes():
+        if tag != "equal" and i1 != 0 and i2 != len(old_lines):
+            return False  # Edit inside the body
+
+    # Words present in only one of the texts
+    changed = _words(old_text) ^ _words(new_text)
+    identity = _words([parsed.get(name) for name in _IDENTITY_FIELDS])
+    return not (changed & identity)
 
 
 class VacancyService:
@@ -30,70 +127,236 @@ class VacancyService:
 
     OPERATION = "parse_vacancy"
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        ai_provider: Optional[AIProvider] = None,
+    ) -> None:
         self.session = session
         self.vacancy_repo = VacancyRepository(session)
         self.ai_result_repo = AIResultRepository(session)
-        self.ai_provider = get_ai_provider()
+        self.ai_provider = ai_provider or get_ai_provider()
         self.logger = logging.getLogger(__name__)
 
     async def parse_and_cache(self, vacancy_text: str) -> VacancyParseResult:
         """Parse vacancy and cache result.
 
         1. Compute hash of normalized text
-        2. Get or create VacancyRaw record
+        2. Get or create VacancyRaw record (SELECT; insert_or_get on a miss)
         3. Check AIResult cache
-        4. If not cached, call LLM and save result
+        4. If not cached, reuse the parse of a near-duplicate vacancy
+           (SimHash index) or call LLM and save result
         5. Save parsed data to individual columns
+
+        No connection is held during the LLM call: the lookup transaction
+        is committed first and the result is written in a short one.
         """
         content_hash = compute_hash(vacancy_text)
 
         # Get or create vacancy record
-        vacancy = await self.vacancy_repo.get_by_hash(content_hash)
-        if vacancy is None:
-            vacancy = await self.vacancy_repo.create(vacancy_text, content_hash)
+        vacancy, created = await self.vacancy_repo.get_or_create(
+            vacancy_text, content_hash, self._fingerprint()
+        )
+        if created:
             self.logger.info("Created new vacancy record: %s", vacancy.id)
 
         # Check cache
         cached_result = await self.ai_result_repo.get(self.OPERATION, content_hash)
-        if cached_result is not None:
-            self.logger.info("Cache hit for vacancy parsing: %s", content_hash[:16])
-            
-            # Update parsed columns if not set (e.g., migrated data)
-            if vacancy.parsed_at is None:
-                vacancy.set_parsed_data(cached_result.output_json)
-                vacancy.parsed_at = datetime.utcnow()
-                await self.session.flush()
-            
-            return VacancyParseResult(
-                vacancy_id=vacancy.id,
-                vacancy_hash=content_hash,
-                parsed_vacancy=vacancy.get_parsed_data(),
-                cache_hit=True,
+        if cached_result is None and vacancy.parsed_at is not None:
+            # Parsed columns without an AIResult (e.g. migrated or edited
+            # data): the row's own parse wins over a neighbour's or the LLM
+            return self._result_from_row(vacancy, content_hash)
+        if cached_result is None and settings.vacancy_near_duplicate_enabled:
+            reused = await self._reuse_near_duplicate(vacancy, vacancy_text, content_hash)
+            if reused is not None:
+                return reused
+        if cached_result is None:
+            return await self._parse_with_llm(vacancy, vacancy_text, content_hash)
+
+        self.logger.info("Cache hit for vacancy parsing: %s", content_hash[:16])
+
+        # Update parsed columns if not set (e.g., migrated data)
+        if vacancy.parsed_at is None:
+            vacancy.set_parsed_data(cached_result.output_json)
+            vacancy.parsed_at = datetime.utcnow()
+            await self.session.flush()
+
+        return self._result_from_row(vacancy, content_hash)
+
+    @staticmethod
+    def _fingerprint() -> Optional[Callable[[str], Optional[int]]]:
+        """SimHash for new rows; skipped (~ms per text) while the feature is off."""
+        return simhash64 if settings.vacancy_near_duplicate_enabled else None
+
+    @staticmethod
+    def _result_from_row(vacancy: VacancyRaw, content_hash: str) -> VacancyParseResult:
+        return VacancyParseResult(
+            vacancy_id=vacancy.id,
+            vacancy_hash=content_hash,
+            parsed_vacancy=vacancy.get_parsed_data(),
+            parsed_digest=vacancy.parsed_digest or vacancy.refresh_parsed_digest(),
+            cache_hit=True,
+        )
+
+    async def _reuse_near_duplicate(
+        self,
+        vacancy: VacancyRaw,
+        vacancy_text: str,
+        content_hash: str,
+    ) -> Optional[VacancyParseResult]:
+        """Serve the parse of a near-identical vacancy instead of calling the LLM.
+
+        Only if the texts differ in their leading/trailing lines and none of
+        the changed words occur in the neighbour's title, company, location,
+        skills, keywords or experience requirements (see
+        `edit_keeps_parse`). The copy is not stored as this text's parse:
+        no AIResult and no parsed columns are written, so a wrong match is
+        never cached. Only near_duplicate_of_id is recorded, for audit.
+        """
+        if vacancy.simhash is None:
+            return None
+        found = await self.vacancy_repo.find_near_duplicate(
+            vacancy, settings.vacancy_near_duplicate_max_distance
+        )
+        if found is None:
+            near_duplicate_stats.record(None)
+            return None
+
+        original, distance = found
+        parsed_json = original.get_parsed_data()
+        if not edit_keeps_parse(parsed_json, original.source_text, vacancy_text):
+            near_duplicate_stats.record(distance, rejected=True)
+            self.logger.info(
+                "Near-duplicate vacancy rejected: %s ~ %s (distance=%d)",
+                vacancy.id,
+                original.id,
+                distance,
             )
+            return None
+        near_duplicate_stats.record(distance)
 
-        # Call LLM
+        if vacancy.near_duplicate_of_id != original.id:
+            vacancy.near_duplicate_of_id = original.id
+            await self.session.commit()
+        self.logger.info(
+            "Reused near-duplicate vacancy parse: %s -> %s (distance=%d)",
+            vacancy.id,
+            original.id,
+            distance,
+        )
+
+        return VacancyParseResult(
+            vacancy_id=vacancy.id,
+            vacancy_hash=content_hash,
+            parsed_vacancy=parsed_json,
+            parsed_digest=original.parsed_digest or original.refresh_parsed_digest(),
+            cache_hit=True,
+            near_duplicate_of=original.id,
+        )
+
+    async def _parse_with_llm(
+        self,
+        vacancy: VacancyRaw,
+        vacancy_text: str,
+        content_hash: str,
+    ) -> VacancyParseResult:
+        """Generate the parse once across concurrent callers, then store it.
+
+        The shared generation commits the AIResult itself, so workers
+        waiting on the advisory lock see it; this request's session holds no
+        connection meanwhile and only writes the parsed columns afterwards.
+        If another worker committed the parse first, this is a cache hit.
+        """
+        # Don't hold a pooled connection while waiting on the lock or LLM
+        await release_connection(self.session)
         prompt = PARSE_VACANCY_PROMPT.replace("{{VACANCY_TEXT}}", vacancy_text)
-        parsed_json = await self.ai_provider.generate_json(prompt, prompt_name=self.OPERATION)
-
-        # Save to cache
-        await self.ai_result_repo.save(
-            operation=self.OPERATION,
-            input_hash=content_hash,
-            output_json=parsed_json,
-            provider=self.ai_provider.provider_name,
-            model=settings.ai_model,
+        ai_result, generated = await generate_ai_result(
+            self.OPERATION,
+            content_hash,
+            lambda: self.ai_provider.generate_json(prompt, prompt_name=self.OPERATION),
+            self.ai_provider.provider_name,
         )
-        self.logger.info("Saved parsed vacancy to cache: %s", content_hash[:16])
+        parsed_json = ai_result.output_json
+        if generated:
+            self.logger.info("Saved parsed vacancy to cache: %s", content_hash[:16])
 
         # Save parsed data to individual columns
         vacancy.set_parsed_data(parsed_json)
         vacancy.parsed_at = datetime.utcnow()
-        await self.session.flush()
+        vacancy.near_duplicate_of_id = None  # Has its own parse now
+        await self.session.commit()
+
+        return VacancyParseResult(
+            vacancy_id=vacancy.id,
+            vacancy_hash=content_hash,
+            parsed_vacancy=vacancy.get_parsed_data(),
+            parsed_digest=vacancy.parsed_digest or vacancy.refresh_parsed_digest(),
+            cache_hit=not generated,
+        )
+
+    async def store_structured(self, structured: StructuredVacancy) -> VacancyParseResult:
+        """Store a vacancy read from page/API data without calling the LLM.
+
+        The mapped data is cached as the parse_vacancy result of the
+        canonical text, so later parse_and_cache calls with the same text
+        hit the cache. An already cached result for that text wins.
+        """
+        content_hash = compute_hash(structured.text)
+        vacancy, created = await self.vacancy_repo.get_or_create(
+            structured.text, content_hash, self._fingerprint()
+        )
+        if created:
+            self.logger.info("Created new vacancy record: %s", vacancy.id)
+
+        cached_result = await self.ai_result_repo.get(self.OPERATION, content_hash)
+        extracted_by: Optional[str] = structured.source
+        if cached_result is None:
+            parsed_json = structured.parsed
+            await self.ai_result_repo.save(
+                operation=self.OPERATION,
+                input_hash=content_hash,
+                output_json=parsed_json,
+                provider=f"extractor:{structured.source}",
+            )
+            self.logger.info(
+                "Saved extracted vacancy to cache: %s (%s)",
+                content_hash[:16],
+                structured.source,
+            )
+        else:
+            parsed_json = cached_result.output_json
+            provider = cached_result.provider or ""
+            # Same canonical text may have been parsed by the LLM before
+            extracted_by = provider.partition("extractor:")[2] or None
+
+        if vacancy.parsed_at is None:
+            vacancy.set_parsed_data(parsed_json)
+            vacancy.parsed_at = datetime.utcnow()
+            await self.session.flush()
 
         return VacancyParseResult(
             vacancy_id=vacancy.id,
             vacancy_hash=content_hash,
             parsed_vacancy=vacancy.get_parsed_data(),
-            cache_hit=False,
+            parsed_digest=vacancy.parsed_digest or vacancy.refresh_parsed_digest(),
+            cache_hit=cached_result is not None,
+            extracted_by=extracted_by,
+        )
+
+    async def ensure_parsed(self, vacancy: VacancyRaw) -> VacancyParseResult:
+        """Return parsed data for an already loaded vacancy record.
+
+        Uses the stored columns directly when the record has been parsed,
+        avoiding a re-hash and cache lookup; otherwise falls back to
+        parse_and_cache.
+        """
+        if vacancy.parsed_at is None:
+            return await self.parse_and_cache(vacancy.source_text)
+        return VacancyParseResult(
+            vacancy_id=vacancy.id,
+            vacancy_hash=vacancy.content_hash,
+            parsed_vacancy=vacancy.get_parsed_data(),
+            parsed_digest=vacancy.parsed_digest or vacancy.refresh_parsed_digest(),
+            cache_hit=True,
+            near_duplicate_of=vacancy.near_duplicate_of_id,
         )
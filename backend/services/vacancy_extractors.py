@@ -0,0 +1,401 @@
+"""Structured vacancy extraction without the LLM.
+
+Many job pages already carry the vacancy as data: schema.org `JobPosting`
+JSON-LD, or (hh.ru) a public JSON API. Extractors registered here map such
+data straight into the parsed-vacancy schema (`VacancyRaw.set_parsed_data`)
+and render a canonical text that is stored and hashed as the vacancy's
+source text. When the mapping is complete enough the parse_vacancy LLM call
+is skipped; otherwise the canonical text is still a much cleaner LLM input
+than the flattened page.
+"""
+
+import html
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from lxml import etree
+
+from backend.core.serialization import loads
+from backend.services.html_text import element_text, find_site_extractor, parse_html
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StructuredVacancy:
+    """Vacancy read from page or API data."""
+
+    source: str  # Extractor name, e.g. "json_ld" or "hh_api"
+    text: str  # Canonical text; its hash is the vacancy content_hash
+    parsed: dict[str, Any]  # Parsed-vacancy schema, as produced by the LLM
+
+    @property
+    def complete(self) -> bool:
+        """True if the data is rich enough to skip the LLM parse."""
+        return bool(self.parsed.get("job_title") and self.parsed.get("required_skills"))
+
+
+@dataclass
+class VacancyFields:
+    """Raw fields common to all sources, before mapping to the schema."""
+
+    title: Optional[str] = None
+    company: Optional[str] = None
+    employment_type: Optional[str] = None
+    location: Optional[str] = None
+    skills: list[str] = field(default_factory=list)
+    min_years: Optional[float] = None
+    experience_details: Optional[str] = None
+    responsibilities: list[str] = field(default_factory=list)
+    description_html: Optional[str] = None
+
+
+class VacancyExtractor:
+    """Base class: override `api_url`/`from_api` and/or `from_page`."""
+
+    name = "base"
+    api_headers: dict[str, str] = {}
+
+    def api_url(self, url: str) -> Optional[str]:
+        """JSON API URL to fetch instead of the page, if this site has one."""
+        return None
+
+    def from_api(self, url: str, payload: Any) -> Optional[StructuredVacancy]:
+        return None
+
+    def from_page(self, tree: etree._Element, url: str) -> Optional[StructuredVacancy]:
+        return None
+
+
+class VacancyExtractorRegistry:
+    """Ordered extractors; the first one returning data wins."""
+
+    def __init__(self) -> None:
+        self._extractors: list[VacancyExtractor] = []
+
+    def register(self, extractor: VacancyExtractor) -> None:
+        self._extractors.append(extractor)
+
+    def find_api(self, url: str) -> Optional[tuple[VacancyExtractor, str]]:
+        for extractor in self._extractors:
+            api_url = extractor.api_url(url)
+            if api_url:
+                return extractor, api_url
+        return None
+
+    def from_page(self, tree: etree._Element, url: str) -> Optional[StructuredVacancy]:
+        for extractor in self._extractors:
+            try:
+                structured = extractor.from_page(tree, url)
+            except Exception:
+                # Page data is untrusted; a broken block means "no data"
+                logger.warning(
+                    "vacancy_extractor_failed | extractor=%s url=%s",
+                    extractor.name,
+                    url,
+                    exc_info=True,
+                )
+                continue
+            if structured is not None:
+                return structured
+        return None
+
+
+# Description headings -> section. Checked in order, first match wins.
+_SECTION_PATTERNS = (
+    (
+        "preferred",
+        re.compile(r"плюсом|преимуществ|желательно|nice to have|bonus|a plus|preferred", re.I),
+    ),
+    (
+        "responsibilities",
+        re.compile(
+            r"обязанност|задачи|предстоит|чем заниматься|responsibilit|you will|what you.ll do",
+            re.I,
+        ),
+    ),
+    (
+        "requirements",
+        re.compile(
+            r"требовани|ожидаем|нужно|необходим|requirement|qualification|we expect|you have",
+            re.I,
+        ),
+    ),
+)
+_HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6", "p", "strong", "b"})
+_HEADING_MAX_CHARS = 80
+
+_YEARS_RE = re.compile(r"(?:от\s*)?(\d+(?:[.,]\d+)?)\s*\+?\s*(?:year|yr|лет|год)", re.I)
+
+
+def description_sections(tree: etree._Element) -> dict[str, list[str]]:
+    """Group the list items of a description under the heading before them."""
+    sections: dict[str, list[str]] = {}
+    current: Optional[str] = None
+    for element in tree.iter("li", *_HEADING_TAGS):
+        text = " ".join(element.text_content().split())
+        if not text:
+            continue
+        if element.tag == "li":
+            if current is not None:
+                sections.setdefault(current, []).append(text)
+        elif len(text) <= _HEADING_MAX_CHARS and next(element.iterancestors("li"), None) is None:
+            section = next(
+                (name for name, pattern in _SECTION_PATTERNS if pattern.search(text)),
+                None,
+            )
+            if section is not None:
+                current = section
+            elif text.endswith(":") or element.tag.startswith("h"):
+                current = None  # Another section, e.g. "Условия:"
+    return sections
+
+
+def parse_min_years(text: Optional[str]) -> Optional[float]:
+    match = _YEARS_RE.search(text or "")
+    return float(match.group(1).replace(",", ".")) if match else None
+
+
+def build_structured(source: str, fields: VacancyFields) -> StructuredVacancy:
+    """Map raw fields to the parsed-vacancy schema and its canonical text."""
+    description_text = ""
+    sections: dict[str, list[str]] = {}
+    if fields.description_html:
+        tree = parse_html(fields.description_html)
+        if tree is not None:
+            description_text = element_text([tree])
+            sections = description_sections(tree)
+
+    requirement_lines = sections.get("requirements", [])
+    preferred_lines = sections.get("preferred", [])
+    required_skills: list[dict[str, Any]] = []
+    preferred_skills: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for name in fields.skills:
+        key = name.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        evidence = _find_line(key, requirement_lines)
+        preferred = evidence is None and _find_line(key, preferred_lines)
+        skill = {"name": name, "type": "hard", "evidence": evidence or preferred or name}
+        (preferred_skills if preferred else required_skills).append(skill)
+
+    min_years = fields.min_years
+    if min_years is None:
+        min_years = parse_min_years(fields.experience_details)
+    if min_years is not None and float(min_years).is_integer():
+        min_years = int(min_years)
+
+    parsed = {
+        "job_title": fields.title,
+        "company": fields.company,
+        "employment_type": fields.employment_type,
+        "location": fields.location,
+        "required_skills": required_skills,
+        "preferred_skills": preferred_skills,
+        "experience_requirements": {
+            "min_years": min_years,
+            "details": fields.experience_details,
+        },
+        "responsibilities": fields.responsibilities or sections.get("responsibilities", []),
+        "ats_keywords": [skill["name"] for skill in required_skills + preferred_skills],
+    }
+
+    lines = [fields.title, fields.company, fields.location, fields.employment_type]
+    lines.append(fields.experience_details)
+    if fields.skills:
+        lines.append("Навыки: " + ", ".join(fields.skills))
+    lines.append(description_text)
+    text = "\n".join(line for line in lines if line)
+    return StructuredVacancy(source=source, text=text, parsed=parsed)
+
+
+def _find_line(key: str, lines: list[str]) -> Optional[str]:
+    for line in lines:
+        if key in line.lower():
+            return line[:200]
+    return None
+
+
+def _clean(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = " ".join(html.unescape(value).split())
+    return value or None
+
+
+def _split_list(value: Any) -> list[str]:
+    """Skills/responsibilities given as a list or a delimited string."""
+    if isinstance(value, list):
+        items = [item.get("name") if isinstance(item, dict) else item for item in value]
+    elif isinstance(value, str):
+        items = re.split(r"[,;\n•]", html.unescape(value))
+    else:
+        return []
+    return [text for text in (_clean(item) for item in items) if text]
+
+
+class JsonLdExtractor(VacancyExtractor):
+    """schema.org JobPosting embedded as JSON-LD (any site)."""
+
+    name = "json_ld"
+
+    EMPLOYMENT_TYPES = {
+        "FULL_TIME": "full-time",
+        "PART_TIME": "part-time",
+        "CONTRACTOR": "contract",
+        "TEMPORARY": "temporary",
+        "INTERN": "internship",
+        "VOLUNTEER": "volunteer",
+        "PER_DIEM": "per diem",
+    }
+
+    def from_page(self, tree: etree._Element, url: str) -> Optional[StructuredVacancy]:
+        for script in tree.iterfind(".//script[@type='application/ld+json']"):
+            if not script.text:
+                continue
+            try:
+                data = loads(script.text)
+            except ValueError:
+                continue
+            posting = self._find_posting(data)
+            if posting is not None:
+                return build_structured(self.name, self._fields(posting))
+        return None
+
+    @classmethod
+    def _find_posting(cls, data: Any) -> Optional[dict[str, Any]]:
+        if isinstance(data, list):
+            return next(filter(None, (cls._find_posting(item) for item in data)), None)
+        if not isinstance(data, dict):
+            return None
+        kind = data.get("@type")
+        if kind == "JobPosting" or (isinstance(kind, list) and "JobPosting" in kind):
+            return data
+        return cls._find_posting(data.get("@graph"))
+
+    def _fields(self, posting: dict[str, Any]) -> VacancyFields:
+        organization = posting.get("hiringOrganization")
+        if isinstance(organization, dict):
+            organization = organization.get("name")
+
+        employment = posting.get("employmentType")
+        if not isinstance(employment, list):
+            employment = [employment]
+        employment_types = [
+            self.EMPLOYMENT_TYPES.get(value.upper().replace("-", "_"), value.lower())
+            for value in employment
+            if isinstance(value, str) and value.upper() != "OTHER"
+        ]
+
+        experience = posting.get("experienceRequirements")
+        min_years = None
+        if isinstance(experience, dict):
+            months = experience.get("monthsOfExperience")
+            if isinstance(months, (int, float, str)):
+                try:
+                    min_years = round(float(months) / 12, 1)
+                except ValueError:
+                    pass
+            experience = experience.get("description")
+
+        description = posting.get("description")
+        if isinstance(description, str) and "&lt;" in description:
+            description = html.unescape(description)
+
+        return VacancyFields(
+            title=_clean(posting.get("title")),
+            company=_clean(organization),
+            employment_type=", ".join(employment_types) or None,
+            location=self._location(posting),
+            skills=_split_list(posting.get("skills")),
+            min_years=min_years,
+            experience_details=_clean(experience),
+            responsibilities=_split_list(posting.get("responsibilities")),
+            description_html=description if isinstance(description, str) else None,
+        )
+
+    @staticmethod
+    def _location(posting: dict[str, Any]) -> Optional[str]:
+        parts: list[str] = []
+        locations = posting.get("jobLocation")
+        for location in locations if isinstance(locations, list) else [locations]:
+            address = location.get("address") if isinstance(location, dict) else None
+            if isinstance(address, str):
+                parts.append(address)
+            elif isinstance(address, dict):
+                country = address.get("addressCountry")
+                if isinstance(country, dict):
+                    country = country.get("name")
+                for value in (
+                    address.get("addressLocality"),
+                    address.get("addressRegion"),
+                    country,
+                ):
+                    value = _clean(value)
+                    if value and value not in parts:
+                        parts.append(value)
+        if posting.get("jobLocationType") == "TELECOMMUTE":
+            parts.append("remote")
+        return ", ".join(parts) or None
+
+
+class HhApiExtractor(VacancyExtractor):
+    """hh.ru vacancies via the public api.hh.ru endpoint."""
+
+    name = "hh_api"
+    api_headers = {"HH-User-Agent": "ResumeAdapter/0.1", "Accept": "application/json"}
+
+    API_URL = "https://api.hh.ru/vacancies/{vacancy_id}"
+    VACANCY_PATH_RE = re.compile(r"^/vacancy/(\d+)")
+    EXPERIENCE_YEARS = {
+        "noExperience": 0,
+        "between1And3": 1,
+        "between3And6": 3,
+        "moreThan6": 6,
+    }
+
+    def api_url(self, url: str) -> Optional[str]:
+        site = find_site_extractor(url)
+        if site is None or site.name != "hh":
+            return None
+        match = self.VACANCY_PATH_RE.match(urlsplit(url).path)
+        return self.API_URL.format(vacancy_id=match.group(1)) if match else None
+
+    def from_api(self, url: str, payload: Any) -> Optional[StructuredVacancy]:
+        if not isinstance(payload, dict) or not payload.get("name"):
+            return None
+
+        def name_of(key: str) -> Optional[str]:
+            value = payload.get(key)
+            return _clean(value.get("name")) if isinstance(value, dict) else None
+
+        address = payload.get("address")
+        location = _clean(address.get("raw")) if isinstance(address, dict) else None
+        experience = payload.get("experience")
+        min_years = None
+        if isinstance(experience, dict):
+            min_years = self.EXPERIENCE_YEARS.get(experience.get("id"))
+
+        fields = VacancyFields(
+            title=_clean(payload.get("name")),
+            company=name_of("employer"),
+            employment_type=", ".join(
+                filter(None, (name_of("employment"), name_of("schedule")))
+            ) or None,
+            location=location or name_of("area"),
+            skills=_split_list(payload.get("key_skills")),
+            min_years=min_years,
+            experience_details=name_of("experience"),
+            description_html=payload.get("description") or None,
+        )
+        return build_structured(self.name, fields)
+
+
+vacancy_extractors = VacancyExtractorRegistry()
+vacancy_extractors.register(HhApiExtractor())
+vacancy_extractors.register(JsonLdExtractor())
@@ -0,0 +1,119 @@
+"""Vacancy page cleanup and job board extractors."""
+
+from typing import Optional
+
+import pytest
+
+from backend.services.html_text import (
+    SITE_EXTRACTORS,
+    find_site_extractor,
+    html_to_text,
+    parse_html,
+)
+
+GENERIC_PAGE = """<!DOCTYPE html>
+<html><head><title>Job</title><style>p { color: red }</style></head>
+<body>
+  <header>Site menu</header>
+  <nav><a>Home</a><a>Jobs</a></nav>
+  <div class="cookie-banner">We use cookies</div>
+  <main>
+    <h1>Python   Developer</h1>
+    <p>Build <b>APIs</b> with FastAPI.<!-- hidden --> Remote.</p>
+    <script>track("view")</script>
+    <ul><li>Python</li><li>PostgreSQL</li></ul>
+    <div class="ad">Buy now</div>
+    <div class="header-badge">Hot</div>
+  </main>
+  <aside class="sidebar">Similar jobs</aside>
+  <footer>(c) Site</footer>
+</body></html>
+"""
+
+HH_PAGE = """<html><body>
+<div class="bloko-header">hh.ru menu</div>
+<h1 data-qa="vacancy-title">Backend developer</h1>
+<a data-qa="vacancy-company-name"><span>Acme</span></a>
+<div data-qa="vacancy-description"><p>Write Go services.</p>
+  <span data-qa="skills-element">Go</span></div>
+<span data-qa="skills-element">Kafka</span>
+<div data-qa="vacancy-serp__vacancy">Other vacancy</div>
+</body></html>
+"""
+
+
+def test_generic_page_drops_boilerplate() -> None:
+    text = html_to_text(GENERIC_PAGE)
+    assert text.splitlines() == [
+        "Job",
+        "Python",
+        "Developer",
+        "Build",
+        "APIs",
+        "with FastAPI.",
+        "Remote.",
+        "Python",
+        "PostgreSQL",
+        "Hot",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("url", "name"),
+    [
+        ("https://hh.ru/vacancy/1", "hh"),
+        ("https://spb.hh.ru/vacancy/1", "hh"),
+        ("https://www.rabota.by/vacancy/1", "hh"),
+        ("https://career.habr.com/vacancies/1", "habr_career"),
+        ("https://www.linkedin.com/jobs/view/1", "linkedin"),
+        ("https://ru.indeed.com/viewjob?jk=1", "indeed"),
+        ("https://nothh.ru/vacancy/1", None),
+        ("https://habr.com/ru/articles/1", None),
+        (None, None),
+        ("not a url", None),
+    ],
+)
+def test_find_site_extractor(url: Optional[str], name: Optional[str]) -> None:
+    extractor = find_site_extractor(url)
+    assert (extractor.name if extractor else None) == name
+
+
+def test_site_extractor_keeps_only_vacancy_blocks() -> None:
+    text = html_to_text(HH_PAGE, url="https://hh.ru/vacancy/1")
+    # The nested skill is not repeated; unrelated blocks are dropped
+    assert text.splitlines() == [
+        "Backend developer",
+        "Acme",
+        "Write Go services.",
+        "Go",
+        "Kafka",
+    ]
+
+
+def test_changed_layout_falls_back_to_whole_page() -> None:
+    page = "<html><body><nav>menu</nav><h1>Go developer</h1></body></html>"
+    assert html_to_text(page, url="https://hh.ru/vacancy/1") == "Go developer"
+
+
+def test_all_extractor_xpaths_compile() -> None:
+    tree = parse_html("<html><body><p>x</p></body></html>")
+    for extractor in SITE_EXTRACTORS:
+        assert tree.xpath(extractor.xpath) == []
+
+
+def test_text_budget() -> None:
+    page = "<html><body>" + "<p>line of text</p>" * 1000 + "</body></html>"
+    assert len(html_to_text(page, max_chars=100)) == 100
+
+
+@pytest.mark.parametrize(
+    ("page", "text"),
+    [
+        ("", ""),
+        ("   ", ""),
+        # str with an encoding declaration is rejected by lxml as is
+        ('<?xml version="1.0" encoding="utf-8"?><html><body>Hi</body></html>', "Hi"),
+    ],
+)
+def test_odd_documents(page: str, text: str) -> None:
+    assert html_to_text(page) == text
@@ -0,0 +1,96 @@
+"""Local repair of malformed model JSON and the truncation retry policy."""
+
+import asyncio
+from typing import Optional
+
+import pytest
+
+from backend.ai.deepseek import DeepSeekProvider, ModelOutput
+from backend.ai.errors import AIResponseFormatError
+from backend.ai.json_repair import JsonRepairer
+from backend.ai.streaming import TokenStream
+
+
+@pytest.mark.parametrize(
+    ("raw", "data", "fixes"),
+    [
+        ('```json\n{"a": 1}\n```', {"a": 1}, ["fences"]),
+        ('Here you go: {"a": 1} Hope it helps', {"a": 1}, ["extract_object"]),
+        ('{"a": [1, 2,], }', {"a": [1, 2]}, ["trailing_commas"]),
+        ("{'a': True, 'b': None}", {"a": True, "b": None}, ["literals", "quotes"]),
+        ('{"a": “x”}', {"a": "x"}, ["quotes"]),
+        ('{"a": "line\nbreak"}', {"a": "line\nbreak"}, ["control_chars"]),
+    ],
+)
+def test_repairs_mechanical_damage(raw: str, data: dict, fixes: list[str]) -> None:
+    result = JsonRepairer().repair(raw)
+    assert result.data == data
+    assert result.fixes == fixes
+    assert not result.truncated
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '{"a": "x", "b": tru',
+        '{"summary": "Senior developer with ten years of exp',
+        '```json\n{"skills": [1, 2',
+        '{"a": 1, "b":',
+    ],
+)
+def test_truncated_output_is_flagged(raw: str) -> None:
+    result = JsonRepairer().repair(raw)
+    assert result.truncated
+
+
+def test_unrecoverable_output() -> None:
+    repairer = JsonRepairer()
+    assert repairer.repair("I cannot answer that.").data is None
+    assert repairer.snapshot()["failed"] == 1
+
+
+class ScriptedProvider(DeepSeekProvider):
+    """Returns canned completions instead of calling the API."""
+
+    def __init__(self, outputs: list[ModelOutput], cap: int) -> None:
+        super().__init__()
+        self.outputs = outputs
+        self.truncation_retries = 2
+        self.max_tokens = 1000
+        self.truncation_max_tokens = cap
+        self.budgets: list[int] = []
+
+    async def _call_model(
+        self,
+        user_prompt: str,
+        prompt_name: str,
+        stream: Optional[TokenStream] = None,
+        max_tokens: Optional[int] = None,
+    ) -> tuple[ModelOutput, int]:
+        self.budgets.append(max_tokens)
+        return self.outputs.pop(0), 5
+
+
+CUT = '{"summary": "Senior developer with ten ye'
+
+
+def test_length_cutoff_retries_with_larger_budget() -> None:
+    provider = ScriptedProvider(
+        [ModelOutput(CUT, "length"), ModelOutput('{"summary": "ok"}', "stop")], cap=4000
+    )
+    assert asyncio.run(provider.generate_json("p")) == {"summary": "ok"}
+    assert provider.budgets == [1000, 2000]
+
+
+def test_length_cutoff_at_cap_fails_fast() -> None:
+    provider = ScriptedProvider([ModelOutput(CUT, "length")] * 3, cap=1000)
+    with pytest.raises(AIResponseFormatError, match="max_tokens"):
+        asyncio.run(provider.generate_json("p"))
+    assert provider.budgets == [1000]
+
+
+def test_dropped_stream_retries_unchanged() -> None:
+    provider = ScriptedProvider([ModelOutput(CUT, None)] * 3, cap=4000)
+    with pytest.raises(AIResponseFormatError, match="truncated"):
+        asyncio.run(provider.generate_json("p"))
+    assert provider.budgets == [1000, 1000, 1000]
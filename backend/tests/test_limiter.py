@@ -0,0 +1,130 @@
+"""Admission order, token buckets and reservation refunds of LLMLimiter."""
+
+import asyncio
+
+import pytest
+
+from backend.ai import limiter as limiter_module
+from backend.ai.errors import AIOverloadedError
+from backend.ai.limiter import LLMLimiter, TokenBucket
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(limiter_module, "time", clock)
+    return clock
+
+
+def test_bucket_refills_continuously(clock: Clock) -> None:
+    bucket = TokenBucket(per_minute=600)
+    bucket.consume(600)
+    assert bucket.wait_time(100) == pytest.approx(10.0)
+    clock.now += 5
+    assert bucket.wait_time(100) == pytest.approx(5.0)
+    clock.now += 120
+    assert bucket.tokens <= bucket.capacity
+    assert bucket.wait_time(600) == 0.0
+
+
+def test_oversized_request_waits_for_full_bucket(clock: Clock) -> None:
+    bucket = TokenBucket(per_minute=60)
+    bucket.consume(30)
+    assert bucket.wait_time(1000) == pytest.approx(30.0)
+    clock.now += 30
+    assert bucket.wait_time(1000) == 0.0
+    bucket.consume(1000)
+    assert bucket.tokens == pytest.approx(0.0)
+
+
+def test_refund_is_capped_at_capacity(clock: Clock) -> None:
+    bucket = TokenBucket(per_minute=100)
+    bucket.consume(80)
+    bucket.refund(50)
+    assert bucket.tokens == pytest.approx(70.0)
+    bucket.refund(500)
+    assert bucket.tokens == pytest.approx(100.0)
+
+
+def test_waiters_are_admitted_by_priority_then_arrival() -> None:
+    async def scenario() -> list[str]:
+        limiter = LLMLimiter(
+            max_in_flight=1, priorities={"parse_resume": 0, "adapt_resume": 2}
+        )
+        order: list[str] = []
+
+        async def call(name: str, tag: str) -> None:
+            async with limiter.slot(name):
+                order.append(tag)
+
+        await limiter.acquire("parse_resume")
+        tasks = [
+            asyncio.create_task(call("adapt_resume", "adapt-1")),
+            asyncio.create_task(call("anonymous", "default")),
+            asyncio.create_task(call("parse_resume", "parse")),
+            asyncio.create_task(call("adapt_resume", "adapt-2")),
+        ]
+        await asyncio.sleep(0)
+        assert limiter.queue_depth == 4
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["parse", "adapt-1", "adapt-2", "default"]
+
+
+def test_queue_timeout_raises_overloaded() -> None:
+    async def scenario() -> LLMLimiter:
+        limiter = LLMLimiter(max_in_flight=1, queue_timeout=0.01)
+        await limiter.acquire("a")
+        with pytest.raises(AIOverloadedError):
+            await limiter.acquire("b")
+        limiter.release()
+        await limiter.acquire("c")  # The timed-out waiter does not block
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.snapshot()["timeouts"] == 1
+
+
+def test_unused_reservation_is_refunded(clock: Clock) -> None:
+    async def scenario() -> LLMLimiter:
+        limiter = LLMLimiter(max_in_flight=4, tokens_per_minute=10_000)
+        async with limiter.slot("a", 5000) as reservation:
+            assert limiter.token_bucket.tokens == pytest.approx(5000)
+            reservation.used = 1200
+        assert limiter.token_bucket.tokens == pytest.approx(8800)
+        async with limiter.slot("b", 2000):
+            pass  # Unknown usage keeps the full reservation
+        assert limiter.token_bucket.tokens == pytest.approx(6800)
+        return limiter
+
+    assert asyncio.run(scenario()).snapshot()["refunded_tokens"] == 3800
+
+
+def test_refund_admits_waiting_call(clock: Clock) -> None:
+    async def scenario() -> bool:
+        limiter = LLMLimiter(max_in_flight=4, tokens_per_minute=6000)
+        waiter_admitted = asyncio.Event()
+
+        async def waiter() -> None:
+            async with limiter.slot("b", 4000):
+                waiter_admitted.set()
+
+        async with limiter.slot("a", 5000) as reservation:
+            task = asyncio.create_task(waiter())
+            await asyncio.sleep(0)
+            assert not waiter_admitted.is_set()
+            reservation.used = 500
+        await asyncio.wait_for(task, 1)
+        return waiter_admitted.is_set()
+
+    assert asyncio.run(scenario())
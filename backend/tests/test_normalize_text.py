@@ -0,0 +1,53 @@
+"""normalize_text must match the original implementation byte for byte.
+
+Stored content_hash values were computed with the original normalizer, so
+any divergence would make existing resume/vacancy rows unreachable.
+"""
+
+import random
+
+import pytest
+
+from backend.benchmarks.normalize_text import legacy_normalize_text
+from backend.services.utils import compute_hash, normalize_text
+
+ALPHABET = (
+    ["a", "b", "Я", "1", ".", "-"] * 6
+    + [" ", " ", "  ", "\t", "\n", "\n\n", "\r\n", " \n ", "\x0b", "\x0c", "\xa0", " ", "　"]
+)
+
+
+def random_text(rng: random.Random, max_len: int = 80) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, max_len)))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "   ",
+        "\n\n\n",
+        "a\t\tb",
+        "  line one  \n\n\n  line two\t\n",
+        "a\r\n\r\nb",
+        "a\xa0 \xa0b",
+        "a\n \x0b\nb",
+        "Иван Иванов\n\n\n\nPython   Developer",
+    ],
+)
+def test_matches_legacy_on_edge_cases(text: str) -> None:
+    assert normalize_text(text) == legacy_normalize_text(text)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_legacy_on_random_texts(seed: int) -> None:
+    rng = random.Random(seed)
+    for _ in range(2000):
+        text = random_text(rng)
+        assert normalize_text(text) == legacy_normalize_text(text), repr(text)
+
+
+def test_compute_hash_is_stable_across_calls() -> None:
+    text = "  Python developer\n\n\n  5 years  "
+    assert compute_hash(text) == compute_hash(text)
+    assert compute_hash(text) == compute_hash(legacy_normalize_text(text))
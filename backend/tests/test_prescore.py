@@ -0,0 +1,154 @@
+"""Local pre-scoring of resume-vacancy fit."""
+
+from datetime import date
+
+import pytest
+
+from backend.services.prescore import (
+    AgreementStats,
+    PreScore,
+    SkillVocabulary,
+    experience_years,
+    normalize_skill,
+    prescorer,
+)
+
+TODAY = date(2024, 6, 15)
+
+
+@pytest.mark.parametrize(
+    ("name", "canonical"),
+    [
+        ("Node.js", "nodejs"),
+        ("node", "nodejs"),
+        ("NodeJS", "nodejs"),
+        ("Python 3.11", "python"),
+        ("K8s", "kubernetes"),
+        ("  PostgreSQL ", "postgresql"),
+        ("CI/CD", "ci/cd"),
+        ("Машинное обучение", "machinelearning"),
+    ],
+)
+def test_normalize_skill(name: str, canonical: str) -> None:
+    assert normalize_skill(name) == canonical
+
+
+@pytest.mark.parametrize(
+    ("entries", "years"),
+    [
+        ([{"start_date": "2020-01", "end_date": "2021-12"}], 2.0),
+        ([{"start_date": "01.2020", "end_date": "12/2021"}], 2.0),
+        ([{"start_date": "март 2022", "end_date": "по настоящее время"}], 28 / 12),
+        ([{"start_date": "2023", "end_date": None}], 1.5),
+        # Overlapping jobs count once
+        (
+            [
+                {"start_date": "2018-01", "end_date": "2020-12"},
+                {"start_date": "2020-01", "end_date": "2021-12"},
+                {"start_date": "2023-01", "end_date": "2023-12"},
+            ],
+            5.0,
+        ),
+    ],
+)
+def test_experience_years(entries: list[dict], years: float) -> None:
+    assert experience_years(entries, TODAY) == pytest.approx(years)
+
+
+@pytest.mark.parametrize(
+    "entries",
+    [
+        [],
+        [{"start_date": "unknown", "end_date": "2021"}],
+        [{"start_date": 2020, "end_date": 2021}],  # Not strings
+        [{"start_date": "2022-05", "end_date": "2021-01"}],  # Ends before start
+    ],
+)
+def test_unconfirmed_experience(entries: list[dict]) -> None:
+    assert experience_years(entries, TODAY) is None
+
+
+RESUME = {
+    "summary": "Backend developer, builds REST APIs",
+    "skills": [{"name": "Python"}, {"name": "Docker"}, "Git"],
+    "work_experience": [
+        {
+            "position": "Developer",
+            "start_date": "2019-01",
+            "end_date": "2023-12",
+            "responsibilities": ["Designed microservices with message queues"],
+            "tech_stack": ["Python", "PostgreSQL"],
+        },
+        {"position": "Intern", "start_date": "2018-06", "end_date": "2018-12"},
+    ],
+}
+
+VACANCY = {
+    "required_skills": [{"name": "python"}, {"name": "postgres"}, {"name": "Kafka"}],
+    "preferred_skills": [{"name": "Docker"}],
+    "ats_keywords": ["Python", "microservices", "Kubernetes"],
+    "experience_requirements": {"min_years": 3},
+}
+
+
+def score(resume: dict, vacancy: dict) -> PreScore:
+    vocabulary = SkillVocabulary()
+    return prescorer.score_profiles(
+        vocabulary,
+        prescorer.resume_profile(vocabulary, resume),
+        prescorer.vacancy_profile(vocabulary, vacancy),
+    )
+
+
+def test_score_breakdown() -> None:
+    result = score(RESUME, VACANCY)
+    # 2/3 required and the preferred skill
+    assert result.skill_fit == pytest.approx(40 * 2 / 3 + 10, abs=0.1)
+    # Enough years; Python and PostgreSQL are evidenced in tech_stack
+    assert result.experience_fit == pytest.approx(15 + 10 * 2 / 3, abs=0.1)
+    # "microservices" is found in experience text, Kubernetes is not
+    assert result.ats_fit == pytest.approx(10.0)
+    assert result.clarity_evidence == 5.0  # One of two entries has evidence
+    assert result.matched_required_skills == ["python", "postgresql"]
+    assert result.missing_required_skills == ["kafka"]
+    assert result.score == round(
+        result.skill_fit + result.experience_fit + result.ats_fit + result.clarity_evidence
+    )
+
+
+def test_empty_vacancy_requirements_count_as_met() -> None:
+    result = score(RESUME, {})
+    assert result.skill_fit == 50.0
+    assert result.ats_fit == 15.0
+
+
+def test_malformed_parsed_values_are_ignored() -> None:
+    resume = {
+        "summary": 42,
+        "skills": "Python",
+        "work_experience": [
+            "not a dict",
+            {"start_date": 2020, "responsibilities": [None, 7], "tech_stack": None},
+        ],
+    }
+    vacancy = {
+        "required_skills": [{"name": None}, "Python"],
+        "ats_keywords": [None, "python"],
+        "experience_requirements": {"min_years": "three"},
+    }
+    result = score(resume, vacancy)
+    assert result.matched_required_skills == ["python"]
+    assert result.experience_fit == 8.0  # Unconfirmed dates are capped
+
+
+def test_agreement_stats() -> None:
+    stats = AgreementStats()
+    assert stats.snapshot() == {"pairs": 0}
+    for prescore, llm in [(50, 55), (70, 72), (90, 70)]:
+        stats.record(prescore, llm)
+    snapshot = stats.snapshot()
+    assert snapshot["pairs"] == 3
+    assert snapshot["mean_abs_error"] == 9.0
+    assert snapshot["mean_bias"] == pytest.approx(4.33, abs=0.01)
+    assert snapshot["within_10_ratio"] == pytest.approx(0.667, abs=0.001)
+    assert 0 < snapshot["correlation"] <= 1
@@ -0,0 +1,174 @@
+"""Retry classification, backoff and the provider circuit breaker."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+import httpx
+import pytest
+
+from backend.ai import resilience
+from backend.ai.deepseek import DeepSeekProvider
+from backend.ai.errors import AIRequestError, AIUnavailableError
+from backend.ai.resilience import (
+    CircuitBreaker,
+    backoff_delay,
+    is_retryable,
+    retry_after_seconds,
+)
+from backend.core.serialization import dumps
+
+REQUEST = httpx.Request("POST", "https://llm.test/chat/completions")
+
+
+def status_error(status: int, headers: Optional[dict[str, str]] = None) -> httpx.HTTPStatusError:
+    response = httpx.Response(status, headers=headers, request=REQUEST)
+    return httpx.HTTPStatusError("error", request=REQUEST, response=response)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(resilience, "time", clock)
+    return clock
+
+
+@pytest.mark.parametrize(
+    ("exc", "retryable"),
+    [
+        (status_error(429), True),
+        (status_error(503), True),
+        (status_error(599), True),
+        (status_error(400), False),
+        (status_error(401), False),
+        (status_error(413), False),
+        (httpx.ConnectError("refused"), True),
+        (httpx.ReadTimeout("slow"), True),
+        (ValueError("other"), False),
+    ],
+)
+def test_is_retryable(exc: Exception, retryable: bool) -> None:
+    assert is_retryable(exc) is retryable
+
+
+def test_retry_after_forms() -> None:
+    assert retry_after_seconds(status_error(429, {"Retry-After": " 7 "})) == 7.0
+    later = datetime.now(timezone.utc) + timedelta(seconds=60)
+    delay = retry_after_seconds(status_error(503, {"Retry-After": format_datetime(later, usegmt=True)}))
+    assert 55 <= delay <= 60
+    past = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    assert retry_after_seconds(status_error(503, {"Retry-After": format_datetime(past, usegmt=True)})) == 0.0
+    assert retry_after_seconds(status_error(503, {"Retry-After": "soon"})) is None
+    assert retry_after_seconds(status_error(503)) is None
+    assert retry_after_seconds(httpx.ConnectError("refused")) is None
+
+
+def test_backoff_is_capped_full_jitter() -> None:
+    for attempt in range(10):
+        delays = [backoff_delay(attempt, 0.5, 4.0) for _ in range(200)]
+        assert all(0 <= delay <= min(4.0, 0.5 * 2**attempt) for delay in delays)
+
+
+def test_breaker_opens_after_threshold_and_probes_once(clock: Clock) -> None:
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.retry_after() == 30
+
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()  # The probe
+    assert not breaker.allow()  # Everyone else still fails fast
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["rejected_calls"] == 2
+
+
+def test_failed_probe_reopens(clock: Clock) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_after() == 10
+    assert breaker.times_opened == 2
+
+
+def test_released_probe_lets_next_call_probe(clock: Clock) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.release_probe()  # e.g. the request was cancelled
+    assert breaker.allow()
+
+
+def sse_ok() -> bytes:
+    chunk = {"choices": [{"delta": {"content": '{"ok": true}'}, "finish_reason": "stop"}]}
+    return f"data: {dumps(chunk).decode()}\n\ndata: [DONE]\n\n".encode()
+
+
+def provider_with(responses: list[httpx.Response]) -> tuple[DeepSeekProvider, list]:
+    calls: list = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    provider = DeepSeekProvider(
+        client=client, breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    )
+    provider.max_retries = 2
+    provider.retry_base_delay = 0.0
+    provider.retry_max_delay = 5.0
+    return provider, calls
+
+
+def test_retryable_status_is_retried() -> None:
+    provider, calls = provider_with(
+        [httpx.Response(503, headers={"Retry-After": "0"}), httpx.Response(200, content=sse_ok())]
+    )
+    assert asyncio.run(provider.generate_json("p")) == {"ok": True}
+    assert len(calls) == 2
+    assert provider.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_error_is_not_retried() -> None:
+    provider, calls = provider_with([httpx.Response(400)])
+    with pytest.raises(AIRequestError):
+        asyncio.run(provider.generate_json("p"))
+    assert len(calls) == 1
+
+
+def test_long_retry_after_fails_fast() -> None:
+    provider, calls = provider_with([httpx.Response(429, headers={"Retry-After": "120"})])
+    with pytest.raises(AIUnavailableError) as info:
+        asyncio.run(provider.generate_json("p"))
+    assert info.value.retry_after == 120
+    assert len(calls) == 1
+
+
+def test_open_breaker_rejects_without_request() -> None:
+    provider, calls = provider_with([httpx.Response(503, headers={"Retry-After": "0"})])
+    # Two failures open the breaker; the third attempt is not sent
+    with pytest.raises(AIUnavailableError):
+        asyncio.run(provider.generate_json("p"))
+    assert provider.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(AIUnavailableError):
+        asyncio.run(provider.generate_json("p"))
+    assert len(calls) == 2
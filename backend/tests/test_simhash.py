@@ -0,0 +1,117 @@
+"""SimHash fingerprints and the edit check for near-duplicate vacancies."""
+
+import pytest
+from pydantic import ValidationError
+
+from backend.core.config import Settings
+from backend.core.simhash import (
+    BAND_COUNT,
+    MAX_INDEXED_DISTANCE,
+    simhash64,
+    simhash_bands,
+    to_signed64,
+)
+from backend.services.vacancy import edit_keeps_parse
+
+BODY = """Acme Corp
+Middle Python Developer
+We build a logistics platform used by thousands of couriers every day.
+Responsibilities: design and maintain backend services, review code of
+colleagues, take part in planning and improve observability of the system.
+Requirements: 3+ years of commercial experience with Python, FastAPI,
+PostgreSQL and Docker. Experience with message queues is a plus.
+We offer remote work, flexible hours and a yearly education budget.
+"""
+
+PARSED = {
+    "job_title": "Middle Python Developer",
+    "company": "Acme Corp",
+    "employment_type": "remote",
+    "location": None,
+    "required_skills": [{"name": "Python"}, {"name": "FastAPI"}, {"name": "PostgreSQL"}],
+    "preferred_skills": [{"name": "Docker"}],
+    "experience_requirements": {"min_years": 3},
+    "responsibilities": ["design and maintain backend services"],
+    "ats_keywords": ["python", "fastapi"],
+}
+
+
+def distance(a: str, b: str) -> int:
+    return (simhash64(a) ^ simhash64(b)).bit_count()
+
+
+def test_short_text_has_no_fingerprint() -> None:
+    assert simhash64("Python developer wanted") is None
+
+
+def test_formatting_does_not_change_fingerprint() -> None:
+    reflowed = "  ".join(BODY.split()).upper().replace(".", " ;")
+    assert simhash64(reflowed) == simhash64(BODY)
+
+
+def test_footer_is_close_and_rewrite_is_far() -> None:
+    footer = BODY + "Apply via the careers page.\n"
+    other = " ".join(reversed(BODY.split()))
+    # Unrelated texts differ in about half of the 64 bits
+    assert distance(BODY, footer) <= 8
+    assert distance(BODY, other) >= 20
+
+
+def test_bands_and_signed_storage() -> None:
+    fingerprint = simhash64(BODY)
+    bands = simhash_bands(fingerprint)
+    assert len(bands) == BAND_COUNT
+    assert sum(band << (16 * i) for i, band in enumerate(bands)) == fingerprint
+    assert to_signed64(fingerprint) & ((1 << 64) - 1) == fingerprint
+    assert to_signed64((1 << 64) - 1) == -1
+
+
+def test_close_fingerprints_share_a_band() -> None:
+    fingerprint = simhash64(BODY)
+    # Flip bits spread over all bands: pigeonhole keeps one band intact
+    for flips in ([0, 16, 32], [5, 21, 40], [63, 47, 31]):
+        other = fingerprint
+        for bit in flips:
+            other ^= 1 << bit
+        shared = [a == b for a, b in zip(simhash_bands(fingerprint), simhash_bands(other))]
+        assert any(shared)
+
+
+def test_max_distance_is_capped_by_band_index() -> None:
+    assert Settings(vacancy_near_duplicate_max_distance=MAX_INDEXED_DISTANCE)
+    with pytest.raises(ValidationError):
+        Settings(vacancy_near_duplicate_max_distance=MAX_INDEXED_DISTANCE + 1)
+
+
+@pytest.mark.parametrize(
+    "new_text",
+    [
+        BODY,
+        BODY + "Apply via the careers page.\n",
+        "Posted 2 days ago\n" + BODY,
+        BODY.replace("\n", "\n\n"),
+    ],
+)
+def test_header_and_footer_edits_keep_parse(new_text: str) -> None:
+    assert edit_keeps_parse(PARSED, BODY, new_text)
+
+
+@pytest.mark.parametrize(
+    "new_text",
+    [
+        # Same employer template, different job
+        BODY.replace("Middle Python Developer", "Senior Go Developer"),
+        # Body edit that touches no parsed field is still rejected
+        BODY.replace("thousands of couriers", "millions of couriers"),
+        BODY.replace("Acme Corp", "Globex Corp"),
+    ],
+)
+def test_identity_or_body_edits_are_rejected(new_text: str) -> None:
+    assert not edit_keeps_parse(PARSED, BODY, new_text)
+
+
+def test_numbers_in_parsed_fields_are_identity_words() -> None:
+    footer = BODY + "Salary review after 5 months.\n"
+    assert edit_keeps_parse(PARSED, BODY, footer)
+    senior = {**PARSED, "experience_requirements": {"min_years": 5}}
+    assert not edit_keeps_parse(senior, BODY, footer)
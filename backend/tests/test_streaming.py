@@ -0,0 +1,121 @@
+"""Incremental JSON scanning of streamed model output."""
+
+import asyncio
+from typing import Optional
+
+import httpx
+import pytest
+
+from backend.ai.deepseek import DeepSeekProvider
+from backend.ai.streaming import JsonObjectScanner, JsonStringFieldExtractor
+from backend.core.serialization import dumps
+
+
+def feed_all(extractor: JsonStringFieldExtractor, chunks: list[str]) -> str:
+    return "".join(extractor.feed(chunk) for chunk in chunks)
+
+
+def split_everywhere(text: str) -> list[list[str]]:
+    return [[text[:i], text[i:]] for i in range(len(text) + 1)]
+
+
+def test_scanner_reports_members_and_stops_at_closing_brace() -> None:
+    scanner = JsonObjectScanner()
+    members = []
+    for chunk in ['Sure:\n```json\n{"a": 1, "b": "x,}', '\\"y", "c": [1, {"d": 2}]',
+                  ', "e": {"f": "}"}}', ' and {"ignored": true}']:
+        members += scanner.feed(chunk)
+    assert scanner.complete
+    assert members == [("a", 1), ("b", 'x,}"y'), ("c", [1, {"d": 2}]), ("e", {"f": "}"})]
+    assert scanner.document() == '{"a": 1, "b": "x,}\\"y", "c": [1, {"d": 2}], "e": {"f": "}"}}'
+
+
+@pytest.mark.parametrize("chunks", split_everywhere('{"a": "\\\\", "b": "q\\"}"}'))
+def test_scanner_escapes_split_across_chunks(chunks: list[str]) -> None:
+    scanner = JsonObjectScanner()
+    members = [member for chunk in chunks for member in scanner.feed(chunk)]
+    assert members == [("a", "\\"), ("b", 'q"}')]
+    assert scanner.complete
+
+
+def test_scanner_incomplete_object() -> None:
+    scanner = JsonObjectScanner()
+    scanner.feed('{"a": {"b": 1}')
+    assert not scanner.complete
+    assert scanner.document() is None
+
+
+TEXT_FIELD = '{"other": "\\"skip\\"", "text": "Line 1\\nTab\\tq\\"\\u0416\\ud83d\\ude00 end", "x": 1}'
+
+
+@pytest.mark.parametrize("chunks", split_everywhere(TEXT_FIELD))
+def test_extractor_decodes_escapes_split_across_chunks(chunks: list[str]) -> None:
+    extractor = JsonStringFieldExtractor("text")
+    assert feed_all(extractor, chunks) == 'Line 1\nTab\tq"Ж😀 end'
+    assert extractor.done
+
+
+@pytest.mark.parametrize(
+    ("value", "decoded"),
+    [
+        ("\\uZZZZ!", "\\uZZZZ!"),  # Not hex: passed through as text
+        ("\\u12", "\\u12"),  # Too short before the closing quote
+        ("\\ud83d alone", "� alone"),  # Unpaired high surrogate
+        ("\\ud83d\\u0041", "�A"),  # High surrogate + non-surrogate
+        ("\\ude00", "�"),  # Lone low surrogate
+    ],
+)
+def test_extractor_malformed_unicode_escapes(value: str, decoded: str) -> None:
+    extractor = JsonStringFieldExtractor("text")
+    text = '{"text": "' + value + '"}'
+    for chunks in split_everywhere(text):
+        extractor.reset()
+        assert feed_all(extractor, chunks) == decoded
+
+
+def sse(*chunks: dict) -> bytes:
+    lines = [f"data: {dumps(chunk).decode()}" for chunk in chunks]
+    return ("\n\n".join(lines + ["data: [DONE]"]) + "\n\n").encode()
+
+
+def delta(text: str, finish_reason: Optional[str] = None) -> dict:
+    return {"choices": [{"delta": {"content": text}, "finish_reason": finish_reason}]}
+
+
+class CountingProvider(DeepSeekProvider):
+    def __init__(self, body: bytes) -> None:
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+        super().__init__(client=httpx.AsyncClient(transport=transport))
+        self.document_checks = 0
+
+    def _complete_document(self, scanner: JsonObjectScanner) -> Optional[str]:
+        self.document_checks += 1
+        return super()._complete_document(scanner)
+
+    def stream(self):
+        return self._stream_response(self._get_client(), {}, {})
+
+
+def test_valid_object_closes_stream_early() -> None:
+    provider = CountingProvider(sse(delta('{"a": '), delta("1}"), delta(" trailing")))
+    output = asyncio.run(provider.stream())
+    assert output.content == '{"a": 1}'
+    assert output.finish_reason is None
+
+
+def test_invalid_object_is_checked_once() -> None:
+    tail = [delta(" more text") for _ in range(50)]
+    provider = CountingProvider(sse(delta('{"a": 1,}'), *tail, delta("", "stop")))
+    output = asyncio.run(provider.stream())
+    assert provider.document_checks == 1
+    assert output.content.startswith('{"a": 1,} more text')
+    assert output.finish_reason == "stop"
+
+
+def test_length_finish_reason_and_usage_chunk() -> None:
+    usage = {"choices": [], "usage": {"total_tokens": 42}}
+    provider = CountingProvider(sse(delta('{"a": "cut'), delta("", "length"), usage))
+    output = asyncio.run(provider.stream())
+    assert output.content == '{"a": "cut'
+    assert output.finish_reason == "length"
+    assert output.total_tokens == 42